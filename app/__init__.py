@@ -1,4 +1,6 @@
-from flask import Flask
+from contextlib import nullcontext
+
+from flask import Flask, current_app, has_app_context
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
 import os
@@ -34,11 +36,11 @@ def create_app():
 
     # Import models so they’re registered
     from . import models
-    from .models import User
+    from .utils.user_cache import load_cached_user
     
     @login_manager.user_loader
     def load_user(user_id):
-        return User.query.get(int(user_id))
+        return load_cached_user(user_id)
 
     # Register blueprints
     from .routes.auth_routes import auth_bp
@@ -48,6 +50,7 @@ def create_app():
     from .routes.chat_routes import chat_bp
     from .routes.profile_routes import profile_bp
     from .routes.admin_routes import admin_bp
+    from .routes.api_routes import api_bp
 
     app.register_blueprint(auth_bp)
     app.register_blueprint(tip_bp)
@@ -56,8 +59,19 @@ def create_app():
     app.register_blueprint(chat_bp)
     app.register_blueprint(profile_bp)
     app.register_blueprint(admin_bp)
+    app.register_blueprint(api_bp)
     
     with app.app_context():
         db.create_all()
 
     return app
+
+def app_context():
+    """The current app context if there is one, otherwise a new app's.
+
+    For entry points that run both from the CLI and inside the web app, where
+    building a second app would duplicate its engine and start-up work.
+    """
+    if has_app_context():
+        return nullcontext(current_app._get_current_object())
+    return create_app().app_context()
@@ -22,29 +22,50 @@ class User(UserMixin, db.Model):
     def check_password(self, password):
         return check_password_hash(self.password_hash, password)
 
+class Season(db.Model):
+    __tablename__ = "seasons"
+    year = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    feed_slug = db.Column(db.String(50), nullable=False)  # fixturedownload.com feed, e.g. "nrl-2026"
+    is_current = db.Column(db.Boolean, default=False, nullable=False)
+    # Round 1 is split over two weekends some years; these drive the special
+    # cutoff/visibility rules. All times are Australia/Sydney local.
+    round1_start = db.Column(db.Date, nullable=True)
+    round1_end = db.Column(db.Date, nullable=True)
+    round1_first_cutoff = db.Column(db.DateTime, nullable=True)
+    round1_cutoff = db.Column(db.DateTime, nullable=True)
+    round1_early_match_ids = db.Column(db.String(100), nullable=True)  # comma-separated
+    archived_at = db.Column(db.DateTime, nullable=True)
+
 class Tip(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    match = db.Column(db.String(100), nullable=False)
+    season = db.Column(db.Integer, db.ForeignKey("seasons.year"), nullable=False)
+    fixture_id = db.Column(db.Integer, db.ForeignKey("fixture_free.id"), nullable=False)
+    match = db.Column(db.String(100), nullable=False)  # FixtureFree.match_id, kept for display/exports
     selected_team = db.Column(db.String(100), nullable=False)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     username = db.Column(db.String(150), nullable=False)
     date = db.Column(db.DateTime, default=lambda: datetime.now(au_tz))
+
+    fixture = db.relationship("FixtureFree")
     
     __table_args__ = (
-        db.UniqueConstraint('user_id', 'match', name='unique_user_match'),
+        db.UniqueConstraint('user_id', 'fixture_id', name='unique_user_fixture'),
+        db.Index('ix_tip_season_user', 'season', 'user_id'),
+        db.Index('ix_tip_fixture', 'fixture_id'),
     )
 
 class TipIntelligenceReport(db.Model):
     __tablename__ = "tip_intelligence_reports"
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    fixture_id = db.Column(db.Integer, db.ForeignKey("fixture_free.id"), nullable=False)
     match_id = db.Column(db.String, db.ForeignKey("fixture_free.match_id"), nullable=False)
     round_number = db.Column(db.Integer, nullable=False)
     report_content = db.Column(db.Text, nullable=False)
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(au_tz))
 
     __table_args__ = (
-        db.UniqueConstraint("user_id", "match_id", name="unique_user_match_report"),
+        db.UniqueConstraint("user_id", "fixture_id", name="unique_user_fixture_report"),
     )
 
 class Fixture(db.Model):
@@ -72,19 +93,31 @@ class FixtureFree(db.Model):
     away_score = db.Column(db.Integer, nullable=True)
     date = db.Column(db.Date, nullable=True)
     time = db.Column(db.Time, nullable=True)
+    # Latest score seen while the game is in progress. home_score/away_score
+    # only ever hold a final result, which is what tips are scored on.
+    live_home_score = db.Column(db.Integer, nullable=True)
+    live_away_score = db.Column(db.Integer, nullable=True)
+
+    __table_args__ = (
+        db.Index('ix_fixture_free_season_round', 'season', 'round'),
+    )
     
-    @classmethod
-    def get_winning_team(cls, match_id):
-        fixture = cls.query.filter_by(match_id=match_id).first()
-        if not fixture or fixture.home_score is None or fixture.away_score is None:
-            return None  # No result yet or match not found
+    @property
+    def winning_team(self):
+        if self.home_score is None or self.away_score is None:
+            return None  # No result yet
 
-        if fixture.home_score > fixture.away_score:
-            return fixture.home_team
-        elif fixture.away_score > fixture.home_score:
-            return fixture.away_team
+        if self.home_score > self.away_score:
+            return self.home_team
+        elif self.away_score > self.home_score:
+            return self.away_team
         else:
             return "Draw"
+
+    @classmethod
+    def get_winning_team(cls, match_id):
+        fixture = cls.query.filter_by(match_id=match_id).first()
+        return fixture.winning_team if fixture else None
     
     #__table_args__ = (db.UniqueConstraint('season', 'round', 'home_team', 'away_team', name='_unique_fixture'),)
     
@@ -94,6 +127,7 @@ class UserTipStats(db.Model):
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    season = db.Column(db.Integer, db.ForeignKey("seasons.year"), nullable=False)
     round_number = db.Column(db.Integer, nullable=True)
     successful_tips = db.Column(db.Integer, default=0)
     failed_tips = db.Column(db.Integer, default=0)
@@ -101,19 +135,57 @@ class UserTipStats(db.Model):
     bonus_tips = db.Column(db.Integer, default=0)
 
     user = db.relationship('User', backref=db.backref('tip_stats', lazy=True))
+
+    __table_args__ = (
+        db.Index('ix_user_tip_stats_season_user_round', 'season', 'user_id', 'round_number'),
+    )
     
     
+class UserSeasonTotals(db.Model):
+    """Running per-user totals for a season, kept in step with UserTipStats.
+
+    update_user_tip_stats applies each round's change as a delta, so the
+    leaderboard reads one row per user instead of summing every round.
+    """
+    __tablename__ = "user_season_totals"
+    id = db.Column(db.Integer, primary_key=True)
+    season = db.Column(db.Integer, db.ForeignKey("seasons.year"), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    successful_tips = db.Column(db.Integer, nullable=False, default=0)
+    failed_tips = db.Column(db.Integer, nullable=False, default=0)
+    pending_tips = db.Column(db.Integer, nullable=False, default=0)
+    bonus_tips = db.Column(db.Integer, nullable=False, default=0)
+    total_points = db.Column(db.Integer, nullable=False, default=0)  # successful_tips + bonus_tips
+    perfect_rounds = db.Column(db.Integer, nullable=False, default=0)
+    current_streak = db.Column(db.Integer, nullable=False, default=0)  # consecutive perfect rounds up to last_round
+    last_round = db.Column(db.Integer, nullable=True)
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(au_tz), onupdate=lambda: datetime.now(au_tz))
+
+    user = db.relationship("User")
+
+    __table_args__ = (
+        db.UniqueConstraint("season", "user_id", name="unique_season_user_totals"),
+        db.Index("ix_user_season_totals_season_points", "season", "total_points"),
+    )
+
+
 class ChatMessage(db.Model):
     __tablename__ = 'chat_messages'
     id = db.Column(db.Integer, primary_key = True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    season = db.Column(db.Integer, db.ForeignKey("seasons.year"), nullable=False)
     round_number = db.Column(db.Integer, nullable=False)
+    fixture_id = db.Column(db.Integer, db.ForeignKey("fixture_free.id"), nullable=True, index=True)
     match_id = db.Column(db.String, db.ForeignKey("fixture_free.match_id"), nullable=True)
     message = db.Column(db.Text, nullable=False)
     timestamp = db.Column(db.DateTime, default=lambda: datetime.now(au_tz))
     
     user = db.relationship("User", backref="chat_messages")
-    match = db.relationship("FixtureFree", backref="chat_messages")
+    match = db.relationship("FixtureFree", foreign_keys=[fixture_id], backref="chat_messages")
+
+    __table_args__ = (
+        db.Index('ix_chat_messages_season_round', 'season', 'round_number', 'timestamp'),
+    )
 
 class DeveloperMessage(db.Model):
     __tablename__ = "developer_messages"
@@ -121,4 +193,136 @@ class DeveloperMessage(db.Model):
     message = db.Column(db.Text, nullable=False)
     is_visible = db.Column(db.Boolean, default=False, nullable=False)
     updated_at = db.Column(db.DateTime, default=lambda: datetime.now(au_tz), onupdate=lambda: datetime.now(au_tz))
-    
\ No newline at end of file
+    
+
+class JobRun(db.Model):
+    __tablename__ = "job_runs"
+    id = db.Column(db.Integer, primary_key=True)
+    job_name = db.Column(db.String(100), nullable=False, index=True)
+    status = db.Column(db.String(20), nullable=False)  # running, success, failed
+    # The trigger's fire time (Sydney local); unique per job so each slot runs
+    # once across processes. NULL for manual runs.
+    scheduled_for = db.Column(db.DateTime, nullable=True)
+    started_at = db.Column(db.DateTime, nullable=False, default=lambda: datetime.now(au_tz))
+    finished_at = db.Column(db.DateTime, nullable=True)
+    duration_ms = db.Column(db.Integer, nullable=True)
+    detail = db.Column(db.Text, nullable=True)
+
+    __table_args__ = (db.UniqueConstraint("job_name", "scheduled_for", name="uq_job_runs_job_slot"),)
+
+
+class AgentRun(db.Model):
+    """One agent call (or a whole report served/generated) in a report or tipperbot run."""
+    __tablename__ = "agent_runs"
+    id = db.Column(db.Integer, primary_key=True)
+    job = db.Column(db.String(30), nullable=False)  # report, tipperbot
+    run_id = db.Column(db.String(32), nullable=False, index=True)  # groups the stages of one pipeline run
+    season = db.Column(db.Integer, db.ForeignKey("seasons.year"), nullable=True)
+    round_number = db.Column(db.Integer, nullable=True)
+    fixture_id = db.Column(db.Integer, db.ForeignKey("fixture_free.id"), nullable=True)
+    stage = db.Column(db.String(30), nullable=False)  # planner, search, analyst, picker, report
+    agent_name = db.Column(db.String(100), nullable=True)
+    model = db.Column(db.String(50), nullable=True)
+    started_at = db.Column(db.DateTime, nullable=False, default=lambda: datetime.now(au_tz))
+    duration_ms = db.Column(db.Integer, nullable=False, default=0)
+    requests = db.Column(db.Integer, nullable=False, default=0)
+    input_tokens = db.Column(db.Integer, nullable=False, default=0)
+    output_tokens = db.Column(db.Integer, nullable=False, default=0)
+    tool_calls = db.Column(db.Integer, nullable=False, default=0)
+    cost_usd = db.Column(db.Float, nullable=False, default=0.0)
+    outcome = db.Column(db.String(20), nullable=False)  # ok, error, cached
+    error = db.Column(db.String(500), nullable=True)
+
+    __table_args__ = (
+        db.Index("ix_agent_runs_season_round", "season", "round_number"),
+        db.Index("ix_agent_runs_fixture", "fixture_id"),
+    )
+
+
+class ResearchCacheEntry(db.Model):
+    """A web search summary shared by every report and tipperbot run in a round."""
+    __tablename__ = "research_cache"
+    id = db.Column(db.Integer, primary_key=True)
+    season = db.Column(db.Integer, db.ForeignKey("seasons.year"), nullable=False)
+    round_number = db.Column(db.Integer, nullable=False)
+    query_key = db.Column(db.String(64), nullable=False)  # sha256 of the normalized query
+    query_text = db.Column(db.String(500), nullable=False)
+    summary = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+    __table_args__ = (
+        db.UniqueConstraint("season", "round_number", "query_key", name="unique_research_query"),
+    )
+
+
+class FixtureResearch(db.Model):
+    """The planner's searches and their summaries for one fixture.
+
+    Written by whichever of the match report or tipperbot researches the
+    fixture first; the other reuses it while it is fresh.
+    """
+    __tablename__ = "fixture_research"
+    id = db.Column(db.Integer, primary_key=True)
+    fixture_id = db.Column(db.Integer, db.ForeignKey("fixture_free.id"), nullable=False, unique=True)
+    season = db.Column(db.Integer, db.ForeignKey("seasons.year"), nullable=False)
+    round_number = db.Column(db.Integer, nullable=False)
+    search_count = db.Column(db.Integer, nullable=False)
+    searches = db.Column(db.JSON, nullable=False)  # [{"query", "reason", "summary"}, ...]
+    created_at = db.Column(db.DateTime, nullable=False)
+
+
+class MatchReport(db.Model):
+    """The latest match report for a fixture, served to anyone who asks for it.
+
+    ``inputs_key`` hashes the fixture details and research the report was
+    written from, so a refresh can tell whether rewriting it would change
+    anything.
+    """
+    __tablename__ = "match_reports"
+    id = db.Column(db.Integer, primary_key=True)
+    fixture_id = db.Column(db.Integer, db.ForeignKey("fixture_free.id"), nullable=False, unique=True)
+    season = db.Column(db.Integer, db.ForeignKey("seasons.year"), nullable=False)
+    round_number = db.Column(db.Integer, nullable=False)
+    report_content = db.Column(db.Text, nullable=False)
+    inputs_key = db.Column(db.String(64), nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False)
+
+
+class JobLease(db.Model):
+    __tablename__ = "job_leases"
+    job_name = db.Column(db.String(100), primary_key=True)
+    holder = db.Column(db.String(200), nullable=False)
+    acquired_at = db.Column(db.DateTime, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False)
+
+
+
+class SeasonUserSummary(db.Model):
+    """Final per-user totals for an archived season."""
+    __tablename__ = "season_user_summaries"
+    id = db.Column(db.Integer, primary_key=True)
+    season = db.Column(db.Integer, db.ForeignKey("seasons.year"), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    username = db.Column(db.String(150), nullable=False)
+    successful_tips = db.Column(db.Integer, nullable=False, default=0)
+    failed_tips = db.Column(db.Integer, nullable=False, default=0)
+    bonus_tips = db.Column(db.Integer, nullable=False, default=0)
+    perfect_rounds = db.Column(db.Integer, nullable=False, default=0)
+    final_rank = db.Column(db.Integer, nullable=True)
+
+    __table_args__ = (
+        db.UniqueConstraint("season", "user_id", name="unique_season_user_summary"),
+    )
+
+
+class DataVersion(db.Model):
+    """Change counter per data scope ("fixtures", "tips", "standings").
+
+    Writers bump their scope in the same transaction as the change; API
+    responses are cached and ETagged on the versions they read.
+    """
+    __tablename__ = "data_versions"
+    scope = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(au_tz), onupdate=lambda: datetime.now(au_tz))
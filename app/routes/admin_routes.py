@@ -1,65 +1,73 @@
-from flask import Blueprint, render_template, redirect, url_for, request, current_app
+from flask import Blueprint, render_template, redirect, url_for, request, current_app, Response, stream_with_context, abort, flash, jsonify
 from flask_login import login_required, current_user
-from app.models import User, Tip, FixtureFree, DeveloperMessage
-from datetime import date
+from app.models import User, DeveloperMessage
+from datetime import date, datetime
 from app import db
 from app.services.fixtures import find_current_round
+from app.services.tips import auto_assign_missing_tips
+from app.services.exports import EXPORT_FORMATS, iter_tip_export
+from app.services.data_version import STANDINGS, TIPS, bump_data_version
+from app.services.telemetry import telemetry_summary
+from app.utils.helper_functions import get_round_submission_status
+from app.routes.api_routes import RESPONSE_CACHE as API_RESPONSE_CACHE
+from app.routes.tip_routes import REPORT_CACHE, REPORT_ERRORS, REPORT_QUEUE, REPORT_STREAMS_BUDGET
+from app.utils.user_cache import invalidate_user, user_is_admin
 from werkzeug.utils import secure_filename
 import os
 
 admin_bp = Blueprint("admin", __name__)
+_AVATAR_CHOICES = None
+
+def _avatar_choices():
+    # The avatars folder only changes on deploy, so list it once per process.
+    global _AVATAR_CHOICES
+    if _AVATAR_CHOICES is None:
+        avatar_folder = os.path.join(current_app.static_folder, "avatars")
+        _AVATAR_CHOICES = sorted([f for f in os.listdir(avatar_folder) if f.endswith((".png", ".jpg", ".jpeg"))])
+    return _AVATAR_CHOICES
+
+def _serialize_submission_status(status):
+    return [
+        {
+            **row,
+            "last_submitted": row["last_submitted"].isoformat() if row["last_submitted"] else None,
+        }
+        for row in status
+    ]
 
 @admin_bp.route("/admin", methods=["GET", "POST"])
 @login_required
 def admin_dashboard():
-    if not current_user.is_admin:
-        return redirect(url_for("main.index"))
+    if not user_is_admin(current_user):
+        return redirect(url_for("main.home"))
 
     current_round = find_current_round()
 
-    users = User.query.all()
-    if current_round:
-        current_fixtures = FixtureFree.query.filter_by(round=current_round).all()
-        current_match_ids = [f.match_id for f in current_fixtures]
-    else:
-        current_fixtures = []
-        current_match_ids = []
-    avatar_folder = os.path.join(current_app.static_folder, "avatars")
-    avatars = sorted([f for f in os.listdir(avatar_folder) if f.endswith((".png", ".jpg", ".jpeg"))])
-
-    tips_by_user = {}
-    for user in users:
-        if current_match_ids:
-            tips = Tip.query.filter(Tip.user_id == user.id, Tip.match.in_(current_match_ids)).all()
-        else:
-            tips = []
-        tips_by_user[user.id] = tips
-
-    # Handle Change Username form submission
-    username_update_success = False
-    username_update_error = None
-    register_success = False
-    register_error = None
-    developer_message = DeveloperMessage.query.first()
-
     if request.method == "POST":
+        # Post/Redirect/Get: handle the action, flash the outcome and let the
+        # follow-up GET do the (single) dashboard render.
         action = request.form.get("action")
+        tab = "user-tips"
         if action == "change_username":
+            tab = "change-username"
             user_id = request.form["user_id"]
             new_username = request.form["new_username"].strip()
 
             existing_user = User.query.filter_by(username=new_username).first()
             if existing_user:
-                username_update_error = "Username already taken."
+                flash("Username already taken.", "danger")
             else:
                 user = User.query.get(user_id)
                 if user:
                     user.username = new_username
+                    bump_data_version(TIPS, STANDINGS)
                     db.session.commit()
-                    username_update_success = True
+                    invalidate_user(user.id)
+                    flash("Username updated successfully.", "success")
                 else:
-                    username_update_error = "User not found."
+                    flash("User not found.", "danger")
         elif action == "register_user":
+            tab = "register"
             name = request.form.get("name", "").strip()
             username = request.form.get("username", "").strip()
             password = request.form.get("password", "")
@@ -67,11 +75,11 @@ def admin_dashboard():
             avatar = request.form.get("avatar", "").strip()
 
             if not username or not password:
-                register_error = "Username and password are required."
+                flash("Username and password are required.", "danger")
             elif User.query.filter_by(username=username).first():
-                register_error = "Username already exists."
-            elif avatar and avatar not in avatars:
-                register_error = "Invalid avatar selection."
+                flash("Username already exists.", "danger")
+            elif avatar and avatar not in _avatar_choices():
+                flash("Invalid avatar selection.", "danger")
             else:
                 new_user = User(
                     name=name or None,
@@ -82,10 +90,12 @@ def admin_dashboard():
                 new_user.set_password(password)
                 db.session.add(new_user)
                 db.session.commit()
-                register_success = True
+                flash("User created successfully.", "success")
         elif action == "developer_message":
+            tab = "developer-message"
             message_text = request.form.get("developer_message", "").strip()
             is_visible = request.form.get("developer_message_visible") == "on"
+            developer_message = DeveloperMessage.query.first()
             if not developer_message:
                 developer_message = DeveloperMessage(message=message_text, is_visible=is_visible)
                 db.session.add(developer_message)
@@ -93,16 +103,79 @@ def admin_dashboard():
                 developer_message.message = message_text
                 developer_message.is_visible = is_visible
             db.session.commit()
+            flash("Developer message saved.", "success")
+        elif action == "auto_assign_tips" and current_round:
+            created_by_user = auto_assign_missing_tips(current_round)
+            flash(f"Auto-assigned {sum(created_by_user.values())} missing tips.", "success")
+        return redirect(url_for("admin.admin_dashboard", tab=tab))
+
+    users = User.query.order_by(User.username).all()
+    submission_status = get_round_submission_status(current_round)
 
     return render_template(
         "admin.html",
         users=users,
-        tips_by_user=tips_by_user,
+        submission_status=submission_status,
         round=current_round,
-        username_update_success=username_update_success,
-        username_update_error=username_update_error,
-        register_success=register_success,
-        register_error=register_error,
-        avatars=avatars,
-        developer_message=developer_message,
+        active_tab=request.args.get("tab", "user-tips"),
+        avatars=_avatar_choices(),
+        developer_message=DeveloperMessage.query.first(),
+        telemetry=telemetry_summary(),
+    )
+
+@admin_bp.route("/admin/submission-status")
+@login_required
+def submission_status():
+    if not user_is_admin(current_user):
+        abort(403)
+
+    current_round = find_current_round()
+    return jsonify({
+        "round": current_round,
+        "users": _serialize_submission_status(get_round_submission_status(current_round)),
+    })
+
+@admin_bp.route("/admin/cache-stats")
+@login_required
+def cache_stats():
+    if not user_is_admin(current_user):
+        abort(403)
+
+    return jsonify({
+        "report_cache": REPORT_CACHE.stats(),
+        "report_errors": REPORT_ERRORS.stats(),
+        "api_responses": API_RESPONSE_CACHE.stats(),
+        "report_queue": REPORT_QUEUE.stats(),
+        "report_streams": REPORT_STREAMS_BUDGET.stats(),
+    })
+
+@admin_bp.route("/admin/export/tips")
+@login_required
+def export_tips():
+    if not user_is_admin(current_user):
+        abort(403)
+
+    fmt = request.args.get("format", "csv")
+    if fmt not in EXPORT_FORMATS:
+        abort(400)
+    mimetype, extension = EXPORT_FORMATS[fmt]
+
+    try:
+        chunks = iter_tip_export(
+            fmt,
+            season=request.args.get("season", type=int),
+            round_number=request.args.get("round", type=int),
+            user_id=request.args.get("user_id", type=int),
+        )
+    except RuntimeError as exc:
+        return str(exc), 501
+
+    filename = f"tips_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{extension}"
+    return Response(
+        stream_with_context(chunks),
+        mimetype=mimetype,
+        headers={
+            "Content-Disposition": f"attachment; filename={filename}",
+            "X-Accel-Buffering": "no",
+        },
     )
@@ -0,0 +1,366 @@
+import base64
+import hashlib
+import json
+from datetime import date, datetime, time
+
+from flask import Blueprint, Response, jsonify, request
+from flask_login import current_user
+
+from app import db
+from app.models import FixtureFree, Tip, User
+from app.services.data_version import FIXTURES, STANDINGS, TIPS, get_data_versions
+from app.services.fixtures import find_current_round
+from app.services.projections import PROBABILITY_MODELS, project_standings
+from app.services.seasons import get_current_season, get_season, round_fixtures_query
+from app.services.tips import get_visible_fixtures
+from app.utils.helper_functions import get_all_rounds, get_leaderboard, get_user_round_history
+from app.utils.ttl_cache import TTLCache
+
+try:
+    import orjson
+except ImportError:  # optional: the stdlib encoder works, just slower
+    orjson = None
+
+api_bp = Blueprint("api", __name__, url_prefix="/api/v1")
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+# Serialized response bodies keyed on the request and the data versions they
+# were built from, so a write elsewhere simply makes old entries unreachable.
+RESPONSE_CACHE = TTLCache(maxsize=512, ttl_seconds=300, max_bytes=16 * 1024 * 1024)
+
+FIXTURE_FIELDS = (
+    "id", "match_id", "season", "round", "home_team", "away_team",
+    "home_score", "away_score", "date", "time", "winning_team",
+)
+TIP_FIELDS = (
+    "id", "fixture_id", "match_id", "round", "user_id", "username",
+    "selected_team", "submitted_at", "correct",
+)
+LEADERBOARD_FIELDS = ("rank", "username", "total_success", "total_pending")
+PROJECTION_FIELDS = ("username", "points", "expected_points", "win_probability", "top3_probability")
+ROUND_HISTORY_FIELDS = ("round", "total_success", "total_pending", "running_total_success")
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+@api_bp.errorhandler(ApiError)
+def _api_error(exc):
+    return jsonify({"error": exc.message}), exc.status
+
+
+@api_bp.before_request
+def _require_login():
+    # login_required would redirect to the HTML login page; API clients want a 401.
+    if not current_user.is_authenticated:
+        return jsonify({"error": "Authentication required."}), 401
+
+
+def _default(value):
+    if isinstance(value, (date, datetime, time)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _dumps(payload):
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, separators=(",", ":"), default=_default).encode()
+
+
+def _encode_cursor(value):
+    return base64.urlsafe_b64encode(json.dumps(value).encode()).decode().rstrip("=")
+
+
+def _decode_cursor(token):
+    """The non-negative integer key or offset a cursor carries."""
+    try:
+        value = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+    except ValueError:
+        raise ApiError(400, "Invalid cursor.")
+    if not isinstance(value, int) or isinstance(value, bool) or value < 0:
+        raise ApiError(400, "Invalid cursor.")
+    return value
+
+
+def _season():
+    if "season" not in request.args:
+        return get_current_season()
+    season = get_season(request.args.get("season", type=int))
+    if season is None:
+        raise ApiError(404, "Unknown season.")
+    return season
+
+
+def _fields(allowed):
+    """Parse ``?fields=a,b`` against the endpoint's allowed fields (None = all)."""
+    raw = request.args.get("fields")
+    if not raw:
+        return None
+    fields = [f.strip() for f in raw.split(",") if f.strip()]
+    unknown = sorted(set(fields) - set(allowed))
+    if unknown:
+        raise ApiError(400, f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(allowed)}.")
+    return fields
+
+
+def _page_args():
+    limit = request.args.get("limit", DEFAULT_PAGE_SIZE, type=int)
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    cursor = request.args.get("cursor")
+    return limit, (_decode_cursor(cursor) if cursor else None)
+
+
+def _keyset_page(query, column, limit, after):
+    """Fetch one page of ``query`` ordered by the unique ``column``.
+
+    The cursor is the last key returned, so each page is an index range scan
+    rather than an OFFSET over everything before it.
+    """
+    if after is not None:
+        query = query.filter(column > after)
+    rows = query.order_by(column).limit(limit + 1).all()
+    return rows[:limit], len(rows) > limit
+
+
+def _list_page(rows, limit, after):
+    """Page an already-materialized list; the cursor is the next offset."""
+    start = after or 0
+    return rows[start:start + limit], (start + limit if start + limit < len(rows) else None)
+
+
+def _select(items, fields):
+    if fields is None:
+        return items
+    return [{f: item[f] for f in fields} for item in items]
+
+
+def _cached_response(scopes, build, personal=False, extra=()):
+    """Serve ``build()`` as JSON, cached and ETagged on the given data scopes.
+
+    The key covers the endpoint, its query string, the caller (for personal
+    endpoints), the current version of each scope read, and any ``extra``
+    state such as which fixtures are visible right now.
+    """
+    versions = get_data_versions()
+    key = (
+        request.endpoint,
+        tuple(sorted(request.view_args.items())),
+        tuple(sorted(request.args.items(multi=True))),
+        current_user.id if personal else None,
+        tuple(versions[scope] for scope in scopes),
+        extra,
+    )
+    etag = hashlib.sha1(repr(key).encode()).hexdigest()
+    if etag in request.if_none_match:
+        response = Response(status=304)
+        response.set_etag(etag)
+        return response
+
+    body = RESPONSE_CACHE.get(key)
+    if body is None:
+        body = _dumps(build())
+        RESPONSE_CACHE.set(key, body)
+
+    response = Response(body, mimetype="application/json")
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
+
+
+def _fixture_dict(fixture):
+    return {
+        "id": fixture.id,
+        "match_id": fixture.match_id,
+        "season": fixture.season,
+        "round": fixture.round,
+        "home_team": fixture.home_team,
+        "away_team": fixture.away_team,
+        "home_score": fixture.home_score,
+        "away_score": fixture.away_score,
+        "date": fixture.date.isoformat() if fixture.date else None,
+        "time": fixture.time.strftime("%H:%M") if fixture.time else None,
+        "winning_team": fixture.winning_team,
+    }
+
+
+def _tip_dict(tip, fixture):
+    winner = fixture.winning_team
+    return {
+        "id": tip.id,
+        "fixture_id": tip.fixture_id,
+        "match_id": fixture.match_id,
+        "round": fixture.round,
+        "user_id": tip.user_id,
+        "username": tip.username,
+        "selected_team": tip.selected_team,
+        "submitted_at": tip.date.isoformat() if tip.date else None,
+        "correct": None if winner is None else tip.selected_team == winner,
+    }
+
+
+def _tip_query():
+    return db.session.query(Tip, FixtureFree).join(FixtureFree, FixtureFree.id == Tip.fixture_id)
+
+
+@api_bp.route("/rounds")
+def rounds():
+    season = _season()
+    current_round = find_current_round() if season.is_current else None
+
+    def build():
+        return {
+            "season": season.year,
+            "current_round": current_round,
+            "data": [{"round": r} for r in get_all_rounds(season.year)],
+        }
+
+    return _cached_response((FIXTURES,), build, extra=(current_round,))
+
+
+@api_bp.route("/rounds/<int:round_number>/fixtures")
+def round_fixtures(round_number):
+    season = _season()
+    fields = _fields(FIXTURE_FIELDS)
+    limit, after = _page_args()
+
+    def build():
+        fixtures, has_more = _keyset_page(round_fixtures_query(round_number, season.year), FixtureFree.id, limit, after)
+        return {
+            "season": season.year,
+            "round": round_number,
+            "data": _select([_fixture_dict(f) for f in fixtures], fields),
+            "next_cursor": _encode_cursor(fixtures[-1].id) if has_more else None,
+        }
+
+    return _cached_response((FIXTURES,), build)
+
+
+@api_bp.route("/me/tips")
+def my_tips():
+    season = _season()
+    fields = _fields(TIP_FIELDS)
+    limit, after = _page_args()
+    round_number = request.args.get("round", type=int)
+
+    def build():
+        query = _tip_query().filter(Tip.user_id == current_user.id, FixtureFree.season == season.year)
+        if round_number is not None:
+            query = query.filter(FixtureFree.round == round_number)
+        rows, has_more = _keyset_page(query, Tip.id, limit, after)
+        return {
+            "season": season.year,
+            "data": _select([_tip_dict(tip, fixture) for tip, fixture in rows], fields),
+            "next_cursor": _encode_cursor(rows[-1][0].id) if has_more else None,
+        }
+
+    return _cached_response((TIPS, FIXTURES), build, personal=True)
+
+
+@api_bp.route("/rounds/<int:round_number>/tips")
+def round_tips(round_number):
+    """Everyone's tips for a round, under the same visibility rules as view_tips."""
+    season = _season()
+    fields = _fields(TIP_FIELDS)
+    limit, after = _page_args()
+
+    fixtures = round_fixtures_query(round_number, season.year).all()
+    visible_fixtures, visibility_message = get_visible_fixtures(fixtures, round_number, season)
+    visible_ids = sorted(f.id for f in visible_fixtures)
+
+    def build():
+        query = (
+            _tip_query()
+            .join(User, User.id == Tip.user_id)
+            .filter(FixtureFree.id.in_([f.id for f in fixtures]))
+            .filter(User.username != 'testing_db2')
+            # Your own tips are always visible; others' only once revealed.
+            .filter((Tip.user_id == current_user.id) | Tip.fixture_id.in_(visible_ids))
+        )
+        rows, has_more = _keyset_page(query, Tip.id, limit, after)
+        return {
+            "season": season.year,
+            "round": round_number,
+            "visibility_message": visibility_message,
+            "data": _select([_tip_dict(tip, fixture) for tip, fixture in rows], fields),
+            "next_cursor": _encode_cursor(rows[-1][0].id) if has_more else None,
+        }
+
+    return _cached_response((TIPS, FIXTURES), build, personal=True, extra=tuple(visible_ids))
+
+
+@api_bp.route("/leaderboard")
+def leaderboard():
+    season = _season()
+    fields = _fields(LEADERBOARD_FIELDS)
+    limit, after = _page_args()
+
+    def build():
+        rows = [
+            {
+                "rank": row.rank,
+                "username": row.username,
+                "total_success": row.total_success,
+                "total_pending": row.total_pending,
+            }
+            for row in get_leaderboard(season.year)
+        ]
+        page, next_offset = _list_page(rows, limit, after)
+        return {
+            "season": season.year,
+            "archived": season.archived_at is not None,
+            "data": _select(page, fields),
+            "next_cursor": _encode_cursor(next_offset) if next_offset is not None else None,
+        }
+
+    return _cached_response((STANDINGS,), build)
+
+
+@api_bp.route("/leaderboard/projection")
+def leaderboard_projection():
+    season = _season()
+    fields = _fields(PROJECTION_FIELDS)
+    model = request.args.get("model", "elo")
+    if model not in PROBABILITY_MODELS:
+        raise ApiError(400, f"model must be one of: {', '.join(PROBABILITY_MODELS)}.")
+
+    def build():
+        rows = [] if season.archived_at else project_standings(season.year, model=model)
+        return {
+            "season": season.year,
+            "model": model,
+            "data": _select(rows, fields),
+        }
+
+    return _cached_response((FIXTURES, TIPS, STANDINGS), build)
+
+
+@api_bp.route("/me/rounds")
+def my_round_history():
+    season = _season()
+    fields = _fields(ROUND_HISTORY_FIELDS)
+
+    def build():
+        return {
+            "season": season.year,
+            "data": _select(
+                [
+                    {
+                        "round": row.round_number,
+                        "total_success": row.total_success,
+                        "total_pending": row.total_pending,
+                        "running_total_success": row.running_total_success,
+                    }
+                    for row in get_user_round_history(current_user.id, season.year)
+                ],
+                fields,
+            ),
+        }
+
+    return _cached_response((STANDINGS,), build, personal=True)
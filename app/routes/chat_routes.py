@@ -6,6 +6,7 @@ from datetime import datetime
 import pytz
 from app.models import db, ChatMessage
 from app.services.fixtures import find_current_round
+from app.services.seasons import current_season_year
 
 chat_bp = Blueprint('chat', __name__)
 SYDNEY_TZ = pytz.timezone("Australia/Sydney")
@@ -24,7 +25,7 @@ def chat():
     chat_messages = []
     if round_number:
         chat_messages = (
-            ChatMessage.query.filter_by(round_number=round_number)
+            ChatMessage.query.filter_by(season=current_season_year(), round_number=round_number)
             .order_by(ChatMessage.timestamp.asc())
             .all()
         )
@@ -49,6 +50,7 @@ def post_message():
     if message:
         new_msg = ChatMessage(
             user_id=current_user.id,
+            season=current_season_year(),
             round_number=round_number,
             message=message,
             timestamp=datetime.utcnow()
@@ -73,7 +75,7 @@ def get_messages():
     if not round_number:
         return jsonify({"error": "Chat is unavailable until fixtures are loaded."}), 400
 
-    messages = ChatMessage.query.filter_by(round_number=round_number).order_by(ChatMessage.timestamp.asc()).all()
+    messages = ChatMessage.query.filter_by(season=current_season_year(), round_number=round_number).order_by(ChatMessage.timestamp.asc()).all()
     
     result = [{
         "username": msg.user.username,
@@ -4,6 +4,7 @@ from flask import Blueprint, render_template, redirect, url_for, flash
 from flask_login import login_required, logout_user, current_user
 from app.models import ChatMessage, FixtureFree, Tip, DeveloperMessage
 from app.services.fixtures import find_current_round
+from app.services.seasons import current_season_year, round_fixtures_query
 from app.utils.helper_functions import get_user_rank
 from app.utils.team_logos import TEAM_LOGOS
 from datetime import datetime
@@ -17,25 +18,26 @@ def home():
     # if not current_user.is_authenticated:
     #     return redirect(url_for('auth.register'))
     round_number = find_current_round()
+    season = current_season_year()
     fixtures = (
-        FixtureFree.query.filter_by(round=round_number)
+        round_fixtures_query(round_number, season)
         .order_by(FixtureFree.date)
         .all()
         if round_number
         else []
     )
-    match_ids = [f.match_id for f in fixtures]
+    fixture_ids = [f.id for f in fixtures]
     rank = None
     tips = []
     if current_user.is_authenticated:
         rank = get_user_rank(current_user.username)
-        if match_ids:
-            tips = Tip.query.filter(Tip.user_id == current_user.id, Tip.match.in_(match_ids)).all()
-    tip_map = {tip.match: tip.selected_team for tip in tips}
+        if fixture_ids:
+            tips = Tip.query.filter(Tip.user_id == current_user.id, Tip.fixture_id.in_(fixture_ids)).all()
+    tip_map = {tip.fixture_id: tip.selected_team for tip in tips}
     chat_messages = []
     if round_number:
         chat_messages = (
-            ChatMessage.query.filter_by(round_number=round_number)
+            ChatMessage.query.filter_by(season=season, round_number=round_number)
             .order_by(ChatMessage.timestamp.asc())
             .all()
         )
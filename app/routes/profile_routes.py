@@ -4,6 +4,7 @@ from werkzeug.security import check_password_hash, generate_password_hash
 from werkzeug.utils import secure_filename
 from app import db
 from app.models import User  # Assuming your User model is here
+from app.utils.user_cache import invalidate_user
 import os
 
 profile_bp = Blueprint('profile', __name__)
@@ -28,8 +29,10 @@ def update_password():
         new_password = request.form.get('new_password')
         confirm_password = request.form.get('confirm_password')
 
+        user = User.query.get(current_user.id)
+
         # Check if current password matches
-        if not current_user.check_password(current_password):
+        if not user.check_password(current_password):
             flash('Current password is incorrect', 'danger')
             return redirect(url_for('profile.profile'))
 
@@ -39,8 +42,9 @@ def update_password():
             return redirect(url_for('profile.profile'))
 
         # Update password
-        current_user.set_password(new_password)
+        user.set_password(new_password)
         db.session.commit()
+        invalidate_user(user.id)
         flash('Password updated successfully', 'success')
         return redirect(url_for('profile.profile'))
 
@@ -55,8 +59,10 @@ def update_avatar():
     
     selected_avatar = request.form.get('selected_avatar')
     if selected_avatar and selected_avatar in avatars:
-        current_user.avatar = secure_filename(selected_avatar)
+        user = User.query.get(current_user.id)
+        user.avatar = secure_filename(selected_avatar)
         db.session.commit()
+        invalidate_user(user.id)
         flash('Avatar updated!', 'success')
         return redirect(url_for('profile.profile'))  # Adjust to your profile route
     else:
@@ -1,125 +1,195 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, current_app
+from flask import Blueprint, Response, render_template, request, redirect, url_for, flash, jsonify, current_app
+import math
+import os
+import threading
 import traceback
-from concurrent.futures import ThreadPoolExecutor
 from flask_login import login_required, current_user
 from app.models import db, Tip, FixtureFree, User, TipIntelligenceReport
 from app.utils.team_logos import TEAM_LOGOS
 from datetime import date, datetime, timedelta
 from app.utils.helper_functions import get_all_rounds, is_past_round_tips_cutoff
 from app.services.fixtures import find_current_round
+from app.services.seasons import get_all_seasons, get_current_season, get_season, round_fixtures_query
 from app.services.analyst_agent import generate_match_report
+from app.services.match_reports import get_shared_report, save_shared_report
+from app.services.report_queue import ConnectionBudget, FairJobQueue, QueueFull
+from app.services.report_stream import SSE_HEARTBEAT, ReportStream, sse_event
+from app.services.telemetry import record_cached_report
+from app.utils.ttl_cache import TTLCache
+from app.services.tips import get_open_fixtures, get_visible_fixtures, resolve_picks, upsert_tips
 import pytz
 
 tip_bp = Blueprint('tip', __name__)
-REPORT_CACHE = {}
-REPORT_JOBS = {}
-REPORT_ERRORS = {}
-REPORT_TRACEBACKS = {}
+# Finished reports are also saved to TipIntelligenceReport; this just spares
+# the lookup while a round is hot. Failures expire so a transient error
+# (rate limit, timeout) doesn't stick to a match until someone cancels it.
+REPORT_CACHE = TTLCache(maxsize=256, ttl_seconds=6 * 60 * 60, max_bytes=8 * 1024 * 1024)
+REPORT_ERRORS = TTLCache(maxsize=256, ttl_seconds=10 * 60, sizeof=lambda e: len(e["error"]) + len(e["traceback"] or ""))
 REPORT_CANCELLED = set()
-REPORT_EXECUTOR = ThreadPoolExecutor(max_workers=1)
+REPORT_STREAMS = {}
+# Held across the queue check, submit and the REPORT_STREAMS write, so two
+# requests for the same report share one job and one stream.
+REPORT_JOBS_LOCK = threading.Lock()
+# One report pipeline at a time, taken round-robin across users; a user may
+# have two reports queued or running, and at most 20 wait in total. Waiting
+# jobs are polled, so they hold no connection.
+REPORT_QUEUE = FairJobQueue(workers=1, per_user_limit=2, max_depth=20)
+# Open report streams each hold a web thread (gunicorn --threads, 8 in the
+# Procfile and render.yaml; set WEB_THREADS if that changes). A quarter of
+# them at most, so page loads, tip saves and chat polls always have threads.
+WEB_THREADS = int(os.getenv("WEB_THREADS", "8"))
+REPORT_STREAMS_BUDGET = ConnectionBudget(limit=max(1, WEB_THREADS // 4))
 
 def _report_key(user_id, match_id):
     return f"{user_id}:{match_id}"
 
-def _generate_report_async(app, user_id, match_id, round_number, cache_key):
+def _generate_report_async(app, user_id, fixture_id, match_id, round_number, cache_key, stream):
     try:
         if cache_key in REPORT_CANCELLED:
             REPORT_CANCELLED.discard(cache_key)
             return
+        stream.publish("stage", {"stage": "planning"})
         with app.app_context():
-            report = generate_match_report(match_id)
+            report = generate_match_report(match_id, on_event=stream.publish)
             if not report:
-                REPORT_ERRORS[cache_key] = "Report generation returned empty output."
+                error = "Report generation returned empty output."
+                REPORT_ERRORS.set(cache_key, {"error": error, "traceback": None})
+                stream.publish("report_error", {"error": error})
             else:
+                save_shared_report(db.session.get(FixtureFree, fixture_id), report)
                 if cache_key not in REPORT_CANCELLED:
-                    REPORT_CACHE[cache_key] = report
+                    REPORT_CACHE.set(cache_key, report)
                     existing = TipIntelligenceReport.query.filter_by(
                         user_id=user_id,
-                        match_id=match_id
+                        fixture_id=fixture_id
                     ).first()
                     if not existing:
                         db.session.add(TipIntelligenceReport(
                             user_id=user_id,
+                            fixture_id=fixture_id,
                             match_id=match_id,
                             round_number=round_number,
                             report_content=report
                         ))
                         db.session.commit()
+                    stream.publish("done", {"report": report})
     except Exception as exc:
-        REPORT_ERRORS[cache_key] = f"{type(exc).__name__}: {exc}"
-        REPORT_TRACEBACKS[cache_key] = traceback.format_exc()
+        error = f"{type(exc).__name__}: {exc}"
+        REPORT_ERRORS.set(cache_key, {"error": error, "traceback": traceback.format_exc()})
+        stream.publish("report_error", {"error": error})
     finally:
-        REPORT_JOBS.pop(cache_key, None)
+        stream.close()
+        with REPORT_JOBS_LOCK:
+            if REPORT_STREAMS.get(cache_key) is stream:
+                REPORT_STREAMS.pop(cache_key, None)
+
+def _start_report_job(cache_key, fixture, round_number):
+    """Queue a report job unless one is already queued or running.
+
+    Returns its event stream, queue position (0 once running) and estimated
+    seconds until the report is done. Raises QueueFull if the user or the
+    queue is at its limit.
+    """
+    with REPORT_JOBS_LOCK:
+        if cache_key in REPORT_QUEUE:
+            position, eta = REPORT_QUEUE.status(cache_key)
+            return REPORT_STREAMS.get(cache_key), position, eta
+        stream = ReportStream()
+        stream.publish("stage", {"stage": "queued"})
+        app = current_app._get_current_object()
+        REPORT_CANCELLED.discard(cache_key)
+        REPORT_STREAMS[cache_key] = stream
+        try:
+            position, eta = REPORT_QUEUE.submit(
+                cache_key,
+                current_user.id,
+                _generate_report_async,
+                app,
+                current_user.id,
+                fixture.id,
+                fixture.match_id,
+                round_number,
+                cache_key,
+                stream
+            )
+        except QueueFull:
+            REPORT_STREAMS.pop(cache_key, None)
+            raise
+        REPORT_ERRORS.pop(cache_key)
+        # The job may already be running; the client only shows this while
+        # it is still on the "queued" stage.
+        stream.publish("queue", {"position": position, "eta_seconds": _seconds(eta)})
+        return stream, position, eta
+
+def _seconds(value):
+    return None if value is None else math.ceil(value)
+
+def _queue_full_response(exc):
+    retry_after = max(_seconds(exc.retry_after), 1)
+    response = jsonify({"error": str(exc), "retry_after": retry_after})
+    response.status_code = 429
+    response.headers["Retry-After"] = str(retry_after)
+    return response
+
+def _pending_response(position, eta):
+    # Poll again (within 2-30s) around when the report should be ready, or
+    # for a queued one when it should start, so the client can stream it.
+    wait = eta
+    if position and eta is not None:
+        wait = eta - REPORT_QUEUE.stats()["avg_duration_seconds"]
+    retry_after = min(max(_seconds(wait) or 2, 2), 30)
+    response = jsonify({"status": "pending", "position": position, "eta_seconds": _seconds(eta)})
+    response.status_code = 202
+    response.headers["Retry-After"] = str(retry_after)
+    return response
+
+def _report_fixture(match_id):
+    """The fixture a report was requested for, or a JSON error response."""
+    fixture = FixtureFree.query.filter_by(match_id=match_id).first()
+    if not fixture:
+        return None, (jsonify({"error": "Match not found."}), 404)
+    if fixture.round != find_current_round():
+        return None, (jsonify({"error": "Report is only available for the current round."}), 403)
+    return fixture, None
+
+def _finished_report(cache_key, fixture):
+    existing_report = TipIntelligenceReport.query.filter_by(
+        user_id=current_user.id,
+        fixture_id=fixture.id
+    ).first()
+    if existing_report:
+        return existing_report.report_content
+    return REPORT_CACHE.get(cache_key) or get_shared_report(fixture)
 
 @tip_bp.route('/submit_tip', methods=['GET', 'POST'])
 @login_required
 def submit_tip():
-    sydney_tz = pytz.timezone("Australia/Sydney")
-    now = datetime.now(sydney_tz)
     current_round = find_current_round()
-
-    fixtures = FixtureFree.query.filter(FixtureFree.round == current_round).all()
-    
-    match_ids = [str(f.match_id) for f in fixtures]
-
-    existing_tips = Tip.query.filter(Tip.user_id == current_user.id, Tip.match.in_(match_ids)).all()
-    existing_tips_by_match = {str(t.match): t for t in existing_tips}
-    existing_match_ids = set(existing_tips_by_match.keys())
-    has_submitted = set(match_ids).issubset(existing_match_ids)
-
-    required_match_ids = set(match_ids)
-    tips_closed = False
-    if current_round == 1:
-        round1_first_cutoff = sydney_tz.localize(datetime(2026, 2, 28, 17, 0, 0))
-        round1_cutoff = sydney_tz.localize(datetime(2026, 3, 5, 17, 0, 0))
-        if now >= round1_cutoff:
-            tips_closed = True
-        elif now < round1_first_cutoff:
-            required_match_ids = {m for m in match_ids if m in {"1", "2"}}
-        else:
-            required_match_ids = {m for m in match_ids if m not in {"1", "2"}}
-    else:
-        tips_closed = is_past_round_tips_cutoff(current_round)
-
-    visible_fixtures = [f for f in fixtures if str(f.match_id) in required_match_ids]
-    has_submitted = set(required_match_ids).issubset(existing_match_ids)
+    season = get_current_season()
+    visible_fixtures, tips_closed = get_open_fixtures(current_round, season)
     
     if request.method == 'POST':
         if tips_closed:
-            flash('Tip submissions for round 1 are now closed.', 'danger')
+            flash('Tip submissions for this round are now closed.', 'danger')
             return redirect(url_for('main.home'))
-        created_tips = 0
-        updated_tips = 0
-        for fixture in visible_fixtures:
-            match_id = str(fixture.match_id)
-            selected_team = request.form.get(f'team-input-{match_id}')
-
-            if not selected_team:
-                continue
-
-            existing_tip = existing_tips_by_match.get(match_id)
-            if existing_tip:
-                if existing_tip.selected_team != selected_team:
-                    existing_tip.selected_team = selected_team
-                    updated_tips += 1
-            else:
-                new_tip = Tip(
-                    user_id=current_user.id,
-                    username=current_user.username,
-                    match=match_id,
-                    selected_team=selected_team
-                )
-                db.session.add(new_tip)
-                created_tips += 1
-
-        if created_tips == 0 and updated_tips == 0:
+        selections = {f.match_id: request.form.get(f'team-input-{f.match_id}') for f in visible_fixtures}
+        try:
+            picks = resolve_picks(visible_fixtures, selections)
+        except ValueError as exc:
+            flash(str(exc), 'danger')
+            return redirect(url_for('tip.submit_tip'))
+
+        if not upsert_tips(current_user, picks, season.year):
             flash('No tips were selected to submit.', 'warning')
             return redirect(url_for('tip.submit_tip'))
 
-        db.session.commit()
         flash('Tips submitted successfully!', 'success')
         return redirect(url_for('main.home'))
 
+    visible_fixture_ids = {f.id for f in visible_fixtures}
+    existing_tips = Tip.query.filter(Tip.user_id == current_user.id, Tip.fixture_id.in_(visible_fixture_ids)).all()
+    has_submitted = len(existing_tips) == len(visible_fixtures)
+
     submitted_tips = []
     if existing_tips:
         for tip in existing_tips:
@@ -127,17 +197,14 @@ def submit_tip():
                 'selected_team': tip.selected_team,
             })
 
-    selected_tips = {
-        str(tip.match): tip.selected_team
-        for tip in existing_tips
-        if str(tip.match) in required_match_ids
-    }
+    selected_tips = {tip.fixture_id: tip.selected_team for tip in existing_tips}
 
-    existing_reports = TipIntelligenceReport.query.filter_by(
-        user_id=current_user.id,
-        round_number=current_round
-    ).all()
-    report_match_ids = {str(report.match_id) for report in existing_reports}
+    report_fixture_ids = {
+        fixture_id for (fixture_id,) in db.session.query(TipIntelligenceReport.fixture_id).filter(
+            TipIntelligenceReport.user_id == current_user.id,
+            TipIntelligenceReport.fixture_id.in_(visible_fixture_ids),
+        )
+    }
 
     return render_template(
         'submit_tip.html',
@@ -145,62 +212,77 @@ def submit_tip():
         has_submitted=has_submitted,
         submitted_tips=submitted_tips,
         team_logos=TEAM_LOGOS,
-        report_match_ids=report_match_ids,
+        report_fixture_ids=report_fixture_ids,
         current_round=current_round,
         tips_closed=tips_closed,
         selected_tips=selected_tips
     )
 
+@tip_bp.route("/api/tips", methods=["POST"])
+@login_required
+def api_submit_tips():
+    """Save one or more picks as JSON, e.g. per click on the submit page.
+
+    Body: ``{"match_id": "12", "team": "Storm"}`` or
+    ``{"tips": {"12": "Storm", "13": "Eels"}}``.
+    """
+    payload = request.get_json(silent=True) or {}
+    if "tips" in payload:
+        selections = payload["tips"]
+    elif "match_id" in payload:
+        selections = {payload["match_id"]: payload.get("team")}
+    else:
+        selections = None
+    if not isinstance(selections, dict) or not selections:
+        return jsonify({"error": "Expected {\"match_id\", \"team\"} or {\"tips\": {match_id: team}}."}), 400
+    selections = {str(match_id): team for match_id, team in selections.items()}
+
+    season = get_current_season()
+    visible_fixtures, tips_closed = get_open_fixtures(season=season)
+    if tips_closed:
+        return jsonify({"error": "Tip submissions for this round are now closed."}), 403
+    try:
+        picks = resolve_picks(visible_fixtures, selections)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+
+    changed = upsert_tips(current_user, picks, season.year)
+    return jsonify({
+        "saved": {fixture.match_id: team for fixture, team in picks.items()},
+        "changed": changed,
+    })
+
 @tip_bp.route("/view-tips")
 @login_required
 def view_tips():
+    current_season = get_current_season()
+    season = get_season(request.args.get("season", type=int)) or current_season
     selected_round = request.args.get("round", type=int)
-    all_rounds = get_all_rounds()
+    all_rounds = get_all_rounds(season.year)
     sydney_tz = pytz.timezone("Australia/Sydney")
     now = datetime.now(sydney_tz)
     if not selected_round:
-        selected_round = find_current_round()
+        selected_round = find_current_round() if season.year == current_season.year else (all_rounds[-1] if all_rounds else 0)
 
-    after_5_thursday = is_past_round_tips_cutoff(selected_round)
+    after_5_thursday = is_past_round_tips_cutoff(selected_round, season.year)
 
-    fixtures = FixtureFree.query.filter_by(round=selected_round).order_by(FixtureFree.match_id.asc()).all()
-    match_ids = [f.match_id for f in fixtures]
+    fixtures = round_fixtures_query(selected_round, season.year).order_by(FixtureFree.id.asc()).all()
 
     users = User.query.filter(~User.username.in_(['testing_db2'])).all()
-    tips_by_user = {
-        user.id: Tip.query.filter(Tip.user_id == user.id, Tip.match.in_(match_ids)).all()
-        for user in users if user.username not in ['testing_db2']
-    }
-    visibility_message = None
-    visible_match_ids = match_ids
-
-    #round 1 edge case 2026
-    if selected_round == 1:
-        round1_first_cutoff = sydney_tz.localize(datetime(2026, 2, 28, 17, 0, 0))
-        round1_cutoff = sydney_tz.localize(datetime(2026, 3, 5, 17, 0, 0))
-        if now < round1_first_cutoff:
-            visible_match_ids = []
-            visibility_message = "View others tips after 5pm Sat 28 Feb."
-        elif now < round1_cutoff:
-            visible_match_ids = [m for m in match_ids if m in ["1", "2", 1, 2]]
-            visibility_message = "Only matches 1-2 visible until 5pm Thu 5 Mar."
-        else:
-            visible_match_ids = match_ids
-    elif not after_5_thursday:
-        visible_match_ids = []
-        visibility_message = "View others tips after 5pm Thursday."
+    tips_by_user = {user.id: [] for user in users}
+    for tip in Tip.query.filter(Tip.fixture_id.in_([f.id for f in fixtures])).order_by(Tip.fixture_id):
+        if tip.user_id in tips_by_user:
+            tips_by_user[tip.user_id].append(tip)
+    visible_fixtures, visibility_message = get_visible_fixtures(fixtures, selected_round, season, now)
 
-    visible_fixtures = [f for f in fixtures if f.match_id in visible_match_ids]
-    results_map = {match: FixtureFree.get_winning_team(match) for match in visible_match_ids}
+    visible_fixture_ids = {f.id for f in visible_fixtures}
+    results_map = {f.id: f.winning_team for f in visible_fixtures}
 
     display_tips_by_user = {}
     for user in users:
         user_tips = tips_by_user.get(user.id, [])
         if user.id != current_user.id:
-            if visible_match_ids:
-                user_tips = [t for t in user_tips if t.match in visible_match_ids]
-            else:
-                user_tips = []
+            user_tips = [t for t in user_tips if t.fixture_id in visible_fixture_ids]
         display_tips_by_user[user.id] = user_tips
     
     return render_template(
@@ -209,6 +291,8 @@ def view_tips():
         tips_by_user=display_tips_by_user,
         selected_round=selected_round,
         all_rounds=all_rounds,
+        selected_season=season.year,
+        all_seasons=[s.year for s in get_all_seasons()],
         fixtures=visible_fixtures,
         results_map=results_map,
         after_5_thursday=after_5_thursday, #dictate if user can see others tips
@@ -219,55 +303,98 @@ def view_tips():
 @tip_bp.route("/tip-report/<match_id>")
 @login_required
 def tip_report(match_id):
-    match_id = str(match_id)
     cache_key = _report_key(current_user.id, match_id)
-    current_round = find_current_round()
-    fixture = FixtureFree.query.filter_by(match_id=match_id).first()
-    if not fixture:
-        return jsonify({"error": "Match not found."}), 404
-    if fixture.round != current_round:
-        return jsonify({"error": "Report is only available for the current round."}), 403
+    fixture, error = _report_fixture(match_id)
+    if error:
+        return error
 
-    existing_report = TipIntelligenceReport.query.filter_by(
-        user_id=current_user.id,
-        match_id=match_id,
-        round_number=current_round
-    ).first()
-    if existing_report:
-        return jsonify({"report": existing_report.report_content, "cached": True})
+    report = _finished_report(cache_key, fixture)
+    if report:
+        record_cached_report(fixture)
+        return jsonify({"report": report, "cached": True})
 
-    if cache_key in REPORT_CACHE:
-        return jsonify({"report": REPORT_CACHE[cache_key], "cached": True})
+    failure = REPORT_ERRORS.get(cache_key)
+    if failure:
+        return jsonify(failure), 500
 
-    if cache_key in REPORT_ERRORS:
-        return jsonify({
-            "error": REPORT_ERRORS[cache_key],
-            "traceback": REPORT_TRACEBACKS.get(cache_key)
-        }), 500
+    try:
+        _, position, eta = _start_report_job(cache_key, fixture, fixture.round)
+    except QueueFull as exc:
+        return _queue_full_response(exc)
+    return _pending_response(position, eta)
 
-    if cache_key not in REPORT_JOBS:
-        REPORT_ERRORS.pop(cache_key, None)
-        REPORT_TRACEBACKS.pop(cache_key, None)
-        REPORT_CANCELLED.discard(cache_key)
-        app = current_app._get_current_object()
-        REPORT_JOBS[cache_key] = REPORT_EXECUTOR.submit(
-            _generate_report_async,
-            app,
-            current_user.id,
-            match_id,
-            current_round,
-            cache_key
-        )
+@tip_bp.route("/tip-report/<match_id>/stream")
+@login_required
+def tip_report_stream(match_id):
+    """Server-Sent Events version of tip_report.
+
+    Emits ``stage``, ``plan``, ``search`` and ``token`` events while the
+    report is generated, then ``done`` with the full markdown (or
+    ``report_error``). A finished report is sent as a single ``done`` event.
+    Each open stream holds a web thread, so a job still waiting in the queue
+    gets tip_report's 202 (poll, then stream once it runs) instead, and past
+    REPORT_STREAMS_BUDGET or with a full queue the response is a 429.
+    """
+    cache_key = _report_key(current_user.id, match_id)
+    fixture, error = _report_fixture(match_id)
+    if error:
+        return error
 
-    return jsonify({"status": "pending"}), 202
+    report = _finished_report(cache_key, fixture)
+    failure = None if report else REPORT_ERRORS.get(cache_key)
+    if report:
+        record_cached_report(fixture)
+        events = [sse_event("done", {"report": report, "cached": True})]
+    elif failure:
+        events = [sse_event("report_error", {"error": failure["error"]})]
+    else:
+        try:
+            stream, position, eta = _start_report_job(cache_key, fixture, fixture.round)
+        except QueueFull as exc:
+            return _queue_full_response(exc)
+        if position:
+            return _pending_response(position, eta)
+        if not REPORT_STREAMS_BUDGET.acquire():
+            # The page falls back to polling tip_report.
+            response = jsonify({"error": "Too many live reports open; checking back shortly.", "retry_after": 10})
+            response.status_code = 429
+            response.headers["Retry-After"] = "10"
+            return response
+        start = request.headers.get("Last-Event-ID", -1, type=int) + 1
+        response = Response(_follow_report(stream, start), mimetype="text/event-stream", headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+        })
+        response.call_on_close(REPORT_STREAMS_BUDGET.release)
+        return response
+
+    return Response(events, mimetype="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",
+    })
+
+def _follow_report(stream, start):
+    if stream is None:
+        # The job finished between the checks above; let the client retry.
+        yield "retry: 1000\n\n"
+        return
+    for item in stream.follow(start):
+        if item is None:
+            yield SSE_HEARTBEAT
+        else:
+            index, event, data = item
+            yield sse_event(event, data, event_id=index)
 
 @tip_bp.route("/tip-report/<match_id>/cancel", methods=["POST"])
 @login_required
 def cancel_tip_report(match_id):
-    match_id = str(match_id)
     cache_key = _report_key(current_user.id, match_id)
     REPORT_CANCELLED.add(cache_key)
-    REPORT_JOBS.pop(cache_key, None)
-    REPORT_ERRORS.pop(cache_key, None)
-    REPORT_TRACEBACKS.pop(cache_key, None)
+    with REPORT_JOBS_LOCK:
+        REPORT_QUEUE.cancel(cache_key)
+        stream = REPORT_STREAMS.pop(cache_key, None)
+    if stream is not None:
+        stream.publish("report_error", {"error": "Report generation cancelled."})
+        stream.close()
+    REPORT_ERRORS.pop(cache_key)
     return jsonify({"status": "cancelled"})
\ No newline at end of file
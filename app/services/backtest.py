@@ -0,0 +1,190 @@
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from app import db
+from app.models import FixtureFree, Tip
+from app.services.ratings import HOME_ADVANTAGE, INITIAL_RATING, K_FACTOR, SEASON_CARRYOVER, margin_multiplier, win_probability
+from app.services.tipperbot_agent import TIPPERBOT_USER_ID
+
+# Pick codes: +1 home team, -1 away team. Result codes add 0 for a draw.
+HOME, AWAY = 1, -1
+
+_HISTORY = None  # set in each pool worker by _init_worker
+
+
+def load_history(seasons):
+    """Every fixture of ``seasons`` as NumPy columns, in round order.
+
+    Needs an app context; the result is plain arrays, so it can be shipped to
+    worker processes that have none. Fixtures without a result (or without
+    both teams) are kept as "pending", which spoils that round's bonus just
+    as it does for a real tipper.
+    """
+    fixtures = (
+        FixtureFree.query
+        .filter(FixtureFree.season.in_(seasons))
+        .order_by(FixtureFree.season, FixtureFree.round, FixtureFree.date, FixtureFree.time, FixtureFree.id)
+        .all()
+    )
+    teams = sorted({t for f in fixtures for t in (f.home_team, f.away_team) if t})
+    team_index = {team: i for i, team in enumerate(teams)}
+
+    votes = dict.fromkeys((f.id for f in fixtures), (0, 0))
+    tip_counts = (
+        db.session.query(Tip.fixture_id, Tip.selected_team, db.func.count())
+        .filter(Tip.fixture_id.in_(votes), Tip.user_id != TIPPERBOT_USER_ID)
+        .group_by(Tip.fixture_id, Tip.selected_team)
+    )
+    by_id = {f.id: f for f in fixtures}
+    for fixture_id, team, count in tip_counts:
+        home_votes, away_votes = votes[fixture_id]
+        if team == by_id[fixture_id].home_team:
+            home_votes += count
+        elif team == by_id[fixture_id].away_team:
+            away_votes += count
+        votes[fixture_id] = (home_votes, away_votes)
+
+    def result(f):
+        if f.home_score is None or f.away_score is None or not f.home_team or not f.away_team:
+            return 0, False
+        return int(np.sign(f.home_score - f.away_score)), True
+
+    results = [result(f) for f in fixtures]
+    return {
+        "teams": teams,
+        "season": np.array([f.season for f in fixtures], dtype=np.int32),
+        "round": np.array([f.round for f in fixtures], dtype=np.int32),
+        "home": np.array([team_index.get(f.home_team, -1) for f in fixtures], dtype=np.int32),
+        "away": np.array([team_index.get(f.away_team, -1) for f in fixtures], dtype=np.int32),
+        "margin": np.array([(f.home_score or 0) - (f.away_score or 0) for f in fixtures], dtype=np.int32),
+        "result": np.array([r for r, _ in results], dtype=np.int8),
+        "scored": np.array([s for _, s in results], dtype=bool),
+        "home_votes": np.array([votes[f.id][0] for f in fixtures], dtype=np.int32),
+        "away_votes": np.array([votes[f.id][1] for f in fixtures], dtype=np.int32),
+    }
+
+
+def _rounds(history):
+    """Start/stop slices of each (season, round) block; fixtures are sorted by both."""
+    key = history["season"].astype(np.int64) * 1000 + history["round"]
+    starts = np.flatnonzero(np.r_[True, key[1:] != key[:-1]])
+    return starts, np.r_[starts[1:], len(key)]
+
+
+# --- Strategies: each returns one pick per fixture (+1 home, -1 away) ---
+
+def pick_home(history):
+    return np.full(len(history["round"]), HOME, dtype=np.int8)
+
+
+def pick_away(history):
+    return np.full(len(history["round"]), AWAY, dtype=np.int8)
+
+
+def pick_consensus(history, fallback="home"):
+    """The side most tippers took; ``fallback`` ("home" or "away") on a tie or no tips."""
+    lean = np.sign(history["home_votes"] - history["away_votes"]).astype(np.int8)
+    return np.where(lean == 0, HOME if fallback == "home" else AWAY, lean).astype(np.int8)
+
+
+def pick_elo(history, k_factor=K_FACTOR, home_advantage=HOME_ADVANTAGE, carryover=SEASON_CARRYOVER):
+    """Tip the Elo favourite, with ratings as they stood before each round.
+
+    Each round is predicted and then rated as one vectorized step, like a
+    tipper who submits the whole round before the first game. (The live
+    ratings in app.services.ratings update game by game instead.)
+    """
+    ratings = np.full(len(history["teams"]), INITIAL_RATING)
+    picks = np.empty(len(history["round"]), dtype=np.int8)
+    season = None
+    for start, stop in zip(*_rounds(history)):
+        if history["season"][start] != season:
+            if season is not None:
+                ratings = INITIAL_RATING + (ratings - INITIAL_RATING) * carryover
+            season = history["season"][start]
+        home, away = history["home"][start:stop], history["away"][start:stop]
+        known = (home >= 0) & (away >= 0)
+        expected = np.where(known, win_probability(ratings[home], ratings[away], home_advantage), 0.5)
+        picks[start:stop] = np.where(expected >= 0.5, HOME, AWAY)
+
+        played = history["scored"][start:stop] & known
+        result = history["result"][start:stop]
+        margin = history["margin"][start:stop]
+        gap = (ratings[home] + home_advantage - ratings[away]) * np.where(result >= 0, 1, -1)
+        actual = (result + 1) / 2.0
+        scale = np.where(result != 0, margin_multiplier(margin, gap), 1.0)
+        change = np.where(played, k_factor * scale * (actual - expected), 0.0)
+        np.add.at(ratings, home[played], change[played])
+        np.add.at(ratings, away[played], -change[played])
+    return picks
+
+
+STRATEGIES = {
+    "home": pick_home,
+    "away": pick_away,
+    "consensus": pick_consensus,
+    "elo": pick_elo,
+}
+
+
+def score_picks(history, picks):
+    """Points per (season, round) under the comp's rules.
+
+    A tip scores when it names the winner (a draw scores nobody). A round
+    with every fixture decided and tipped correctly earns one bonus point,
+    as in get_user_round_results/is_perfect_round. Returns arrays of season,
+    round, correct tips and bonus per round.
+    """
+    starts, stops = _rounds(history)
+    correct = (picks == history["result"]) & history["scored"]
+    correct_per_round = np.add.reduceat(correct.astype(np.int32), starts)
+    pending_per_round = np.add.reduceat((~history["scored"]).astype(np.int32), starts)
+    bonus = (correct_per_round == stops - starts) & (pending_per_round == 0) & (correct_per_round > 0)
+    return history["season"][starts], history["round"][starts], correct_per_round, bonus.astype(np.int32)
+
+
+def _init_worker(history):
+    global _HISTORY
+    _HISTORY = history
+
+
+def _run(task):
+    name, params = task
+    picks = STRATEGIES[name](_HISTORY, **params)
+    seasons, _, correct, bonus = score_picks(_HISTORY, picks)
+    decided = _HISTORY["scored"]
+    by_season = {
+        int(season): int(correct[seasons == season].sum() + bonus[seasons == season].sum())
+        for season in np.unique(seasons)
+    }
+    return {
+        "strategy": name,
+        "params": params,
+        "points": int(correct.sum() + bonus.sum()),
+        "by_season": by_season,
+        "correct": int(correct.sum()),
+        "perfect_rounds": int(bonus.sum()),
+        "accuracy": float((picks[decided] == _HISTORY["result"][decided]).mean()) if decided.any() else 0.0,
+    }
+
+
+def parameter_grid(**values):
+    """Every combination of the given parameter lists, as dicts."""
+    names = sorted(values)
+    return [dict(zip(names, combo)) for combo in itertools.product(*(values[name] for name in names))]
+
+
+def run_backtest(history, tasks, workers=None):
+    """Score ``tasks`` ((strategy, params) pairs) over ``history`` across a process pool.
+
+    Results come back best first. ``workers=1`` runs in this process.
+    """
+    if workers == 1:
+        _init_worker(history)
+        results = [_run(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(history,)) as pool:
+            results = list(pool.map(_run, tasks, chunksize=max(1, len(tasks) // (4 * (workers or 4)))))
+    return sorted(results, key=lambda result: (-result["points"], -result["accuracy"]))
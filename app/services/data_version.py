@@ -0,0 +1,36 @@
+from datetime import datetime
+
+from app import db
+from app.models import DataVersion, au_tz
+from app.utils.sql import dialect_insert
+
+FIXTURES = "fixtures"
+TIPS = "tips"
+STANDINGS = "standings"
+SCOPES = (FIXTURES, TIPS, STANDINGS)
+
+
+def bump_data_version(*scopes):
+    """Increment the version of each scope. Does not commit.
+
+    Call it next to the write it describes so the bump lands in the same
+    transaction; readers then never see new data under an old version.
+    """
+    now = datetime.now(au_tz)
+    for scope in scopes:
+        stmt = dialect_insert(DataVersion).values(scope=scope, version=1, updated_at=now)
+        if hasattr(stmt, "on_conflict_do_update"):
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["scope"],
+                set_={"version": DataVersion.version + 1, "updated_at": now},
+            )
+            db.session.execute(stmt)
+        elif not DataVersion.query.filter_by(scope=scope).update({DataVersion.version: DataVersion.version + 1}):
+            db.session.execute(stmt)
+
+
+def get_data_versions():
+    """Return ``{scope: version}`` for every scope (0 if never bumped)."""
+    versions = dict.fromkeys(SCOPES, 0)
+    versions.update(db.session.query(DataVersion.scope, DataVersion.version).all())
+    return versions
@@ -0,0 +1,203 @@
+import csv
+import io
+import zlib
+
+from sqlalchemy import and_, select
+
+from app import db
+from app.models import FixtureFree, Tip
+
+EXPORT_COLUMNS = [
+    "id",
+    "season",
+    "round",
+    "match",
+    "home_team",
+    "away_team",
+    "home_score",
+    "away_score",
+    "user_id",
+    "username",
+    "selected_team",
+    "winning_team",
+    "correct",
+    "date",
+]
+
+EXPORT_FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "csv.gz": ("application/gzip", "csv.gz"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+
+def _winning_team(home_team, home_score, away_team, away_score):
+    # Same rules as FixtureFree.winning_team, on plain row values.
+    if home_score is None or away_score is None:
+        return None
+    if home_score > away_score:
+        return home_team
+    if away_score > home_score:
+        return away_team
+    return "Draw"
+
+
+def iter_tip_export_rows(season=None, round_number=None, user_id=None, batch_size=1000):
+    """Yield one dict per tip joined with its fixture and result.
+
+    Rows are streamed with ``yield_per`` (a server-side cursor on Postgres), so
+    memory stays constant no matter how many tips exist.
+    """
+    stmt = (
+        select(
+            Tip.id,
+            Tip.season,
+            FixtureFree.round,
+            FixtureFree.match_id.label("match"),
+            FixtureFree.home_team,
+            FixtureFree.away_team,
+            FixtureFree.home_score,
+            FixtureFree.away_score,
+            Tip.user_id,
+            Tip.username,
+            Tip.selected_team,
+            Tip.date,
+        )
+        .select_from(Tip)
+        .join(FixtureFree, FixtureFree.id == Tip.fixture_id)
+        .order_by(Tip.id)
+    )
+    filters = []
+    if season is not None:
+        filters.append(Tip.season == season)
+    if round_number is not None:
+        filters.append(FixtureFree.round == round_number)
+    if user_id is not None:
+        filters.append(Tip.user_id == user_id)
+    if filters:
+        stmt = stmt.where(and_(*filters))
+
+    result = db.session.execute(stmt.execution_options(yield_per=batch_size))
+    for row in result:
+        winner = _winning_team(row.home_team, row.home_score, row.away_team, row.away_score)
+        yield {
+            "id": row.id,
+            "season": row.season,
+            "round": row.round,
+            "match": row.match,
+            "home_team": row.home_team,
+            "away_team": row.away_team,
+            "home_score": row.home_score,
+            "away_score": row.away_score,
+            "user_id": row.user_id,
+            "username": row.username,
+            "selected_team": row.selected_team,
+            "winning_team": winner,
+            "correct": None if winner is None else winner == row.selected_team,
+            "date": row.date.isoformat() if row.date else None,
+        }
+
+
+def iter_csv(rows, flush_every=500):
+    """Encode rows as UTF-8 CSV, yielding a bytes chunk every ``flush_every`` rows."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+    writer.writeheader()
+    for index, row in enumerate(rows, start=1):
+        writer.writerow(row)
+        if index % flush_every == 0:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate(0)
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def iter_gzip(chunks):
+    compressor = zlib.compressobj(wbits=31)  # 31 = gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object that hands written bytes back to a generator."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as exc:
+        raise RuntimeError("Parquet export requires pyarrow (pip install pyarrow).") from exc
+    return pyarrow, pyarrow.parquet
+
+
+def iter_parquet(rows, row_group_size=10000):
+    """Encode rows as Parquet, one row group at a time.
+
+    Requires the optional ``pyarrow`` package.
+    """
+    pa, pq = _require_pyarrow()
+    schema = pa.schema([
+        ("id", pa.int64()),
+        ("season", pa.int32()),
+        ("round", pa.int32()),
+        ("match", pa.string()),
+        ("home_team", pa.string()),
+        ("away_team", pa.string()),
+        ("home_score", pa.int32()),
+        ("away_score", pa.int32()),
+        ("user_id", pa.int64()),
+        ("username", pa.string()),
+        ("selected_team", pa.string()),
+        ("winning_team", pa.string()),
+        ("correct", pa.bool_()),
+        ("date", pa.string()),
+    ])
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(pa.PythonFile(sink, mode="w"), schema)
+
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= row_group_size:
+            writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+            batch = []
+            yield sink.drain()
+    if batch:
+        writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+    writer.close()
+    yield sink.drain()
+
+
+def iter_tip_export(fmt="csv", **filters):
+    """Return an iterator of bytes chunks for the requested export format."""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+    if fmt == "parquet":
+        # Fail before the response starts rather than halfway through it.
+        _require_pyarrow()
+    rows = iter_tip_export_rows(**filters)
+    if fmt == "parquet":
+        return iter_parquet(rows)
+    if fmt == "csv.gz":
+        return iter_gzip(iter_csv(rows))
+    return iter_csv(rows)
@@ -4,15 +4,19 @@ from dotenv import load_dotenv
 from datetime import datetime
 from app.models import Fixture, FixtureFree, db, User, UserTipStats, Tip
 from app import create_app 
-from datetime import datetime, date, timedelta
+from datetime import datetime, date, time, timedelta
 import pytz
+from app.services.seasons import current_season_year, get_current_season, round_fixtures_query, season_match_id
+from app.services.season_totals import apply_round_delta, get_or_create_totals, load_totals, round_values
+from app.services.data_version import FIXTURES, STANDINGS, bump_data_version
 
 # Load environment variables
 load_dotenv()
 
 #Functions for Free API
-def get_free_nrl_fixtures():
-    url = "https://fixturedownload.com/feed/json/nrl-2026"
+def get_free_nrl_fixtures(feed_slug=None):
+    feed_slug = feed_slug or get_current_season().feed_slug
+    url = f"https://fixturedownload.com/feed/json/{feed_slug}"
     response = requests.get(url)
     if response.status_code == 200:
         fixtures = response.json()
@@ -25,19 +29,29 @@ def get_free_nrl_fixtures():
         print("Failed to fetch fixtures:", response.status_code)
         return []
         
-def upsert_free_fixtures():
+def upsert_free_fixtures(fixtures=None, season=None):
+    """Insert new fixtures from the feed and sync existing fixtures' scores to it.
+
+    Rounds whose scores changed are rescored (for the current season).
+    Returns the set of those rounds.
+    """
     #FixtureFree.query.delete()
     #db.session.commit()
     
-    fixtures = get_free_nrl_fixtures()
+    season = season or get_current_season()
+    if fixtures is None:
+        fixtures = get_free_nrl_fixtures(season.feed_slug)
     
     if not fixtures:
         print("No fixtures fetched. Abort...")
-        return 
+        return set()
     
     existing_fixtures = {
-        f.match_id: f for f in FixtureFree.query.all()
+        f.match_id: f for f in FixtureFree.query.filter_by(season=season.year).all()
     }
+    now = _sydney_now()
+    changed = False
+    rescore_rounds = set()
     
     for fixture in fixtures:
         #Converting fixtures date string to datetime format
@@ -69,23 +83,29 @@ def upsert_free_fixtures():
             date_part = None
             time_part = None
         
-        existing = existing_fixtures.get(str(match_id))
+        match_id = season_match_id(season.year, match_id)
+        existing = existing_fixtures.get(match_id)
 
         if existing:
-            updated = False
-            if existing.home_score is None and home_score is not None:
+            # The feed is the source of truth: a late or corrected final is
+            # taken as is. Games still being played are left to the live poller.
+            in_progress = _kickoff(existing) is not None and _kickoff(existing) + FINAL_AFTER > now
+            if (
+                not in_progress
+                and home_score is not None
+                and away_score is not None
+                and (existing.home_score, existing.away_score) != (home_score, away_score)
+            ):
                 existing.home_score = home_score
-                updated = True
-            if existing.away_score is None and away_score is not None:
                 existing.away_score = away_score
-                updated = True
-            if updated==True:
+                changed = True
+                rescore_rounds.add(existing.round)
                 print(f"updated scores for match: {match_id}")
         else:
         
             new_fixture = FixtureFree(
-                match_id=fixture.get("MatchNumber", None),
-                season=2026,
+                match_id=match_id,
+                season=season.year,
                 round=fixture.get("RoundNumber",None),
                 home_team=fixture.get("HomeTeam",None),
                 away_team=fixture.get("AwayTeam", None),
@@ -95,21 +115,24 @@ def upsert_free_fixtures():
                 time=time_part
             )
             db.session.add(new_fixture)
+            changed = True
             print(f"Inserted new fixture {match_id}")
             
-
+    if changed:
+        bump_data_version(FIXTURES)
     db.session.commit()
 
+    if rescore_rounds and season.year == current_season_year():
+        update_user_tip_stats(round_numbers=sorted(rescore_rounds))
+    return rescore_rounds
+
 
 def find_current_round() -> int:
     sydney_tz = pytz.timezone("Australia/Sydney")
     today = datetime.now(sydney_tz).date()
+    season = get_current_season()
 
-    round1_start = date(2026, 3, 1)
-    round1_end = date(2026, 3, 8)
-    if today < round1_start:
-        return 1
-    if round1_start <= today <= round1_end:
+    if season.round1_end and today <= season.round1_end:
         return 1
 
     monday = today - timedelta(days=today.weekday())
@@ -119,7 +142,7 @@ def find_current_round() -> int:
     # even when the previous round has a long-weekend Monday game (e.g. round 14).
     current_round = (FixtureFree.query
                      .with_entities(FixtureFree.round)
-                     .filter(FixtureFree.date >= monday, FixtureFree.date <= sunday)
+                     .filter(FixtureFree.season == season.year, FixtureFree.date >= monday, FixtureFree.date <= sunday)
                      .distinct()
                      .order_by(FixtureFree.round.desc())
                      .first()
@@ -130,14 +153,124 @@ def find_current_round() -> int:
         print("Current round returned empty")
         return 0
 
+# --- Live score polling ---
+# A match is "live" from kickoff until LIVE_WINDOW after it (covers the game
+# plus the feed catching up with the final score).
+LIVE_WINDOW = timedelta(hours=3)
+# A score seen this long after kickoff is taken as the final result; before
+# that it is only a live score and nothing is rescored.
+FINAL_AFTER = timedelta(hours=2)
+LIVE_POLL_INTERVAL = timedelta(seconds=60)
+MATCHDAY_POLL_INTERVAL = timedelta(hours=1)
+IDLE_POLL_INTERVAL = timedelta(days=1)
+
+def _kickoff(fixture):
+    if fixture.date is None:
+        return None
+    return datetime.combine(fixture.date, fixture.time or time(0, 0))
+
+def _sydney_now():
+    return datetime.now(pytz.timezone("Australia/Sydney")).replace(tzinfo=None)
+
+def get_live_fixtures(now=None):
+    """Fixtures that have kicked off within LIVE_WINDOW (in progress or just finished)."""
+    now = now or _sydney_now()
+    candidates = (
+        FixtureFree.query
+        .filter(
+            FixtureFree.season == current_season_year(),
+            FixtureFree.date >= (now - LIVE_WINDOW).date(),
+            FixtureFree.date <= now.date(),
+        )
+        .all()
+    )
+    return [
+        f for f in candidates
+        if _kickoff(f) is not None and _kickoff(f) <= now <= _kickoff(f) + LIVE_WINDOW
+    ]
+
+def next_live_poll_interval(now=None):
+    """How long to wait before the next live-score poll.
+
+    Every minute while a match is live, hourly on a day with an upcoming
+    kickoff, otherwise daily - but never past the next kickoff.
+    """
+    now = now or _sydney_now()
+    if get_live_fixtures(now):
+        return LIVE_POLL_INTERVAL
+
+    upcoming = (
+        FixtureFree.query
+        .filter(
+            FixtureFree.season == current_season_year(),
+            FixtureFree.date >= now.date(),
+            FixtureFree.home_score.is_(None),
+        )
+        .order_by(FixtureFree.date.asc(), FixtureFree.time.asc())
+        .limit(20)
+        .all()
+    )
+    kickoffs = [k for k in (_kickoff(f) for f in upcoming) if k is not None and k > now]
+    if not kickoffs:
+        return IDLE_POLL_INTERVAL
+
+    until_kickoff = min(kickoffs) - now
+    interval = MATCHDAY_POLL_INTERVAL if until_kickoff <= timedelta(days=1) else IDLE_POLL_INTERVAL
+    return max(LIVE_POLL_INTERVAL, min(interval, until_kickoff))
+
+def refresh_live_scores(now=None):
+    """Poll the feed once, update only live fixtures and rescore their rounds.
+
+    Scores of games still in progress go to the live_* columns; from
+    FINAL_AFTER past kickoff they are written as the result and the round is
+    rescored. Returns the set of rounds that were rescored.
+    """
+    now = now or _sydney_now()
+    live = {str(f.match_id): f for f in get_live_fixtures(now)}
+    if not live:
+        return set()
+
+    season = get_current_season()
+    feed = get_free_nrl_fixtures(season.feed_slug)
+    changed = False
+    changed_rounds = set()
+    for item in feed:
+        fixture = live.get(season_match_id(season.year, item.get("MatchNumber")))
+        if fixture is None:
+            continue
+        home_score = item.get("HomeTeamScore")
+        away_score = item.get("AwayTeamScore")
+        if home_score is None or away_score is None:
+            continue
+        if (fixture.live_home_score, fixture.live_away_score) != (home_score, away_score):
+            fixture.live_home_score = home_score
+            fixture.live_away_score = away_score
+            changed = True
+            print(f"live score for match {fixture.match_id}: {home_score} - {away_score}")
+        if (
+            now >= _kickoff(fixture) + FINAL_AFTER
+            and (fixture.home_score, fixture.away_score) != (home_score, away_score)
+        ):
+            fixture.home_score = home_score
+            fixture.away_score = away_score
+            changed = True
+            changed_rounds.add(fixture.round)
+            print(f"final score for match {fixture.match_id}: {home_score} - {away_score}")
+    if changed:
+        bump_data_version(FIXTURES)
+    db.session.commit()
+
+    if changed_rounds:
+        update_user_tip_stats(round_numbers=sorted(changed_rounds))
+    return changed_rounds
+
 #Helper function to evaluate user round results
-def get_user_round_results(user_id, round_number):
-    fixtures = FixtureFree.query.filter_by(round=round_number).all()
-    match_ids = [f.match_id for f in fixtures]
-    tips = Tip.query.filter(Tip.user_id==user_id, Tip.match.in_(match_ids)).all()
+def get_user_round_results(user_id, round_number, season=None):
+    fixtures = {f.id: f for f in round_fixtures_query(round_number, season).all()}
+    tips = Tip.query.filter(Tip.user_id==user_id, Tip.fixture_id.in_(fixtures.keys())).all()
     
-    tip_map = {tip.match: tip.selected_team for tip in tips}
-    results_map = {tip.match: FixtureFree.get_winning_team(tip.match) for tip in tips}
+    tip_map = {tip.fixture_id: tip.selected_team for tip in tips}
+    results_map = {tip.fixture_id: fixtures[tip.fixture_id].winning_team for tip in tips}
     
     round_results = {
         "success" : 0,
@@ -145,22 +278,21 @@ def get_user_round_results(user_id, round_number):
         "pending" : 0
     }
     
-    for match_id, team in results_map.items():
+    for fixture_id, team in results_map.items():
         if team == None:
             round_results['pending'] += 1
-        elif team == tip_map.get(match_id):
+        elif team == tip_map.get(fixture_id):
             round_results['success'] += 1
         else:
             round_results["failure"] += 1
             
     return round_results
 
-def is_perfect_round(user_id, round_number, round_results):
-    fixtures = FixtureFree.query.filter_by(round=round_number).all()
-    match_ids = [f.match_id for f in fixtures]
-    tips = Tip.query.filter(Tip.user_id == user_id, Tip.match.in_(match_ids)).all()
+def is_perfect_round(user_id, round_number, round_results, season=None):
+    fixture_ids = [f.id for f in round_fixtures_query(round_number, season).all()]
+    tips = Tip.query.filter(Tip.user_id == user_id, Tip.fixture_id.in_(fixture_ids)).all()
 
-    if len(tips) != len(match_ids):
+    if len(tips) != len(fixture_ids):
         return False
 
     return (
@@ -170,15 +302,34 @@ def is_perfect_round(user_id, round_number, round_results):
     )
 
 # --- New Function to Update UserTipStats ---
-def update_user_tip_stats():
+def update_user_tip_stats(round_numbers=None):
+    """Recompute UserTipStats for every user.
+
+    Pass ``round_numbers`` to rescore only those rounds (e.g. the round a live
+    score just landed in) instead of every round up to the current one. Each
+    round's change is applied to user_season_totals in the same transaction.
+    """
     users = User.query.all()
+    season = current_season_year()
+    if round_numbers is None:
+        round_numbers = range(1, find_current_round() + 1)
+
+    existing_stats = {
+        (stat.user_id, stat.round_number): stat
+        for stat in UserTipStats.query.filter(
+            UserTipStats.season == season,
+            UserTipStats.round_number.in_(list(round_numbers)),
+        )
+    }
+    totals_by_user = load_totals(season)
 
     for user in users:
-        for round_number in range(1, find_current_round() + 1): 
-            round_results = get_user_round_results(user.id, round_number)
-            bonus_tips = 1 if is_perfect_round(user.id, round_number, round_results) else 0
+        for round_number in round_numbers: 
+            round_results = get_user_round_results(user.id, round_number, season)
+            bonus_tips = 1 if is_perfect_round(user.id, round_number, round_results, season) else 0
 
-            stat = UserTipStats.query.filter_by(user_id=user.id, round_number=round_number).first()
+            stat = existing_stats.get((user.id, round_number))
+            old_values = round_values(stat)
             if stat:
                 stat.successful_tips = round_results["success"]
                 stat.failed_tips = round_results["failure"]
@@ -187,6 +338,7 @@ def update_user_tip_stats():
             else:
                 stat = UserTipStats(
                     user_id=user.id,
+                    season=season,
                     round_number=round_number,
                     successful_tips=round_results["success"],
                     failed_tips=round_results["failure"],
@@ -194,6 +346,14 @@ def update_user_tip_stats():
                     bonus_tips=bonus_tips
                 )
                 db.session.add(stat)
+
+            apply_round_delta(
+                get_or_create_totals(totals_by_user, season, user.id),
+                round_number,
+                old_values,
+                round_values(stat),
+            )
+    bump_data_version(STANDINGS)
     db.session.commit()
     
 def main():
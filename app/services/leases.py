@@ -0,0 +1,119 @@
+import hashlib
+import os
+import socket
+import threading
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+
+from app import db
+from app.models import JobLease
+
+# Identifies this process in the lease table so only the holder can release.
+PROCESS_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def _advisory_key(job_name):
+    # pg advisory locks take a signed 64-bit key.
+    digest = hashlib.sha1(f"job:{job_name}".encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big", signed=True)
+
+
+class _AdvisoryLease:
+    """Postgres session-level advisory lock held on a dedicated connection."""
+
+    def __init__(self, job_name):
+        self.job_name = job_name
+        self.key = _advisory_key(job_name)
+        self.connection = None
+
+    def acquire(self):
+        self.connection = db.engine.connect()
+        acquired = self.connection.execute(select(func.pg_try_advisory_lock(self.key))).scalar()
+        self.connection.commit()
+        if not acquired:
+            self.connection.close()
+            self.connection = None
+        return bool(acquired)
+
+    def release(self):
+        if self.connection is None:
+            return
+        try:
+            self.connection.execute(select(func.pg_advisory_unlock(self.key)))
+            self.connection.commit()
+        finally:
+            self.connection.close()
+            self.connection = None
+
+
+class _TableLease:
+    """Row in job_leases with an expiry, for databases without advisory locks.
+
+    The expiry means a crashed holder can't block the job forever.
+    """
+
+    def __init__(self, job_name, ttl_seconds):
+        self.job_name = job_name
+        self.ttl_seconds = ttl_seconds
+        self.holder = f"{PROCESS_ID}:{threading.get_ident()}"
+
+    def acquire(self):
+        now = datetime.utcnow()
+        expires_at = now + timedelta(seconds=self.ttl_seconds)
+        table = JobLease.__table__
+        # Separate transaction from db.session so the lease commits on its own.
+        try:
+            with db.engine.begin() as connection:
+                connection.execute(insert(table).values(
+                    job_name=self.job_name,
+                    holder=self.holder,
+                    acquired_at=now,
+                    expires_at=expires_at,
+                ))
+            return True
+        except IntegrityError:
+            pass
+
+        with db.engine.begin() as connection:
+            result = connection.execute(
+                update(table)
+                .where(table.c.job_name == self.job_name, table.c.expires_at < now)
+                .values(holder=self.holder, acquired_at=now, expires_at=expires_at)
+            )
+        return result.rowcount == 1
+
+    def release(self):
+        table = JobLease.__table__
+        with db.engine.begin() as connection:
+            connection.execute(
+                delete(table).where(table.c.job_name == self.job_name, table.c.holder == self.holder)
+            )
+
+
+def acquire_lease(job_name, ttl_seconds=3600):
+    """Try to take the cross-process lease for ``job_name``.
+
+    Returns a lease object (call ``release()`` when done) or None if another
+    process holds it. Uses Postgres advisory locks when available and falls
+    back to the job_leases table (e.g. on SQLite).
+    """
+    if db.engine.dialect.name == "postgresql":
+        lease = _AdvisoryLease(job_name)
+    else:
+        lease = _TableLease(job_name, ttl_seconds)
+    return lease if lease.acquire() else None
+
+
+@contextmanager
+def job_lease(job_name, ttl_seconds=3600):
+    """``with job_lease("name") as acquired:`` - run the body only if acquired."""
+    lease = acquire_lease(job_name, ttl_seconds)
+    try:
+        yield lease is not None
+    finally:
+        if lease is not None:
+            lease.release()
@@ -0,0 +1,261 @@
+import asyncio
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from typing import get_args, get_origin
+
+from pydantic import BaseModel
+
+# LLM_BACKEND=openai (default) | stub | record
+# stub replays LLM_RECORDINGS and fakes anything it has no recording for;
+# record runs for real and appends every call to LLM_RECORDINGS.
+DEFAULT_RECORDINGS_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "instance", "llm_recordings.jsonl")
+
+_BACKEND = None
+_BACKEND_LOCK = threading.Lock()
+
+
+def _get_output(result):
+    if hasattr(result, "output"):
+        return result.output
+    if hasattr(result, "final_output"):
+        return result.final_output
+    return result
+
+
+def _fill_usage(usage, result):
+    """Copy token and tool-call counts from a Runner result into ``usage``."""
+    if usage is None:
+        return
+    from agents import ToolCallItem
+    run_usage = result.context_wrapper.usage
+    usage.update(
+        requests=run_usage.requests,
+        input_tokens=run_usage.input_tokens,
+        output_tokens=run_usage.output_tokens,
+        tool_calls=sum(isinstance(item, ToolCallItem) for item in result.new_items),
+    )
+
+
+def _estimate_tokens(text):
+    # Rough English average of ~0.75 words per token; good enough for a stub.
+    return len(str(text).split()) * 4 // 3
+
+
+def call_key(agent, prompt):
+    """Identifies one agent call for record/replay: same agent, instructions and prompt."""
+    raw = json.dumps([agent.name, agent.instructions, prompt])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _dump_output(output):
+    if isinstance(output, BaseModel):
+        return output.model_dump()
+    return output if isinstance(output, str) else str(output)
+
+
+def _load_output(agent, data):
+    output_type = getattr(agent, "output_type", None)
+    if isinstance(output_type, type) and issubclass(output_type, BaseModel):
+        return output_type.model_validate(data)
+    return data
+
+
+class OpenAIBackend:
+    """Runs agents for real through the openai-agents Runner."""
+
+    live = True
+
+    def run(self, agent, prompt, usage=None):
+        """Run ``agent`` to completion and return its final output.
+
+        When ``usage`` is a dict it is filled with ``requests``,
+        ``input_tokens``, ``output_tokens`` and ``tool_calls`` for telemetry.
+        """
+        from agents import Runner
+        result = Runner.run_sync(agent, prompt)
+        _fill_usage(usage, result)
+        return _get_output(result)
+
+    def stream(self, agent, prompt, on_text, usage=None):
+        """Like ``run``, but pass each chunk of text output to ``on_text`` as it arrives."""
+        from agents import Runner
+        from openai.types.responses import ResponseTextDeltaEvent
+
+        async def _run():
+            result = Runner.run_streamed(agent, prompt)
+            async for event in result.stream_events():
+                if event.type == "raw_response_event" and isinstance(event.data, ResponseTextDeltaEvent):
+                    on_text(event.data.delta)
+            _fill_usage(usage, result)
+            return result.final_output
+        return asyncio.run(_run())
+
+
+class RecordingBackend:
+    """Wraps another backend and appends every call's output to a JSONL file for replay."""
+
+    live = True
+
+    def __init__(self, inner, path=DEFAULT_RECORDINGS_PATH):
+        self.inner = inner
+        self.path = path
+        self._lock = threading.Lock()
+
+    def _record(self, agent, prompt, output, usage):
+        line = json.dumps({
+            "key": call_key(agent, prompt),
+            "agent": agent.name,
+            "output": _dump_output(output),
+            "usage": usage,
+        })
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+    def run(self, agent, prompt, usage=None):
+        usage = {} if usage is None else usage
+        output = self.inner.run(agent, prompt, usage=usage)
+        self._record(agent, prompt, output, usage)
+        return output
+
+    def stream(self, agent, prompt, on_text, usage=None):
+        usage = {} if usage is None else usage
+        output = self.inner.stream(agent, prompt, on_text, usage=usage)
+        self._record(agent, prompt, output, usage)
+        return output
+
+
+class StubBackend:
+    """Offline stand-in for OpenAIBackend.
+
+    Calls found in ``recordings_path`` are replayed; anything else gets a
+    deterministic fake built from the agent's output type (seeded by the call,
+    so results don't depend on ordering), unless ``strict`` is set.
+    ``latency`` (seconds per call) and ``failure_rate`` (0-1) simulate the real
+    API; ``stream`` spreads the latency over ``chunk_size``-word chunks.
+    """
+
+    live = False
+
+    def __init__(self, recordings_path=None, latency=0.0, failure_rate=0.0, seed=None,
+                 strict=False, list_length=3, text_words=300, chunk_size=8):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.seed = seed
+        self.strict = strict
+        self.list_length = list_length
+        self.text_words = text_words
+        self.chunk_size = chunk_size
+        self.recordings = {}
+        self.calls = 0
+        self.replayed = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        if recordings_path and os.path.exists(recordings_path):
+            with open(recordings_path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self.recordings[entry["key"]] = entry
+
+    def _output(self, agent, prompt, usage):
+        key = call_key(agent, prompt)
+        with self._lock:
+            self.calls += 1
+            if self._random.random() < self.failure_rate:
+                raise RuntimeError(f"Stub failure running {agent.name}")
+            recorded = self.recordings.get(key)
+            if recorded is not None:
+                self.replayed += 1
+        if recorded is not None:
+            output = _load_output(agent, recorded["output"])
+            if usage is not None and recorded.get("usage"):
+                usage.update(recorded["usage"])
+                return output
+        elif self.strict:
+            raise KeyError(f"No recording for {agent.name} call {key[:12]}")
+        else:
+            output = self._fake(agent, random.Random(f"{self.seed}:{key}"))
+        if usage is not None:
+            usage.update(
+                requests=1,
+                input_tokens=_estimate_tokens(f"{agent.instructions} {prompt}"),
+                output_tokens=_estimate_tokens(json.dumps(_dump_output(output))),
+                tool_calls=1 if agent.tools else 0,
+            )
+        return output
+
+    def _fake(self, agent, rng):
+        output_type = getattr(agent, "output_type", None)
+        if isinstance(output_type, type) and issubclass(output_type, BaseModel):
+            return self._fake_model(output_type, rng)
+        words = [f"{agent.name.lower().replace(' ', '-')}-{rng.randint(1, 999)}" for _ in range(self.text_words)]
+        return f"## Stub output from {agent.name}\n\n" + " ".join(words)
+
+    def _fake_model(self, model_cls, rng):
+        return model_cls(**{
+            name: self._fake_value(field.annotation, name, rng)
+            for name, field in model_cls.model_fields.items()
+        })
+
+    def _fake_value(self, annotation, name, rng):
+        if get_origin(annotation) is list:
+            (item_type,) = get_args(annotation)
+            return [self._fake_value(item_type, name, rng) for _ in range(self.list_length)]
+        if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+            return self._fake_model(annotation, rng)
+        if annotation is bool:
+            return rng.random() < 0.5
+        if annotation is int:
+            return rng.randint(0, 100)
+        if annotation is float:
+            return rng.random()
+        return f"{name} {rng.randint(1, 9999)}"
+
+    def run(self, agent, prompt, usage=None):
+        time.sleep(self.latency)
+        return self._output(agent, prompt, usage)
+
+    def stream(self, agent, prompt, on_text, usage=None):
+        output = self._output(agent, prompt, usage)
+        text = output if isinstance(output, str) else json.dumps(_dump_output(output))
+        words = text.split(" ")
+        chunks = [" ".join(words[i:i + self.chunk_size]) for i in range(0, len(words), self.chunk_size)]
+        for index, chunk in enumerate(chunks):
+            time.sleep(self.latency / len(chunks))
+            on_text(chunk if index == 0 else " " + chunk)
+        return output
+
+
+def get_llm_backend():
+    """The process-wide backend, chosen from LLM_BACKEND on first use."""
+    global _BACKEND
+    with _BACKEND_LOCK:
+        if _BACKEND is None:
+            kind = os.getenv("LLM_BACKEND", "openai").lower()
+            path = os.getenv("LLM_RECORDINGS", DEFAULT_RECORDINGS_PATH)
+            if kind == "stub":
+                _BACKEND = StubBackend(
+                    recordings_path=path,
+                    latency=float(os.getenv("LLM_STUB_LATENCY", "0")),
+                    failure_rate=float(os.getenv("LLM_STUB_FAILURE_RATE", "0")),
+                    seed=os.getenv("LLM_STUB_SEED"),
+                )
+            elif kind == "record":
+                _BACKEND = RecordingBackend(OpenAIBackend(), path)
+            elif kind == "openai":
+                _BACKEND = OpenAIBackend()
+            else:
+                raise ValueError(f"Unknown LLM_BACKEND {kind!r}; expected openai, stub or record.")
+        return _BACKEND
+
+
+def set_llm_backend(backend):
+    """Swap the process-wide backend (benchmarks, scripts); returns the previous one."""
+    global _BACKEND
+    with _BACKEND_LOCK:
+        previous, _BACKEND = _BACKEND, backend
+    return previous
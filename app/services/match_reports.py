@@ -0,0 +1,136 @@
+import hashlib
+import json
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import pytz
+from flask import current_app
+
+from app import db
+from app.models import FixtureFree, FixtureResearch, MatchReport
+from app.services.analyst_agent import _build_report_for_fixture
+from app.services.fixtures import find_current_round
+from app.services.research import research_fixture
+from app.services.seasons import round_fixtures_query
+from app.services.team_stats import fixture_stats_context
+from app.services.telemetry import RunTrace
+from app.utils.sql import dialect_insert
+
+# The refresh close to the cutoff wants injury and team news from the last few
+# hours, not the research the Monday batch did.
+REFRESH_RESEARCH_AGE = timedelta(hours=6)
+
+
+def _sydney_now():
+    return datetime.now(pytz.timezone("Australia/Sydney")).replace(tzinfo=None)
+
+
+def report_inputs_key(fixture, searches):
+    """Hash of everything a report is written from: the fixture details, local stats and research."""
+    raw = json.dumps([
+        fixture.home_team,
+        fixture.away_team,
+        fixture.date.isoformat() if fixture.date else None,
+        fixture.time.isoformat() if fixture.time else None,
+        fixture_stats_context(fixture),
+        [[s["query"], s["summary"]] for s in searches or []],
+    ])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def get_shared_report(fixture):
+    return (
+        db.session.query(MatchReport.report_content)
+        .filter(MatchReport.fixture_id == fixture.id)
+        .scalar()
+    )
+
+
+def save_shared_report(fixture, report, searches=None):
+    """Upsert the fixture's shared report, keyed on the research it was written from.
+
+    Without ``searches``, the fixture's saved research is assumed, which is
+    what a report generated on demand has just used.
+    """
+    if searches is None:
+        searches = (
+            db.session.query(FixtureResearch.searches)
+            .filter(FixtureResearch.fixture_id == fixture.id)
+            .scalar()
+        )
+    values = {
+        "fixture_id": fixture.id,
+        "season": fixture.season,
+        "round_number": fixture.round,
+        "report_content": report,
+        "inputs_key": report_inputs_key(fixture, searches),
+        "created_at": _sydney_now(),
+    }
+    stmt = dialect_insert(MatchReport).values(**values)
+    if hasattr(stmt, "on_conflict_do_update"):
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["fixture_id"],
+            set_={k: stmt.excluded[k] for k in ("report_content", "inputs_key", "created_at")},
+        )
+    else:
+        MatchReport.query.filter_by(fixture_id=fixture.id).delete()
+    db.session.execute(stmt)
+    db.session.commit()
+
+
+def prewarm_report(fixture, refresh=False):
+    """Make sure ``fixture`` has a shared report written from current inputs.
+
+    Returns "created", "refreshed" or "unchanged". With ``refresh``, research
+    older than REFRESH_RESEARCH_AGE is redone first; the report is only
+    rewritten if the fixture, its stats or its research changed since it was
+    written.
+    """
+    trace = RunTrace("prewarm", fixture)
+    try:
+        max_age = REFRESH_RESEARCH_AGE if refresh else timedelta(days=7)
+        searches = research_fixture(fixture, trace, max_age=max_age)
+        inputs_key = report_inputs_key(fixture, searches)
+        existing = MatchReport.query.filter_by(fixture_id=fixture.id).first()
+        if existing is not None and existing.inputs_key == inputs_key:
+            trace.cached("report")
+            trace.finish("cached")
+            return "unchanged"
+        report = _build_report_for_fixture(fixture, trace=trace, searches=searches)
+        if not report:
+            raise ValueError("Report generation returned empty output.")
+        save_shared_report(fixture, report, searches)
+        trace.finish("ok")
+        return "refreshed" if existing is not None else "created"
+    except Exception as exc:
+        trace.finish("error", f"{type(exc).__name__}: {exc}")
+        raise
+    finally:
+        trace.flush()
+
+
+def prewarm_round_reports(round_number=None, workers=3, refresh=False):
+    """Pre-generate shared reports for every fixture in a round, ``workers`` at a time.
+
+    Returns a dict of outcome -> count, with failures counted under "failed"
+    rather than stopping the batch.
+    """
+    round_number = round_number or find_current_round()
+    fixture_ids = [
+        fixture_id
+        for (fixture_id,) in round_fixtures_query(round_number).with_entities(FixtureFree.id).all()
+    ]
+    app = current_app._get_current_object()
+
+    def _one(fixture_id):
+        with app.app_context():
+            fixture = db.session.get(FixtureFree, fixture_id)
+            try:
+                return prewarm_report(fixture, refresh=refresh)
+            except Exception as exc:
+                print(f"Could not pre-warm the report for match {fixture.match_id}: {type(exc).__name__}: {exc}")
+                return "failed"
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        outcomes = list(executor.map(_one, fixture_ids))
+    return {outcome: outcomes.count(outcome) for outcome in sorted(set(outcomes))}
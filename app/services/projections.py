@@ -0,0 +1,168 @@
+import numpy as np
+
+from app import db
+from app.models import FixtureFree, Tip, User, UserSeasonTotals
+from app.services.data_version import get_data_versions
+from app.services.ratings import current_ratings
+from app.utils.helper_functions import LEADERBOARD_EXCLUDED_USERNAMES
+from app.utils.ttl_cache import TTLCache
+
+DEFAULT_SIMULATIONS = 20_000
+# "elo": each match's home win chance from the team ratings; "coin": 50/50.
+PROBABILITY_MODELS = ("elo", "coin")
+
+# Keyed on the data versions, so a score update (or new tips) misses the cache
+# and re-simulates; the TTL only bounds how long unused entries linger.
+PROJECTION_CACHE = TTLCache(maxsize=16, ttl_seconds=24 * 60 * 60)
+
+
+def simulate_standings(base_points, picks, alive, round_of, home_win_probability,
+                       simulations=DEFAULT_SIMULATIONS, seed=None):
+    """Simulate the remaining matches and return each user's chance of 1st and top 3.
+
+    ``base_points`` (users) are the points already won; ``picks`` (users x
+    matches) is +1 for a home tip, -1 for an away tip and 0 for a tip that
+    can't win; ``alive`` (users x rounds) is whether a user can still get the
+    round's perfect-round bonus; ``round_of`` (matches) indexes the match's
+    round in ``alive``; ``home_win_probability`` (matches) drives the results.
+    Ranks are dense, as on the leaderboard, so ties share a place.
+
+    Returns ``(first, top3, expected_points)`` arrays, one value per user.
+    """
+    rng = np.random.default_rng(seed)
+    picks = picks.astype(np.float32)
+    # +1 where the home team won, -1 where the away team did.
+    results = np.where(
+        rng.random((simulations, len(home_win_probability)), dtype=np.float32) < home_win_probability,
+        np.float32(1), np.float32(-1),
+    )
+    # pick * result is +1 for a correct tip and -1 for a wrong one (0 for a
+    # tip that can't win), so correct tips = (sum of products + tips that
+    # count) / 2, for every simulation and user in one matrix product.
+    totals = base_points.astype(np.float32) + (results @ picks.T + np.abs(picks).sum(axis=1)) / 2
+    for r in np.unique(round_of):
+        matches = round_of == r
+        # All of a round's tips are right only when the products sum to the
+        # number of matches; users who already missed one are given a target
+        # they can't reach.
+        target = np.where(alive[:, r], matches.sum(), matches.sum() + 1).astype(np.float32)
+        totals += results[:, matches] @ picks[:, matches].T == target
+
+    ordered = -np.sort(-totals, axis=1)
+    new_value = np.ones_like(ordered, dtype=bool)
+    new_value[:, 1:] = ordered[:, 1:] != ordered[:, :-1]
+    dense_rank = np.cumsum(new_value, axis=1)  # 1-based dense rank of each sorted column
+    # Lowest total still in the top three places (everyone, if fewer distinct totals).
+    third = np.where(
+        dense_rank[:, -1] >= 3,
+        ordered[np.arange(simulations), np.argmax(dense_rank >= 3, axis=1)],
+        ordered[:, -1],
+    )
+    first = (totals == ordered[:, :1]).mean(axis=0)
+    top3 = (totals >= third[:, None]).mean(axis=0)
+    return first, top3, totals.mean(axis=0)
+
+
+def _match_probabilities(fixtures, season, model):
+    if model == "coin":
+        return np.full(len(fixtures), 0.5, dtype=np.float32)
+    ratings = current_ratings(season)
+    return np.array(
+        [ratings.predict(f.home_team, f.away_team)["home_win_probability"] for f in fixtures],
+        dtype=np.float32,
+    )
+
+
+def project_standings(season, model="elo", simulations=DEFAULT_SIMULATIONS, seed=None):
+    """Each leaderboard user's chance of finishing 1st and in the top 3 this season.
+
+    Untipped matches count as the away team, which is what the tips cutoff
+    auto-assigns. Returns rows sorted by chance of winning, or an empty list
+    once every match has a result. Cached until fixtures, tips or standings
+    change.
+    """
+    if model not in PROBABILITY_MODELS:
+        raise ValueError(f"Unknown probability model {model!r}; expected one of {PROBABILITY_MODELS}.")
+    versions = get_data_versions()
+    key = (season, model, simulations, seed, tuple(sorted(versions.items())))
+    cached = PROJECTION_CACHE.get(key)
+    if cached is not None:
+        return cached
+
+    users = (
+        db.session.query(User.id, User.username, UserSeasonTotals.total_points)
+        .join(UserSeasonTotals, UserSeasonTotals.user_id == User.id)
+        .filter(UserSeasonTotals.season == season)
+        .filter(~User.username.in_(LEADERBOARD_EXCLUDED_USERNAMES))
+        .all()
+    )
+    open_rounds = [
+        r for (r,) in db.session.query(FixtureFree.round).filter(
+            FixtureFree.season == season,
+            (FixtureFree.home_score.is_(None)) | (FixtureFree.away_score.is_(None)),
+        ).distinct()
+    ]
+    fixtures = (
+        FixtureFree.query
+        .filter(FixtureFree.season == season, FixtureFree.round.in_(open_rounds))
+        .order_by(FixtureFree.round, FixtureFree.id)
+        .all()
+    )
+    # Finals fixtures have no teams until the bracket is set; nobody can tip them yet.
+    remaining = [
+        f for f in fixtures
+        if f.winning_team is None and f.home_team and f.away_team
+    ]
+    if not users or not remaining:
+        PROJECTION_CACHE.set(key, [])
+        return []
+
+    user_index = {user_id: i for i, (user_id, _, _) in enumerate(users)}
+    round_index = {r: i for i, r in enumerate(sorted(open_rounds))}
+    match_index = {f.id: i for i, f in enumerate(remaining)}
+    by_id = {f.id: f for f in fixtures}
+
+    picks = np.full((len(users), len(remaining)), -1, dtype=np.int8)  # away, as auto-assigned
+    correct_so_far = np.zeros((len(users), len(round_index)), dtype=np.int16)
+    tips = db.session.query(Tip.user_id, Tip.fixture_id, Tip.selected_team).filter(Tip.fixture_id.in_(by_id))
+    for user_id, fixture_id, team in tips:
+        u = user_index.get(user_id)
+        if u is None:
+            continue
+        fixture = by_id[fixture_id]
+        m = match_index.get(fixture_id)
+        if m is not None:
+            picks[u, m] = 1 if team == fixture.home_team else -1 if team == fixture.away_team else 0
+        elif team == fixture.winning_team:
+            correct_so_far[u, round_index[fixture.round]] += 1
+
+    decided = np.zeros(len(round_index), dtype=np.int16)
+    for fixture in fixtures:
+        if fixture.winning_team is not None:
+            decided[round_index[fixture.round]] += 1
+    alive = correct_so_far == decided
+
+    first, top3, expected = simulate_standings(
+        np.array([points or 0 for _, _, points in users]),
+        picks,
+        alive,
+        np.array([round_index[f.round] for f in remaining]),
+        _match_probabilities(remaining, season, model),
+        simulations=simulations,
+        seed=seed,
+    )
+    rows = sorted(
+        (
+            {
+                "username": username,
+                "points": points or 0,
+                "expected_points": round(float(expected[i]), 1),
+                "win_probability": round(float(first[i]), 4),
+                "top3_probability": round(float(top3[i]), 4),
+            }
+            for i, (_, username, points) in enumerate(users)
+        ),
+        key=lambda row: (-row["win_probability"], -row["top3_probability"], row["username"]),
+    )
+    PROJECTION_CACHE.set(key, rows)
+    return rows
@@ -0,0 +1,167 @@
+import threading
+
+import numpy as np
+
+from app import db
+from app.models import FixtureFree
+from app.services.seasons import current_season_year, round_fixtures_query
+from app.services.team_stats import season_games
+
+# Elo with a home ground advantage and a margin-of-victory multiplier.
+# Between seasons every rating is pulled a quarter of the way back to the mean.
+INITIAL_RATING = 1500.0
+HOME_ADVANTAGE = 50.0
+K_FACTOR = 30.0
+SEASON_CARRYOVER = 0.75
+
+_STATE = None
+_STATE_LOCK = threading.Lock()
+
+
+def win_probability(home_rating, away_rating, home_advantage=HOME_ADVANTAGE):
+    """Chance the home team wins, given both teams' ratings (numbers or arrays)."""
+    return 1.0 / (1.0 + 10 ** ((away_rating - home_rating - home_advantage) / 400.0))
+
+
+def margin_multiplier(margin, winner_rating_gap):
+    """How much a result of ``margin`` points moves ratings (numbers or arrays).
+
+    Bigger wins move ratings more, but less so when the favourite wins big
+    (which the ratings already expected).
+    """
+    return np.log(np.abs(margin) + 1) * 2.2 / (winner_rating_gap * 0.001 + 2.2)
+
+
+class EloRatings:
+    """Team ratings replayed game by game from completed fixtures."""
+
+    def __init__(self):
+        self.ratings = {}
+        self.season = None
+        self.games = 0
+
+    def rating(self, team):
+        return self.ratings.get(team, INITIAL_RATING)
+
+    def start_season(self, season):
+        if self.season is not None and season != self.season:
+            self.ratings = {
+                team: INITIAL_RATING + (rating - INITIAL_RATING) * SEASON_CARRYOVER
+                for team, rating in self.ratings.items()
+            }
+        self.season = season
+
+    def apply(self, home, away, home_score, away_score):
+        home_rating, away_rating = self.rating(home), self.rating(away)
+        expected = win_probability(home_rating, away_rating)
+        margin = home_score - away_score
+        actual = 1.0 if margin > 0 else 0.0 if margin < 0 else 0.5
+        gap = (home_rating + HOME_ADVANTAGE - away_rating) * (1 if margin >= 0 else -1)
+        if margin:
+            change = K_FACTOR * float(margin_multiplier(margin, gap)) * (actual - expected)
+        else:
+            change = K_FACTOR * (actual - expected)
+        self.ratings[home] = home_rating + change
+        self.ratings[away] = away_rating - change
+        self.games += 1
+
+    def apply_games(self, arrays, start=0, before_round=None):
+        """Apply rows ``start:`` of a season_games() table in kickoff order."""
+        rows = np.arange(start, len(arrays["round"]))
+        if before_round is not None:
+            rows = rows[arrays["round"][rows] < before_round]
+        for row in rows[np.argsort(arrays["kickoff"][rows], kind="stable")]:
+            self.apply(
+                arrays["home"][row],
+                arrays["away"][row],
+                int(arrays["home_score"][row]),
+                int(arrays["away_score"][row]),
+            )
+
+    def predict(self, home, away):
+        probability = win_probability(self.rating(home), self.rating(away))
+        return {
+            "home_team": home,
+            "away_team": away,
+            "home_rating": round(self.rating(home), 1),
+            "away_rating": round(self.rating(away), 1),
+            "home_win_probability": round(probability, 3),
+            "pick": home if probability >= 0.5 else away,
+        }
+
+
+class _RatingsState:
+    def __init__(self):
+        self.elo = EloRatings()
+        self.applied = {}  # season -> (rows applied, corrections seen)
+        self.lock = threading.Lock()
+
+
+def _seasons_up_to(season):
+    return sorted(
+        year for (year,) in db.session.query(FixtureFree.season).filter(FixtureFree.season <= season).distinct()
+    )
+
+
+def ratings_before(season, before_round):
+    """Ratings from every completed game before ``before_round`` of ``season``.
+
+    Replays from scratch; for backtests and other as-of-then questions.
+    """
+    elo = EloRatings()
+    for year in _seasons_up_to(season):
+        arrays, _ = season_games(year)
+        elo.start_season(year)
+        elo.apply_games(arrays, before_round=before_round if year == season else None)
+    return elo
+
+
+def current_ratings(season=None):
+    """Ratings from every completed game up to ``season`` (the current one by default).
+
+    Kept between calls and updated with only the games completed since; a
+    corrected score, or an earlier season gaining games, replays them all.
+    """
+    global _STATE
+    season = season or current_season_year()
+    with _STATE_LOCK:
+        if _STATE is None:
+            _STATE = _RatingsState()
+        state = _STATE
+    with state.lock:
+        seasons = _seasons_up_to(season)
+        tables = {year: season_games(year) for year in seasons}
+        applied = state.applied
+        stale = (
+            (state.elo.season is not None and state.elo.season > season)
+            or any(
+                year in applied and (corrections != applied[year][1] or len(arrays["round"]) < applied[year][0])
+                for year, (arrays, corrections) in tables.items()
+            )
+            or any(
+                applied.get(year, (0, 0))[0] != len(tables[year][0]["round"])
+                for year in seasons[:-1]
+            )
+        )
+        if stale:
+            state.elo, state.applied = EloRatings(), {}
+        for year in seasons:
+            arrays, corrections = tables[year]
+            start = state.applied.get(year, (0, 0))[0]
+            if start == len(arrays["round"]) and year in state.applied:
+                continue
+            state.elo.start_season(year)
+            state.elo.apply_games(arrays, start=start)
+            state.applied[year] = (len(arrays["round"]), corrections)
+        return state.elo
+
+
+def predict_round(round_number, season=None):
+    """Pick and home win probability for every fixture in a round, keyed by match_id."""
+    season = season or current_season_year()
+    elo = current_ratings(season)
+    return {
+        fixture.match_id: elo.predict(fixture.home_team, fixture.away_team)
+        for fixture in round_fixtures_query(round_number, season)
+        if fixture.home_team and fixture.away_team
+    }
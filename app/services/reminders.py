@@ -0,0 +1,52 @@
+from app.services.fixtures import find_current_round
+from app.utils.helper_functions import get_users_missing_tips
+from app.utils.send_sms import get_sender, send_bulk
+
+ADMIN_NUMBER = '488534484'
+
+REMINDER_MSG = '''
+⚠️ Hey! This is your weekly tipping reminder. ⚠️
+Don’t forget to submit by 5PM Thursday!
+You still have {missing} match(es) to tip for round {round_number}.
+All participants who havnt submited by then will automatically be given the away teams
+'''
+
+
+def send_tip_reminders(round_number=None, workers=4, rate=1.0, retries=2, sender=None, dry_run=False):
+    """SMS every user with missing tips for the round. Needs an app context."""
+    round_number = round_number or find_current_round()
+    missing_by_user = get_users_missing_tips(round_number)
+
+    recipients = []
+    messages = []
+    for entry in missing_by_user.values():
+        user = entry["user"]
+        if not user.phone_number:
+            continue
+        recipients.append(user.username)
+        messages.append((
+            user.phone_number,
+            REMINDER_MSG.format(missing=len(entry["missing"]), round_number=round_number),
+        ))
+
+    print(f"{len(missing_by_user)} users are missing tips for round {round_number}, "
+          f"{len(messages)} have a phone number.")
+    if dry_run:
+        for username, entry in zip(recipients, messages):
+            print(f"Would remind: {username} ({entry[0]})")
+        return None
+
+    sender = sender or get_sender()
+    summary = send_bulk(messages, sender, max_workers=workers, rate_per_second=rate, retries=retries)
+
+    failed_numbers = {r["recipient"] for r in summary["failed"]}
+    reminded = [u for u, (number, _) in zip(recipients, messages) if number not in failed_numbers]
+    for result in summary["failed"]:
+        print(f"Failed to remind {result['recipient']}: {result['error']}")
+
+    names = "\n ".join(reminded)
+    send_bulk([(ADMIN_NUMBER, f'reminders where sent to:\n {names}')], sender, max_workers=1, rate_per_second=rate, retries=retries)
+
+    print(f"Sent {len(summary['sent'])}, failed {len(summary['failed'])}, "
+          f"retries {summary['retries']}, in {summary['elapsed_seconds']:.1f}s.")
+    return summary
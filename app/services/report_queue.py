@@ -0,0 +1,221 @@
+import heapq
+import threading
+import time
+import traceback
+from collections import OrderedDict, deque
+
+
+class QueueFull(Exception):
+    """A job was turned away; ``retry_after`` is a suggested wait in seconds."""
+
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class _Job:
+    __slots__ = ("key", "user_id", "fn", "args", "started")
+
+    def __init__(self, key, user_id, fn, args):
+        self.key = key
+        self.user_id = user_id
+        self.fn = fn
+        self.args = args
+        self.started = None
+
+
+class FairJobQueue:
+    """Background jobs on a fixed set of worker threads, taken round-robin by user.
+
+    Each user has their own FIFO of waiting jobs and the workers take one job
+    from each user in turn, so one user queueing a whole round of reports
+    doesn't hold everyone else up. ``per_user_limit`` caps a user's queued plus
+    running jobs and ``max_depth`` the total waiting; past either, ``submit``
+    raises ``QueueFull``. Waits are estimated from the last ``history`` job
+    durations (``default_duration`` seconds until there are any).
+    """
+
+    def __init__(self, workers=1, per_user_limit=2, max_depth=20, default_duration=90.0, history=20):
+        self.workers = workers
+        self.per_user_limit = per_user_limit
+        self.max_depth = max_depth
+        self.default_duration = default_duration
+        self._pending = OrderedDict()  # user_id -> deque of jobs, in turn order
+        self._jobs = {}  # key -> queued or running job
+        self._running = set()
+        self._durations = deque(maxlen=history)
+        self._cond = threading.Condition()
+        self._threads = []
+        self.completed = 0
+        self.rejected = 0
+
+    def submit(self, key, user_id, fn, *args):
+        """Queue ``fn(*args)`` under ``key`` unless it is already queued or running.
+
+        Returns the job's ``(position, eta_seconds)`` as ``status`` would.
+        """
+        with self._cond:
+            if key not in self._jobs:
+                user_jobs = [job for job in self._jobs.values() if job.user_id == user_id]
+                if len(user_jobs) >= self.per_user_limit:
+                    self.rejected += 1
+                    retry_after = min(self._eta_locked(job) for job in user_jobs)
+                    raise QueueFull(
+                        f"You already have {len(user_jobs)} reports in progress. "
+                        "Wait for one to finish before starting another.",
+                        retry_after,
+                    )
+                if self._queued_locked() >= self.max_depth:
+                    self.rejected += 1
+                    raise QueueFull(
+                        "Lots of reports are being generated right now. Try again shortly.",
+                        self._average_duration() / self.workers,
+                    )
+                job = _Job(key, user_id, fn, args)
+                self._pending.setdefault(user_id, deque()).append(job)
+                self._jobs[key] = job
+                self._start_workers_locked()
+                self._cond.notify()
+            return self._status_locked(key)
+
+    def status(self, key):
+        """``(position, eta_seconds)`` for a job: position 0 while running, None if unknown."""
+        with self._cond:
+            return self._status_locked(key)
+
+    def cancel(self, key):
+        """Drop a waiting job. A running job keeps going but no longer holds ``key``."""
+        with self._cond:
+            job = self._jobs.pop(key, None)
+            if job is None or job in self._running:
+                return
+            queue = self._pending.get(job.user_id)
+            queue.remove(job)
+            if not queue:
+                del self._pending[job.user_id]
+
+    def stats(self):
+        with self._cond:
+            return {
+                "workers": self.workers,
+                "running": len(self._running),
+                "queued": self._queued_locked(),
+                "users_waiting": len(self._pending),
+                "per_user_limit": self.per_user_limit,
+                "max_depth": self.max_depth,
+                "avg_duration_seconds": round(self._average_duration(), 1),
+                "completed": self.completed,
+                "rejected": self.rejected,
+            }
+
+    def __contains__(self, key):
+        with self._cond:
+            return key in self._jobs
+
+    def _queued_locked(self):
+        return sum(len(queue) for queue in self._pending.values())
+
+    def _average_duration(self):
+        if not self._durations:
+            return self.default_duration
+        return sum(self._durations) / len(self._durations)
+
+    def _turn_order_locked(self):
+        """Waiting jobs in the order the workers will take them."""
+        queues = [list(queue) for queue in self._pending.values()]
+        order = []
+        depth = 0
+        while any(len(queue) > depth for queue in queues):
+            order.extend(queue[depth] for queue in queues if len(queue) > depth)
+            depth += 1
+        return order
+
+    def _eta_locked(self, job):
+        average = self._average_duration()
+        now = time.monotonic()
+        if job in self._running:
+            return max(average - (now - job.started), 1.0)
+        # Hand each job ahead of this one to whichever worker frees up first.
+        free_at = [max(average - (now - running.started), 0.0) for running in self._running]
+        free_at += [0.0] * max(self.workers - len(free_at), 0)
+        heapq.heapify(free_at)
+        for ahead in self._turn_order_locked():
+            start = heapq.heappop(free_at)
+            if ahead is job:
+                return start + average
+            heapq.heappush(free_at, start + average)
+        return average
+
+    def _status_locked(self, key):
+        job = self._jobs.get(key)
+        if job is None:
+            return None, None
+        if job in self._running:
+            return 0, self._eta_locked(job)
+        return self._turn_order_locked().index(job) + 1, self._eta_locked(job)
+
+    def _start_workers_locked(self):
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(target=self._work, name=f"report-worker-{len(self._threads)}", daemon=True)
+            self._threads.append(thread)
+            thread.start()
+
+    def _take_locked(self):
+        # Take from the user at the front, then send them to the back.
+        user_id, queue = next(iter(self._pending.items()))
+        job = queue.popleft()
+        del self._pending[user_id]
+        if queue:
+            self._pending[user_id] = queue
+        return job
+
+    def _work(self):
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                job = self._take_locked()
+                job.started = time.monotonic()
+                self._running.add(job)
+            try:
+                job.fn(*job.args)
+            except Exception:
+                traceback.print_exc()
+            finally:
+                with self._cond:
+                    self._running.discard(job)
+                    self._durations.append(time.monotonic() - job.started)
+                    self.completed += 1
+                    if self._jobs.get(job.key) is job:
+                        del self._jobs[job.key]
+
+
+class ConnectionBudget:
+    """Non-blocking counter for long-lived connections (report SSE streams).
+
+    Each one holds a web server thread for as long as it is open, so the
+    budget keeps enough threads free for ordinary requests; past ``limit``,
+    ``acquire`` returns False and the caller turns the connection away.
+    """
+
+    def __init__(self, limit):
+        self.limit = limit
+        self._open = 0
+        self._lock = threading.Lock()
+        self.rejected = 0
+
+    def acquire(self):
+        with self._lock:
+            if self._open >= self.limit:
+                self.rejected += 1
+                return False
+            self._open += 1
+            return True
+
+    def release(self):
+        with self._lock:
+            self._open = max(self._open - 1, 0)
+
+    def stats(self):
+        with self._lock:
+            return {"open": self._open, "limit": self.limit, "rejected": self.rejected}
@@ -0,0 +1,60 @@
+import json
+import threading
+
+
+class ReportStream:
+    """Append-only event log for one report job that any number of readers can follow.
+
+    The worker publishes ``(event, data)`` pairs as the pipeline progresses;
+    each reader replays from its own position, so a browser that reconnects
+    (EventSource sends ``Last-Event-ID``) picks up where it left off.
+    """
+
+    def __init__(self):
+        self._events = []
+        self._cond = threading.Condition()
+        self.finished = False
+
+    def publish(self, event, data=None):
+        with self._cond:
+            self._events.append((event, data or {}))
+            self._cond.notify_all()
+
+    def close(self):
+        with self._cond:
+            self.finished = True
+            self._cond.notify_all()
+
+    def follow(self, start=0, heartbeat_seconds=15):
+        """Yield ``(index, event, data)`` from ``start`` until the stream closes.
+
+        Yields ``None`` whenever nothing arrives within ``heartbeat_seconds`` so
+        the caller can keep the connection alive.
+        """
+        index = start
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: len(self._events) > index or self.finished, heartbeat_seconds)
+                batch = self._events[index:]
+                finished = self.finished
+            if not batch:
+                if finished:
+                    return
+                yield None
+                continue
+            for event, data in batch:
+                yield index, event, data
+                index += 1
+
+
+def sse_event(event, data, event_id=None):
+    """Format one Server-Sent Events frame."""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data)}")
+    return "\n".join(lines) + "\n\n"
+
+
+SSE_HEARTBEAT = ": keep-alive\n\n"
@@ -0,0 +1,203 @@
+from datetime import datetime
+
+import pytz
+from agents import Agent, WebSearchTool, ModelSettings
+from pydantic import BaseModel, Field
+
+from app import db
+from app.models import FixtureResearch
+from app.services.research_cache import RESEARCH_TTL, run_search
+from app.utils.sql import dialect_insert
+
+# Searches per team. Results, form and head-to-head come from our own
+# fixtures (see team_stats), so the planner only needs news and odds.
+DEFAULT_SEARCH_COUNT = 6
+
+
+class WebSearchItem(BaseModel):
+    reason: str = Field(description="Your reasoning for why this search is important to the query.")
+    query: str = Field(description="The search term to use for the web search.")
+
+class WebSearchPlan(BaseModel):
+    searches: list[WebSearchItem] = Field(description="A list of web searches to perform to best answer the query.")
+
+
+def _sydney_now():
+    return datetime.now(pytz.timezone("Australia/Sydney")).replace(tzinfo=None)
+
+
+def _notify(on_event, event, **data):
+    if on_event is not None:
+        on_event(event, data)
+
+
+def _research_agents(fixture, search_count):
+    home_team = fixture.home_team or "TBD"
+    away_team = fixture.away_team or "TBD"
+    game_date = fixture.date.isoformat() if fixture.date else "TBD"
+    game_time = fixture.time.strftime("%H:%M") if fixture.time else "TBD"
+
+    ## Search Term Planner Agent ##
+    INSTRUCTIONS_1 = (
+        "You are a helpful \"Australian NRL (National Rugby League) performance\" research assisstant who specialises in "
+        "finding the latest relavant nrl team stats and figures"
+        "In order to make a detailed team draw analysis report, come up with a set of web searches you will need to perform "
+        "so that you have the latest and relavant information about the competing teams. "
+        "You will be passing these well thoughtout web search queries to your lead web search manager. "
+
+        "# IMPORTANT INFORMATION: #"
+        f"The upcoming match that you are predicting is: {home_team} vs {away_team}. "
+        f"You are to perform {search_count} for {home_team} and {search_count} for {away_team}. "
+
+        "# FURTHER MATCH CONTEXT: #"
+        f"Home team: {home_team}. "
+        f"Away team: {away_team}. "
+        f"Current Date: {game_date}. "
+        f"Time of the game: {game_time}."
+
+        "MANATORY SEARCHES TO INCLUDE (BUT NOT LIMITED TO)"
+        "- TAB betting odds for both team"
+        "- Key players that are NOT playing in the upcoming match (due to injuries, suspensions, ect)"
+        "- Key players that are NOT playing in the upcoming match (due to injuries, suspensions, ect)"
+        "- Oppinions about match results by proffessional commentators"
+        "- Predicted winning odds"
+
+        "# ALREADY KNOWN (DO NOT SEARCH FOR THESE) #"
+        "This season's results, points for and against, home and away records, recent form and head to head "
+        "results are provided from our own data."
+    )
+
+    search_plan_agent = Agent(
+        name="Search Term Planner Agent",
+        instructions=INSTRUCTIONS_1,
+        model="gpt-4o-mini",
+        output_type=WebSearchPlan
+
+    )
+
+    ## Search Agent ##
+    INSTRUCTIONS_2 = (
+        "You are an Australian NRL Footy Tipping research assisstant. Given a search term, you search the web for that term and "
+        "produce a concise summary of the results. The summary must 2-3 paragraphs and less than 300 "
+        "words. Capture the main points. Write succintly, no need to have complete sentences or good "
+        "grammar. This will be consumed by someone synthesizing a report, so its vital you capture the "
+        "essence and ignore any fluff. Do not include any additional commentary other than the summary itself.\n\n"
+
+        "# IMPORTANT INFORMATION: #"
+        f"You are performing searches based on the upcoming game between {home_team} and {away_team}. "
+        "Return equal volume of research for each team. "
+
+        "# FURTHER CONTEXT: #"
+        f"Home team: {home_team}. "
+        f"Away team: {away_team}. "
+        f"Current Date: {game_date}. "
+        f"Time of the game: {game_time}."
+
+        "# MANATORY INFORMATION TO INCLUDE (BUT NOT LIMITED TO) #"
+        "- TAB betting odds for both team"
+        "- Key players that are NOT playing in the upcoming match (due to injuries, suspensions, ect)"
+        "- Key players that are playing in the upcoming match (due to injuries, suspensions, ect)"
+        "- Recent performance stats between the two teams "
+        "- Oppinions about match results by proffessional commentators"
+        "- Predicted winning odds"
+    )
+
+    web_search_agent = Agent(
+        name="Web Search Agent",
+        instructions=INSTRUCTIONS_2,
+        tools=[WebSearchTool(search_context_size="low")],
+        model="gpt-4o-mini",
+        model_settings=ModelSettings(tool_choices="required")
+
+    )
+
+    return search_plan_agent, web_search_agent
+
+
+def get_fixture_research(fixture, max_age=RESEARCH_TTL, search_count=None, now=None):
+    """The fixture's saved research if it is younger than ``max_age``, else None.
+
+    With ``search_count``, research planned for a different number of
+    searches (e.g. before DEFAULT_SEARCH_COUNT changed) doesn't count.
+    """
+    now = now or _sydney_now()
+    query = FixtureResearch.query.filter(
+        FixtureResearch.fixture_id == fixture.id,
+        FixtureResearch.created_at > now - max_age,
+    )
+    if search_count is not None:
+        query = query.filter(FixtureResearch.search_count == search_count)
+    return query.first()
+
+
+def save_fixture_research(fixture, search_count, searches, now=None):
+    now = now or _sydney_now()
+    values = {
+        "fixture_id": fixture.id,
+        "season": fixture.season,
+        "round_number": fixture.round,
+        "search_count": search_count,
+        "searches": searches,
+        "created_at": now,
+    }
+    stmt = dialect_insert(FixtureResearch).values(**values)
+    if hasattr(stmt, "on_conflict_do_update"):
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["fixture_id"],
+            set_={k: stmt.excluded[k] for k in ("search_count", "searches", "created_at")},
+        )
+    else:
+        FixtureResearch.query.filter_by(fixture_id=fixture.id).delete()
+    db.session.execute(stmt)
+    db.session.commit()
+
+
+def research_fixture(fixture, trace, search_count=DEFAULT_SEARCH_COUNT, on_event=None, max_age=RESEARCH_TTL):
+    """Plan and run the web searches for a fixture, or reuse recent research.
+
+    Returns a list of ``{"query", "reason", "summary"}`` dicts. The result is
+    saved per fixture so the report writer and tipperbot share one research
+    pass; ``max_age=None`` forces a fresh one, as does saved research planned
+    for a different ``search_count``. Emits "plan" and "search"
+    events and records each agent call in ``trace``.
+    """
+    existing = get_fixture_research(fixture, max_age, search_count) if max_age else None
+    if existing is not None:
+        searches = existing.searches
+        trace.cached("research")
+        _notify(on_event, "plan", searches=[s["query"] for s in searches])
+        _notify(on_event, "search", done=len(searches), total=len(searches), query=None)
+        return searches
+
+    search_plan_agent, web_search_agent = _research_agents(fixture, search_count)
+    plan_result = trace.call(
+        "planner",
+        search_plan_agent,
+        "Create a web search plan for the upcoming match."
+    )
+    if isinstance(plan_result, dict):
+        plan = WebSearchPlan(**plan_result)
+    elif hasattr(plan_result, "searches"):
+        plan = plan_result
+    else:
+        raise ValueError("Search plan output is missing 'searches'.")
+    _notify(on_event, "plan", searches=[item.query for item in plan.searches])
+
+    searches = []
+    for index, item in enumerate(plan.searches, start=1):
+        summary = run_search(trace, web_search_agent, item.query, fixture)
+        searches.append({"query": item.query, "reason": item.reason, "summary": summary})
+        _notify(on_event, "search", done=index, total=len(plan.searches), query=item.query)
+
+    save_fixture_research(fixture, search_count, searches)
+    return searches
+
+
+def format_research(searches):
+    """The research summaries as the block of text the analyst and picker prompts expect."""
+    return "\n\n".join(
+        f"[Search {index}] {item['query']}\n"
+        f"Reason: {item['reason']}\n"
+        f"Summary: {item['summary']}"
+        for index, item in enumerate(searches, start=1)
+    )
@@ -0,0 +1,124 @@
+import hashlib
+import re
+from datetime import datetime, timedelta
+
+import pytz
+from sqlalchemy import delete, select
+from sqlalchemy.exc import SQLAlchemyError
+
+from app import db
+from app.models import ResearchCacheEntry
+from app.utils.sql import dialect_insert
+
+# Injury lists and odds move during the week; a day-old summary is stale.
+RESEARCH_TTL = timedelta(hours=12)
+
+# Words that don't change what a search finds. Team names, stats words and
+# bookmaker names are what make two queries the same search.
+_STOPWORDS = frozenset(
+    "a an and are at between by for from game games in is latest match matches "
+    "news nrl of on recent round the this to upcoming v versus vs week who with".split()
+)
+_YEAR = re.compile(r"^(19|20)\d\d$")
+
+
+def _sydney_now():
+    return datetime.now(pytz.timezone("Australia/Sydney")).replace(tzinfo=None)
+
+
+def _singular(word):
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 4 and word.endswith(("ches", "shes", "sses", "xes")):
+        return word[:-2]
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def normalize_query(query):
+    """Reduce a search query to a canonical form so near-duplicates share a key.
+
+    Lower-cases, drops punctuation, stopwords and years, strips plural "s"
+    and sorts the remaining words: "Storm injuries vs Eels 2026" and "eels
+    storm injury" both become "eel injury storm".
+    """
+    words = re.findall(r"[a-z0-9$.]+", query.lower())
+    words = {_singular(w.strip(".")) for w in words}
+    return " ".join(sorted(w for w in words if w and w not in _STOPWORDS and not _YEAR.match(w)))
+
+
+def research_key(query):
+    return hashlib.sha256(normalize_query(query).encode("utf-8")).hexdigest()
+
+
+# Cache reads and writes use their own short transactions rather than the
+# session, so a pipeline never holds a lock across minutes of LLM calls and a
+# cache failure can't roll back the caller's work.
+
+def get_cached_research(season, round_number, query, now=None):
+    """The cached summary for ``query`` in this round, or None."""
+    now = now or _sydney_now()
+    stmt = select(ResearchCacheEntry.summary).where(
+        ResearchCacheEntry.season == season,
+        ResearchCacheEntry.round_number == round_number,
+        ResearchCacheEntry.query_key == research_key(query),
+        ResearchCacheEntry.expires_at > now,
+    )
+    try:
+        with db.engine.connect() as conn:
+            return conn.execute(stmt).scalar()
+    except SQLAlchemyError as exc:
+        print(f"Research cache read failed: {exc}")
+        return None
+
+
+def store_research(season, round_number, query, summary, now=None):
+    now = now or _sydney_now()
+    values = {
+        "season": season,
+        "round_number": round_number,
+        "query_key": research_key(query),
+        "query_text": query[:500],
+        "summary": summary,
+        "created_at": now,
+        "expires_at": now + RESEARCH_TTL,
+    }
+    stmt = dialect_insert(ResearchCacheEntry).values(**values)
+    replace = None
+    if hasattr(stmt, "on_conflict_do_update"):
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["season", "round_number", "query_key"],
+            set_={k: stmt.excluded[k] for k in ("query_text", "summary", "created_at", "expires_at")},
+        )
+    else:
+        # No upsert on this dialect: replace the row in the same transaction.
+        replace = delete(ResearchCacheEntry).where(
+            ResearchCacheEntry.season == season,
+            ResearchCacheEntry.round_number == round_number,
+            ResearchCacheEntry.query_key == values["query_key"],
+        )
+    try:
+        with db.engine.begin() as conn:
+            conn.execute(delete(ResearchCacheEntry).where(ResearchCacheEntry.expires_at <= now))
+            if replace is not None:
+                conn.execute(replace)
+            conn.execute(stmt)
+    except SQLAlchemyError as exc:
+        print(f"Research cache write failed: {exc}")
+
+
+def run_search(trace, agent, query, fixture):
+    """Summarize ``query`` with the web search agent, reusing this round's cached result.
+
+    Cache hits are recorded in ``trace`` as cached "search" runs, which is
+    where the hit rate on the admin AI Usage tab comes from.
+    """
+    summary = get_cached_research(fixture.season, fixture.round, query)
+    if summary is not None:
+        trace.cached("search", agent)
+        return summary
+    result = trace.call("search", agent, query)
+    summary = result if isinstance(result, str) else str(result)
+    store_research(fixture.season, fixture.round, query, summary)
+    return summary
@@ -0,0 +1,274 @@
+import logging
+import threading
+import time
+import traceback
+from datetime import datetime, timedelta
+from functools import wraps
+
+from apscheduler.triggers.cron import CronTrigger
+from sqlalchemy.exc import IntegrityError
+
+from app import db, scheduler
+from app.models import JobRun, au_tz
+from app.services.fixtures import (
+    find_current_round,
+    next_live_poll_interval,
+    refresh_live_scores,
+    update_user_tip_stats,
+    upsert_free_fixtures,
+)
+from app.services.leases import job_lease
+from app.services.match_reports import prewarm_round_reports
+from app.services.reminders import send_tip_reminders
+from app.services.tips import auto_assign_missing_tips
+from app.utils.helper_functions import is_past_round_tips_cutoff
+
+logger = logging.getLogger(__name__)
+
+# Also the window in which a late-firing cron job still counts as its slot.
+MISFIRE_GRACE_SECONDS = 600
+JOB_RUN_RETENTION = timedelta(days=30)
+
+_JOB_LOCKS = {}
+_JOB_LOCKS_GUARD = threading.Lock()
+_START_LOCK = threading.Lock()
+_LAST_PRUNE = None
+
+
+def _job_lock(job_name):
+    with _JOB_LOCKS_GUARD:
+        return _JOB_LOCKS.setdefault(job_name, threading.Lock())
+
+
+def _scheduled_for(job_name, slot_seconds, now):
+    """The trigger slot a run belongs to, as naive Sydney time (None for manual runs).
+
+    Cron jobs use the latest fire time within the misfire grace period, so a
+    worker that fires late still lands on the same slot as one that fired on
+    time. Self-rescheduling jobs (live_scores) use ``now`` floored to
+    ``slot_seconds``.
+    """
+    local_now = now.astimezone(au_tz)
+    if slot_seconds:
+        floored = int(local_now.timestamp()) // slot_seconds * slot_seconds
+        return datetime.fromtimestamp(floored, au_tz).replace(tzinfo=None)
+    definition = JOB_DEFINITIONS.get(job_name)
+    if definition is None or definition[1].get("trigger") != "cron":
+        return None
+    fields = {k: v for k, v in definition[1].items() if k != "trigger"}
+    trigger = CronTrigger(timezone=au_tz, **fields)
+    fire = trigger.get_next_fire_time(None, local_now - timedelta(seconds=MISFIRE_GRACE_SECONDS))
+    if fire is None or fire > local_now:
+        return None
+    return fire.astimezone(au_tz).replace(tzinfo=None)
+
+
+def _claim_run(job_name, scheduled_for, started_at):
+    """Record a run as started; None if another process already claimed the slot."""
+    db.session.rollback()
+    run = JobRun(job_name=job_name, status="running", scheduled_for=scheduled_for, started_at=started_at)
+    db.session.add(run)
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return None
+    return run
+
+
+def _finish_run(run, status, duration_ms, detail=None):
+    db.session.rollback()
+    run = db.session.merge(run)
+    run.status = status
+    run.finished_at = datetime.now(au_tz)
+    run.duration_ms = duration_ms
+    run.detail = detail
+    db.session.commit()
+    _prune_job_runs()
+
+
+def _prune_job_runs():
+    # At most hourly per process; the table only needs recent history.
+    global _LAST_PRUNE
+    now = time.monotonic()
+    if _LAST_PRUNE is not None and now - _LAST_PRUNE < 3600:
+        return
+    _LAST_PRUNE = now
+    cutoff = datetime.now(au_tz) - JOB_RUN_RETENTION
+    JobRun.query.filter(JobRun.started_at < cutoff).delete(synchronize_session=False)
+    db.session.commit()
+
+
+def tracked_job(job_name, lease_ttl_seconds=3600, slot_seconds=None):
+    """Run a job inside the scheduler's app context and record the outcome.
+
+    The job only runs in the process holding the cross-process lease for
+    ``job_name``, and only once per trigger slot (see ``_scheduled_for``);
+    the claimed slot is the job_runs row. Runs that lose the lease or find
+    their slot taken are logged at debug level, not recorded.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with scheduler.app.app_context():
+                started_at = datetime.now(au_tz)
+                lock = _job_lock(job_name)
+                if not lock.acquire(blocking=False):
+                    logger.debug("%s: previous run still in progress, skipping", job_name)
+                    return None
+
+                try:
+                    with job_lease(job_name, ttl_seconds=lease_ttl_seconds) as acquired:
+                        if not acquired:
+                            logger.debug("%s: lease held by another process, skipping", job_name)
+                            return None
+                        scheduled_for = _scheduled_for(job_name, slot_seconds, started_at)
+                        run = _claim_run(job_name, scheduled_for, started_at)
+                        if run is None:
+                            logger.debug("%s: already ran for %s, skipping", job_name, scheduled_for)
+                            return None
+
+                        started = time.monotonic()
+                        try:
+                            result = func(*args, **kwargs)
+                        except Exception:
+                            _finish_run(
+                                run,
+                                "failed",
+                                int((time.monotonic() - started) * 1000),
+                                traceback.format_exc(),
+                            )
+                            raise
+
+                        _finish_run(
+                            run,
+                            "success",
+                            int((time.monotonic() - started) * 1000),
+                            None if result is None else str(result),
+                        )
+                        return result
+                finally:
+                    lock.release()
+        return wrapper
+    return decorator
+
+
+@tracked_job("refresh_fixtures")
+def refresh_fixtures_job():
+    rounds = upsert_free_fixtures()
+    return f"rescored rounds {sorted(rounds)}" if rounds else None
+
+
+@tracked_job("update_tip_stats")
+def update_tip_stats_job():
+    update_user_tip_stats()
+
+
+@tracked_job("send_reminders")
+def send_reminders_job():
+    current_round = find_current_round()
+    if not current_round or is_past_round_tips_cutoff(current_round):
+        return "Tips already closed; no reminders sent."
+    summary = send_tip_reminders(current_round)
+    return f"sent={len(summary['sent'])} failed={len(summary['failed'])}"
+
+
+@tracked_job("auto_assign_tips")
+def auto_assign_tips_job():
+    current_round = find_current_round()
+    if not current_round or not is_past_round_tips_cutoff(current_round):
+        return "Tips still open; nothing assigned."
+    created_by_user = auto_assign_missing_tips(current_round)
+    return f"round={current_round} assigned={sum(created_by_user.values())} users={len(created_by_user)}"
+
+
+def _prewarm_reports(refresh):
+    current_round = find_current_round()
+    if not current_round or is_past_round_tips_cutoff(current_round):
+        return "Tips already closed; no reports generated."
+    outcomes = prewarm_round_reports(current_round, refresh=refresh)
+    return f"round={current_round} " + " ".join(f"{k}={v}" for k, v in outcomes.items())
+
+
+@tracked_job("prewarm_reports", lease_ttl_seconds=2 * 3600)
+def prewarm_reports_job():
+    return _prewarm_reports(refresh=False)
+
+
+@tracked_job("refresh_reports", lease_ttl_seconds=2 * 3600)
+def refresh_reports_job():
+    return _prewarm_reports(refresh=True)
+
+
+@tracked_job("live_scores", lease_ttl_seconds=300, slot_seconds=60)
+def live_scores_job():
+    rounds = refresh_live_scores()
+    return f"rescored rounds {sorted(rounds)}" if rounds else None
+
+
+def live_scores_tick():
+    """Poll live scores, then reschedule itself based on the fixture calendar."""
+    try:
+        live_scores_job()
+    finally:
+        # add_job would block on a scheduler that is shutting down (it holds
+        # the job store lock while waiting for this job to finish).
+        if not scheduler.running:
+            return
+        with scheduler.app.app_context():
+            interval = next_live_poll_interval()
+        scheduler.add_job(
+            id="live_scores",
+            func=live_scores_tick,
+            trigger="date",
+            run_date=datetime.now(au_tz) + interval,
+            replace_existing=True,
+            max_instances=1,
+            misfire_grace_time=60,
+        )
+
+
+# id -> (func, trigger kwargs). Times are Australia/Sydney (SCHEDULER_TIMEZONE).
+# Scores are kept fresh by the adaptive live_scores poller; the daily full
+# refresh picks up new fixtures and kickoff time changes. Match reports are
+# written Monday night, once the round's fixtures are settled, and refreshed
+# Thursday morning so the late team news is in them before the 5pm cutoff.
+JOB_DEFINITIONS = {
+    "live_scores": (live_scores_tick, {"trigger": "date"}),
+    "refresh_fixtures": (refresh_fixtures_job, {"trigger": "cron", "hour": 3, "minute": 0}),
+    "update_tip_stats": (update_tip_stats_job, {"trigger": "cron", "hour": 3, "minute": 10}),
+    "send_reminders": (send_reminders_job, {"trigger": "cron", "day_of_week": "thu", "hour": 9, "minute": 0}),
+    "auto_assign_tips": (auto_assign_tips_job, {"trigger": "cron", "day_of_week": "thu", "hour": 17, "minute": 1}),
+    "prewarm_reports": (prewarm_reports_job, {"trigger": "cron", "day_of_week": "mon", "hour": 22, "minute": 0}),
+    "refresh_reports": (refresh_reports_job, {"trigger": "cron", "day_of_week": "thu", "hour": 11, "minute": 0}),
+}
+
+
+def register_jobs(app):
+    """Attach the scheduler to ``app`` and register every job once."""
+    app.config.setdefault("SCHEDULER_TIMEZONE", "Australia/Sydney")
+    app.config.setdefault("SCHEDULER_API_ENABLED", False)
+    scheduler.init_app(app)
+    for job_id, (func, trigger) in JOB_DEFINITIONS.items():
+        scheduler.add_job(
+            id=job_id,
+            func=func,
+            replace_existing=True,
+            max_instances=1,
+            coalesce=True,
+            misfire_grace_time=MISFIRE_GRACE_SECONDS,
+            **trigger,
+        )
+    return scheduler
+
+
+def start_scheduler(app):
+    """Register the jobs on ``app`` and start the scheduler, once per process.
+
+    Later calls return the running scheduler, so importing the web app twice
+    (or a job building its own app) doesn't try to start it again.
+    """
+    with _START_LOCK:
+        if not scheduler.running:
+            register_jobs(app).start()
+    return scheduler
@@ -0,0 +1,148 @@
+from app import db
+from app.models import UserSeasonTotals, UserTipStats
+from app.services.seasons import current_season_year
+from app.services.data_version import STANDINGS, bump_data_version
+
+ROUND_FIELDS = ("successful_tips", "failed_tips", "pending_tips", "bonus_tips")
+CHECKED_FIELDS = ROUND_FIELDS + ("total_points", "perfect_rounds", "current_streak", "last_round")
+
+
+def round_values(stat):
+    """The UserTipStats values that feed the season totals (None for a new row)."""
+    if stat is None:
+        return None
+    return {field: getattr(stat, field) or 0 for field in ROUND_FIELDS}
+
+
+def _streak(perfect_by_round):
+    """Consecutive perfect rounds ending at the latest round in ``perfect_by_round``."""
+    streak = 0
+    expected_round = None
+    for round_number in sorted(perfect_by_round, reverse=True):
+        if expected_round is not None and round_number != expected_round:
+            break
+        if not perfect_by_round[round_number]:
+            break
+        streak += 1
+        expected_round = round_number - 1
+    return streak
+
+
+def load_totals(season):
+    """Return ``{user_id: UserSeasonTotals}`` for a season."""
+    return {t.user_id: t for t in UserSeasonTotals.query.filter_by(season=season).all()}
+
+
+def get_or_create_totals(totals_by_user, season, user_id):
+    totals = totals_by_user.get(user_id)
+    if totals is None:
+        totals = UserSeasonTotals(season=season, user_id=user_id)
+        for field in CHECKED_FIELDS:
+            setattr(totals, field, 0 if field != "last_round" else None)
+        db.session.add(totals)
+        totals_by_user[user_id] = totals
+    return totals
+
+
+def apply_round_delta(totals, round_number, old, new):
+    """Fold one round's change in UserTipStats into the user's season totals.
+
+    ``old`` is the round's values before this scoring pass (None if the round
+    had no row yet) and ``new`` the values after. Only the difference is added,
+    so the caller never has to re-sum the season. Runs in the caller's
+    transaction; nothing is committed here.
+    """
+    if old == new:
+        return
+    old = old or dict.fromkeys(ROUND_FIELDS, 0)
+
+    for field in ROUND_FIELDS:
+        setattr(totals, field, getattr(totals, field) + new[field] - old[field])
+    totals.total_points = totals.successful_tips + totals.bonus_tips
+
+    was_perfect = old["bonus_tips"] > 0
+    is_perfect = new["bonus_tips"] > 0
+    totals.perfect_rounds += int(is_perfect) - int(was_perfect)
+
+    if totals.last_round is None or round_number > totals.last_round:
+        extends_streak = totals.last_round is not None and round_number == totals.last_round + 1
+        if is_perfect:
+            totals.current_streak = (totals.current_streak if extends_streak else 0) + 1
+        else:
+            totals.current_streak = 0
+        totals.last_round = round_number
+    elif was_perfect != is_perfect:
+        # An earlier round flipped; the streak can't be patched from a delta,
+        # but it only needs this user's handful of round rows.
+        rows = (
+            db.session.query(UserTipStats.round_number, UserTipStats.bonus_tips)
+            .filter_by(season=totals.season, user_id=totals.user_id)
+            .all()
+        )
+        perfect_by_round = {r.round_number: (r.bonus_tips or 0) > 0 for r in rows}
+        perfect_by_round[round_number] = is_perfect
+        totals.current_streak = _streak(perfect_by_round)
+
+
+def compute_season_totals(season):
+    """Full recomputation of every user's totals from UserTipStats."""
+    rows = (
+        UserTipStats.query.filter_by(season=season)
+        .filter(UserTipStats.round_number.isnot(None))
+        .order_by(UserTipStats.user_id, UserTipStats.round_number)
+        .all()
+    )
+    computed = {}
+    perfect = {}
+    for row in rows:
+        totals = computed.setdefault(row.user_id, {field: 0 for field in CHECKED_FIELDS})
+        for field in ROUND_FIELDS:
+            totals[field] += getattr(row, field) or 0
+        is_perfect = (row.bonus_tips or 0) > 0
+        totals["perfect_rounds"] += int(is_perfect)
+        totals["last_round"] = row.round_number
+        perfect.setdefault(row.user_id, {})[row.round_number] = is_perfect
+
+    for user_id, totals in computed.items():
+        totals["total_points"] = totals["successful_tips"] + totals["bonus_tips"]
+        totals["current_streak"] = _streak(perfect[user_id])
+    return computed
+
+
+def check_season_totals(season=None, fix=False):
+    """Compare user_season_totals with a full recomputation.
+
+    Returns a list of ``(user_id, field, stored, expected)`` mismatches. With
+    ``fix`` the stored rows are rewritten from the recomputation.
+    """
+    season = season or current_season_year()
+    expected = compute_season_totals(season)
+    stored = load_totals(season)
+
+    mismatches = []
+    for user_id in sorted(set(expected) | set(stored)):
+        want = expected.get(user_id)
+        have = stored.get(user_id)
+        if want is None:
+            mismatches.append((user_id, "row", "present", "missing"))
+            if fix:
+                db.session.delete(have)
+            continue
+        if have is None:
+            mismatches.append((user_id, "row", "missing", "present"))
+            if fix:
+                have = get_or_create_totals(stored, season, user_id)
+                for field in CHECKED_FIELDS:
+                    setattr(have, field, want[field])
+            continue
+        for field in CHECKED_FIELDS:
+            if getattr(have, field) != want[field]:
+                mismatches.append((user_id, field, getattr(have, field), want[field]))
+                if fix:
+                    setattr(have, field, want[field])
+
+    if fix:
+        if mismatches:
+            bump_data_version(STANDINGS)
+        db.session.commit()
+    return mismatches
@@ -0,0 +1,173 @@
+from datetime import date, datetime
+
+import pytz
+from flask import g
+from sqlalchemy import func, over
+
+from app import db
+from app.services.data_version import SCOPES, bump_data_version
+from app.models import ChatMessage, FixtureFree, MatchReport, Season, SeasonUserSummary, Tip, TipIntelligenceReport, User, UserTipStats
+
+SYDNEY_TZ = pytz.timezone("Australia/Sydney")
+
+# The 2026 season predates the seasons table; its fixtures keep the bare feed
+# MatchNumber as match_id. Later seasons prefix it with the year so match_id
+# stays globally unique (tips, chat and reports all key on it).
+LEGACY_SEASON = 2026
+
+DEFAULT_SEASON = {
+    "year": 2026,
+    "feed_slug": "nrl-2026",
+    "round1_start": date(2026, 3, 1),
+    "round1_end": date(2026, 3, 8),
+    "round1_first_cutoff": datetime(2026, 2, 28, 17, 0, 0),
+    "round1_cutoff": datetime(2026, 3, 5, 17, 0, 0),
+    "round1_early_match_ids": "1,2",
+}
+
+
+def season_match_id(season, match_number):
+    if season == LEGACY_SEASON:
+        return str(match_number)
+    return f"{season}-{match_number}"
+
+
+def get_current_season():
+    """Return the current Season row, creating the default one on a fresh DB.
+
+    Cached on ``g`` so a request only looks it up once.
+    """
+    if "current_season" in g:
+        return g.current_season
+
+    season = Season.query.filter_by(is_current=True).order_by(Season.year.desc()).first()
+    if season is None:
+        season = Season.query.get(DEFAULT_SEASON["year"])
+        if season is None:
+            season = Season(is_current=True, **DEFAULT_SEASON)
+            db.session.add(season)
+        else:
+            season.is_current = True
+        db.session.commit()
+
+    g.current_season = season
+    return season
+
+
+def current_season_year():
+    return get_current_season().year
+
+
+def get_season(year=None):
+    if year is None:
+        return get_current_season()
+    return Season.query.get(year)
+
+
+def get_all_seasons():
+    return Season.query.order_by(Season.year.desc()).all()
+
+
+def localize(naive_dt):
+    return SYDNEY_TZ.localize(naive_dt) if naive_dt else None
+
+
+def round1_early_match_ids(season):
+    """FixtureFree.match_id values of the round 1 matches played before round1_first_cutoff."""
+    if not season or not season.round1_early_match_ids:
+        return set()
+    return {
+        season_match_id(season.year, m.strip())
+        for m in season.round1_early_match_ids.split(",")
+        if m.strip()
+    }
+
+
+def round_fixtures_query(round_number, season=None):
+    season = season or current_season_year()
+    return FixtureFree.query.filter(FixtureFree.season == season, FixtureFree.round == round_number)
+
+
+def start_season(year, feed_slug=None, **round1_fields):
+    """Create (or update) a season and make it the current one."""
+    season = Season.query.get(year) or Season(year=year, feed_slug=feed_slug or f"nrl-{year}")
+    if feed_slug:
+        season.feed_slug = feed_slug
+    for field, value in round1_fields.items():
+        setattr(season, field, value)
+    Season.query.update({Season.is_current: False})
+    season.is_current = True
+    db.session.add(season)
+    bump_data_version(*SCOPES)
+    db.session.commit()
+    g.pop("current_season", None)
+    return season
+
+
+def archive_season(year, purge=False, excluded_usernames=('joshua_johnston', 'testing_db2')):
+    """Freeze a season's final standings into season_user_summaries.
+
+    With ``purge`` the season's raw tips, chat and reports are deleted
+    afterwards; UserTipStats rows are kept since they are already compact
+    (one row per user per round).
+    """
+    season = Season.query.get(year)
+    if season is None:
+        raise ValueError(f"Unknown season {year}")
+    if season.is_current:
+        raise ValueError(f"Season {year} is the current season and can't be archived")
+
+    totals = (
+        db.session.query(
+            UserTipStats.user_id,
+            User.username,
+            func.coalesce(func.sum(UserTipStats.successful_tips), 0).label("successful_tips"),
+            func.coalesce(func.sum(UserTipStats.failed_tips), 0).label("failed_tips"),
+            func.coalesce(func.sum(UserTipStats.bonus_tips), 0).label("bonus_tips"),
+            func.count(UserTipStats.id).filter(UserTipStats.bonus_tips > 0).label("perfect_rounds"),
+        )
+        .join(User, User.id == UserTipStats.user_id)
+        .filter(UserTipStats.season == year)
+        .group_by(UserTipStats.user_id, User.username)
+        .subquery()
+    )
+    rows = (
+        db.session.query(
+            totals,
+            over(
+                func.dense_rank(),
+                order_by=db.desc(totals.c.successful_tips + totals.c.bonus_tips),
+            ).label("final_rank"),
+        )
+        .filter(~totals.c.username.in_(excluded_usernames))
+        .all()
+    )
+
+    SeasonUserSummary.query.filter_by(season=year).delete()
+    db.session.add_all([
+        SeasonUserSummary(
+            season=year,
+            user_id=row.user_id,
+            username=row.username,
+            successful_tips=row.successful_tips,
+            failed_tips=row.failed_tips,
+            bonus_tips=row.bonus_tips,
+            perfect_rounds=row.perfect_rounds,
+            final_rank=row.final_rank,
+        )
+        for row in rows
+    ])
+
+    if purge:
+        fixture_ids = db.session.query(FixtureFree.id).filter(FixtureFree.season == year)
+        TipIntelligenceReport.query.filter(
+            TipIntelligenceReport.fixture_id.in_(fixture_ids.scalar_subquery())
+        ).delete(synchronize_session=False)
+        MatchReport.query.filter(MatchReport.season == year).delete(synchronize_session=False)
+        ChatMessage.query.filter(ChatMessage.season == year).delete(synchronize_session=False)
+        Tip.query.filter(Tip.season == year).delete(synchronize_session=False)
+
+    season.archived_at = datetime.now(SYDNEY_TZ).replace(tzinfo=None)
+    bump_data_version(*SCOPES)
+    db.session.commit()
+    return len(rows)
@@ -0,0 +1,283 @@
+import threading
+from datetime import datetime
+
+import numpy as np
+import pytz
+
+from app import db
+from app.models import FixtureFree
+from app.services.data_version import FIXTURES, get_data_versions
+from app.services.fixtures import LIVE_WINDOW
+
+# Games that make up a team's recent form.
+FORM_GAMES = 5
+# Meetings listed in a head-to-head.
+H2H_GAMES = 5
+
+_SEASONS = {}
+_SEASONS_LOCK = threading.Lock()
+
+
+def _sydney_now():
+    return datetime.now(pytz.timezone("Australia/Sydney")).replace(tzinfo=None)
+
+
+class _SeasonResults:
+    """Completed games of one season as parallel NumPy arrays, one row per game.
+
+    Rows are added or corrected in place as scores land, rather than
+    re-reading the season; stats are then computed over whole columns.
+    """
+
+    def __init__(self, season):
+        self.season = season
+        self.version = None
+        self.recheck_at = None  # when a scored game's live window ends
+        self.teams = []
+        self.team_index = {}
+        self.row_of = {}  # fixture id -> row
+        self.round = np.zeros(0, dtype=np.int32)
+        self.kickoff = np.zeros(0, dtype="datetime64[m]")
+        self.home = np.zeros(0, dtype=np.int32)
+        self.away = np.zeros(0, dtype=np.int32)
+        self.home_score = np.zeros(0, dtype=np.int32)
+        self.away_score = np.zeros(0, dtype=np.int32)
+        self.corrections = 0  # scores changed after a row was added
+        self.memo = {}
+        self.lock = threading.Lock()
+
+    def _team(self, name):
+        index = self.team_index.get(name)
+        if index is None:
+            index = self.team_index[name] = len(self.teams)
+            self.teams.append(name)
+        return index
+
+    def refresh(self, version, now):
+        """Pick up scores that landed since ``version``; returns True if anything changed."""
+        if version == self.version and (self.recheck_at is None or now < self.recheck_at):
+            return False
+        rows = (
+            db.session.query(
+                FixtureFree.id, FixtureFree.round, FixtureFree.date, FixtureFree.time,
+                FixtureFree.home_team, FixtureFree.away_team,
+                FixtureFree.home_score, FixtureFree.away_score,
+            )
+            .filter(
+                FixtureFree.season == self.season,
+                FixtureFree.home_score.isnot(None),
+                FixtureFree.away_score.isnot(None),
+                FixtureFree.date.isnot(None),
+            )
+            .all()
+        )
+        added = []
+        changed = False
+        self.recheck_at = None
+        for fixture_id, round_number, day, kickoff_time, home, away, home_score, away_score in rows:
+            kickoff = datetime.combine(day, kickoff_time or datetime.min.time())
+            if kickoff + LIVE_WINDOW > now:
+                # Still being played; the score isn't final yet.
+                finished_at = kickoff + LIVE_WINDOW
+                self.recheck_at = min(self.recheck_at or finished_at, finished_at)
+                continue
+            row = self.row_of.get(fixture_id)
+            if row is None:
+                added.append((fixture_id, round_number, kickoff, self._team(home), self._team(away), home_score, away_score))
+            elif (self.home_score[row], self.away_score[row]) != (home_score, away_score):
+                self.home_score[row] = home_score
+                self.away_score[row] = away_score
+                self.corrections += 1
+                changed = True
+        if added:
+            start = len(self.round)
+            ids, rounds, kickoffs, homes, aways, home_scores, away_scores = zip(*added)
+            self.row_of.update((fixture_id, start + i) for i, fixture_id in enumerate(ids))
+            self.round = np.concatenate([self.round, np.array(rounds, dtype=np.int32)])
+            self.kickoff = np.concatenate([self.kickoff, np.array(kickoffs, dtype="datetime64[m]")])
+            self.home = np.concatenate([self.home, np.array(homes, dtype=np.int32)])
+            self.away = np.concatenate([self.away, np.array(aways, dtype=np.int32)])
+            self.home_score = np.concatenate([self.home_score, np.array(home_scores, dtype=np.int32)])
+            self.away_score = np.concatenate([self.away_score, np.array(away_scores, dtype=np.int32)])
+        self.version = version
+        if added or changed:
+            self.memo.clear()
+        return bool(added or changed)
+
+    def mask(self, before_round=None):
+        if before_round is None:
+            return np.ones(len(self.round), dtype=bool)
+        return self.round < before_round
+
+    def table(self, before_round=None):
+        """Per-team season stats from games before ``before_round`` (all games if None)."""
+        if before_round in self.memo:
+            return self.memo[before_round]
+        m = self.mask(before_round)
+        n = len(self.teams)
+        home, away = self.home[m], self.away[m]
+        hs, aws = self.home_score[m], self.away_score[m]
+
+        def count(teams, weights=None):
+            return np.bincount(teams, weights=weights, minlength=n)
+
+        split = {
+            "home": {
+                "played": count(home),
+                "wins": count(home, hs > aws),
+                "points_for": count(home, hs),
+                "points_against": count(home, aws),
+            },
+            "away": {
+                "played": count(away),
+                "wins": count(away, aws > hs),
+                "points_for": count(away, aws),
+                "points_against": count(away, hs),
+            },
+        }
+        draws = count(home, hs == aws) + count(away, hs == aws)
+
+        # Every game from each team's point of view, oldest first per team.
+        team = np.concatenate([home, away])
+        margin = np.concatenate([hs - aws, aws - hs])
+        kickoff = np.concatenate([self.kickoff[m], self.kickoff[m]])
+        order = np.lexsort((kickoff, team))
+        team, margin = team[order], margin[order]
+        ends = np.searchsorted(team, np.arange(n), side="right")
+
+        stats = {}
+        for index, name in enumerate(self.teams):
+            played = int(split["home"]["played"][index] + split["away"]["played"][index])
+            if not played:
+                continue
+            recent = margin[max(ends[index] - FORM_GAMES, 0 if index == 0 else ends[index - 1]):ends[index]]
+            wins = int(split["home"]["wins"][index] + split["away"]["wins"][index])
+            points_for = int(split["home"]["points_for"][index] + split["away"]["points_for"][index])
+            points_against = int(split["home"]["points_against"][index] + split["away"]["points_against"][index])
+            stats[name] = {
+                "played": played,
+                "wins": wins,
+                "draws": int(draws[index]),
+                "losses": played - wins - int(draws[index]),
+                "points_for": points_for,
+                "points_against": points_against,
+                "avg_margin": round((points_for - points_against) / played, 1),
+                "form": "".join("W" if x > 0 else "L" if x < 0 else "D" for x in recent[::-1]),
+                "form_avg_margin": round(float(recent.mean()), 1),
+                **{
+                    side: {key: int(values[index]) for key, values in columns.items()}
+                    for side, columns in split.items()
+                },
+            }
+        self.memo[before_round] = stats
+        return stats
+
+    def meetings(self, team_a, team_b, before_round=None):
+        """Games between the two teams as (kickoff, home, away, home_score, away_score)."""
+        a, b = self.team_index.get(team_a), self.team_index.get(team_b)
+        if a is None or b is None:
+            return []
+        m = self.mask(before_round) & (
+            ((self.home == a) & (self.away == b)) | ((self.home == b) & (self.away == a))
+        )
+        return [
+            (self.kickoff[i].astype(datetime), self.teams[self.home[i]], self.teams[self.away[i]],
+             int(self.home_score[i]), int(self.away_score[i]))
+            for i in np.flatnonzero(m)
+        ]
+
+
+def _season_results(season, now=None):
+    with _SEASONS_LOCK:
+        results = _SEASONS.setdefault(season, _SeasonResults(season))
+    with results.lock:
+        results.refresh(get_data_versions()[FIXTURES], now or _sydney_now())
+    return results
+
+
+def season_games(season):
+    """The season's completed games as ``(arrays, corrections)``.
+
+    ``arrays`` maps round, kickoff, home, away, home_score and away_score to
+    NumPy columns in the order games were added (home and away are team
+    names). Rows are only ever appended, so a caller can process just the new
+    ones while ``corrections`` is unchanged.
+    """
+    results = _season_results(season)
+    with results.lock:
+        teams = np.array(results.teams, dtype=object)
+        arrays = {
+            "round": results.round,
+            "kickoff": results.kickoff,
+            "home": teams[results.home] if len(teams) else np.zeros(0, dtype=object),
+            "away": teams[results.away] if len(teams) else np.zeros(0, dtype=object),
+            "home_score": results.home_score.copy(),
+            "away_score": results.away_score.copy(),
+        }
+        return arrays, results.corrections
+
+
+def team_stats(season, before_round=None):
+    """``{team: stats}`` for a season from its completed games.
+
+    Stats are wins/draws/losses, points for and against, average margin,
+    form over the last FORM_GAMES ("WLW..", most recent first) and the same
+    counts split into "home" and "away". With ``before_round`` only earlier
+    rounds count, which is what a fixture in that round would have known.
+    """
+    results = _season_results(season)
+    with results.lock:
+        return results.table(before_round)
+
+
+def head_to_head(team_a, team_b, season, before_round=None, limit=H2H_GAMES):
+    """The last ``limit`` meetings of two teams this season and previous ones, newest first.
+
+    Earlier seasons are only read for seasons already in ``fixture_free``.
+    """
+    seasons = [
+        year for (year,) in db.session.query(FixtureFree.season).filter(FixtureFree.season <= season).distinct()
+    ]
+    games = []
+    for year in seasons:
+        results = _season_results(year)
+        with results.lock:
+            games.extend(results.meetings(team_a, team_b, before_round if year == season else None))
+    games.sort(key=lambda game: game[0], reverse=True)
+    return games[:limit]
+
+
+def _describe_team(name, stats):
+    if stats is None:
+        return f"{name}: no completed games yet this season."
+    home, away = stats["home"], stats["away"]
+    return (
+        f"{name}: {stats['wins']}-{stats['draws']}-{stats['losses']} (W-D-L) from {stats['played']}, "
+        f"points {stats['points_for']} for / {stats['points_against']} against "
+        f"(avg margin {stats['avg_margin']:+}). "
+        f"Form, last {len(stats['form'])} (newest first): {stats['form']}, avg margin {stats['form_avg_margin']:+}. "
+        f"Home {home['wins']}/{home['played']} won ({home['points_for']}-{home['points_against']}), "
+        f"away {away['wins']}/{away['played']} won ({away['points_for']}-{away['points_against']})."
+    )
+
+
+def fixture_stats_context(fixture):
+    """Our own results data for a fixture's two teams, as text for the analyst and picker prompts."""
+    if not fixture.home_team or not fixture.away_team:
+        return ""
+    stats = team_stats(fixture.season, before_round=fixture.round)
+    lines = [
+        f"LOCAL STATS ({fixture.season} season, completed games before round {fixture.round}):",
+        _describe_team(fixture.home_team, stats.get(fixture.home_team)),
+        _describe_team(fixture.away_team, stats.get(fixture.away_team)),
+    ]
+    meetings = head_to_head(fixture.home_team, fixture.away_team, fixture.season, before_round=fixture.round)
+    if meetings:
+        lines.append("Head to head (newest first):")
+        lines.extend(
+            f"- {kickoff:%Y-%m-%d}: {home} {home_score} - {away_score} {away}"
+            for kickoff, home, away, home_score, away_score in meetings
+        )
+    else:
+        lines.append("Head to head: no previous meetings on record.")
+    return "\n".join(lines)
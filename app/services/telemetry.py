@@ -0,0 +1,230 @@
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime
+
+from sqlalchemy import func
+
+from app import db
+from app.models import AgentRun, au_tz
+from app.services.llm_backend import get_llm_backend
+from app.services.seasons import current_season_year
+
+# USD per million tokens (input, output). Update when OpenAI pricing changes.
+MODEL_PRICES = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+}
+# USD per web search tool call (gpt-4o-mini, low search context).
+WEB_SEARCH_CALL_PRICE = 0.025
+
+# Stages in pipeline order, for display.
+STAGES = ("research", "planner", "search", "analyst", "picker", "report")
+
+
+def estimate_cost(model, input_tokens, output_tokens, tool_calls=0):
+    input_price, output_price = MODEL_PRICES.get(model, (0.0, 0.0))
+    return (
+        input_tokens * input_price / 1_000_000
+        + output_tokens * output_price / 1_000_000
+        + tool_calls * WEB_SEARCH_CALL_PRICE
+    )
+
+
+def _now():
+    return datetime.now(au_tz).replace(tzinfo=None)
+
+
+class RunTrace:
+    """Times and records every agent call of one report or tipperbot run.
+
+    Rows are buffered and written by ``flush()`` in a single commit, so the
+    pipeline itself never waits on the database between stages.
+    """
+
+    def __init__(self, job, fixture=None):
+        self.job = job
+        self.run_id = uuid.uuid4().hex
+        self.fixture_id = fixture.id if fixture is not None else None
+        self.season = fixture.season if fixture is not None else None
+        self.round_number = fixture.round if fixture is not None else None
+        self.started = time.monotonic()
+        self.rows = []
+
+    def record(self, stage, outcome, duration_ms, **fields):
+        self.rows.append(AgentRun(
+            job=self.job,
+            run_id=self.run_id,
+            season=self.season,
+            round_number=self.round_number,
+            fixture_id=self.fixture_id,
+            stage=stage,
+            duration_ms=duration_ms,
+            outcome=outcome,
+            **fields,
+        ))
+
+    def call(self, stage, agent, prompt, on_text=None):
+        """Run ``agent`` through the LLM backend and record how it went."""
+        backend = get_llm_backend()
+        usage = {}
+        started_at = _now()
+        started = time.monotonic()
+        outcome, error = "ok", None
+        try:
+            if on_text is None:
+                return backend.run(agent, prompt, usage=usage)
+            return backend.stream(agent, prompt, on_text, usage=usage)
+        except Exception as exc:
+            outcome, error = "error", f"{type(exc).__name__}: {exc}"[:500]
+            raise
+        finally:
+            model = agent.model if isinstance(agent.model, str) else None
+            self.record(
+                stage,
+                outcome,
+                int((time.monotonic() - started) * 1000),
+                agent_name=agent.name,
+                model=model,
+                started_at=started_at,
+                error=error,
+                cost_usd=estimate_cost(
+                    model,
+                    usage.get("input_tokens", 0),
+                    usage.get("output_tokens", 0),
+                    usage.get("tool_calls", 0),
+                ),
+                **{k: usage.get(k, 0) for k in ("requests", "input_tokens", "output_tokens", "tool_calls")},
+            )
+
+    def cached(self, stage, agent=None):
+        """Record a stage that was answered from a cache instead of an agent call."""
+        self.record(
+            stage,
+            "cached",
+            0,
+            agent_name=agent.name if agent is not None else None,
+            model=agent.model if agent is not None and isinstance(agent.model, str) else None,
+            started_at=_now(),
+        )
+
+    def finish(self, outcome, error=None):
+        """Add the whole-run row (stage "report" or the job name) with totals."""
+        self.record(
+            "report" if self.job == "report" else self.job,
+            outcome,
+            int((time.monotonic() - self.started) * 1000),
+            started_at=_now(),
+            error=error[:500] if error else None,
+            **{
+                field: sum(getattr(row, field) or 0 for row in self.rows)
+                for field in ("requests", "input_tokens", "output_tokens", "tool_calls", "cost_usd")
+            },
+        )
+
+    def flush(self, commit=True):
+        """Write buffered rows. Telemetry must never take down the caller.
+
+        With ``commit=False`` the rows are only added to the session, to be
+        committed with the caller's own transaction.
+        """
+        if not self.rows:
+            return
+        if not commit:
+            db.session.add_all(self.rows)
+            self.rows = []
+            return
+        try:
+            db.session.add_all(self.rows)
+            db.session.commit()
+        except Exception as exc:
+            db.session.rollback()
+            print(f"Could not save agent telemetry for run {self.run_id}: {exc}")
+        self.rows = []
+
+
+def record_cached_report(fixture):
+    """Count a report served from the cache or TipIntelligenceReport."""
+    trace = RunTrace("report", fixture)
+    trace.cached("report")
+    trace.flush()
+
+
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def telemetry_summary(season=None):
+    """Latency per stage, spend per round and report cache hit rate for a season."""
+    season = season or current_season_year()
+
+    durations = defaultdict(list)
+    counts = defaultdict(lambda: {"ok": 0, "error": 0, "cached": 0, "tokens": 0, "cost": 0.0})
+    rows = (
+        db.session.query(
+            AgentRun.job, AgentRun.stage, AgentRun.outcome, AgentRun.duration_ms,
+            AgentRun.input_tokens + AgentRun.output_tokens, AgentRun.cost_usd,
+        )
+        .filter(AgentRun.season == season)
+        .yield_per(1000)
+    )
+    for job, stage, outcome, duration_ms, tokens, cost in rows:
+        key = (job, stage)
+        counts[key][outcome] = counts[key].get(outcome, 0) + 1
+        if outcome != "cached":
+            durations[key].append(duration_ms)
+            counts[key]["tokens"] += tokens or 0
+            counts[key]["cost"] += cost or 0.0
+
+    stage_order = {stage: i for i, stage in enumerate(STAGES)}
+    stages = []
+    for (job, stage), c in sorted(counts.items(), key=lambda item: (item[0][0], stage_order.get(item[0][1], 99))):
+        values = sorted(durations[(job, stage)])
+        runs = c["ok"] + c["error"]
+        stages.append({
+            "job": job,
+            "stage": stage,
+            "runs": runs,
+            "errors": c["error"],
+            "cached": c["cached"],
+            "p50_ms": _percentile(values, 50),
+            "p95_ms": _percentile(values, 95),
+            "avg_tokens": round(c["tokens"] / runs) if runs else 0,
+            "cost_usd": c["cost"],
+        })
+
+    spend_rows = (
+        db.session.query(
+            AgentRun.round_number,
+            AgentRun.job,
+            func.count(func.distinct(AgentRun.run_id)),
+            func.sum(AgentRun.cost_usd),
+        )
+        # Whole-run rows (stage named after the job) repeat their stages'
+        # totals; count spend once.
+        .filter(AgentRun.season == season, AgentRun.stage != AgentRun.job)
+        .group_by(AgentRun.round_number, AgentRun.job)
+        .order_by(AgentRun.round_number, AgentRun.job)
+        .all()
+    )
+    spend = [
+        {"round": round_number, "job": job, "runs": runs, "cost_usd": cost or 0.0}
+        for round_number, job, runs, cost in spend_rows
+    ]
+
+    report = counts.get(("report", "report"), {"ok": 0, "cached": 0})
+    served = report["ok"] + report["cached"]
+    searches = [c for (job, stage), c in counts.items() if stage == "search"]
+    search_hits = sum(c["cached"] for c in searches)
+    search_total = sum(c["ok"] + c["error"] + c["cached"] for c in searches)
+    return {
+        "season": season,
+        "stages": stages,
+        "spend": spend,
+        "total_cost_usd": sum(row["cost_usd"] for row in spend),
+        "report_cache_hit_rate": report["cached"] / served if served else None,
+        "search_cache_hit_rate": search_hits / search_total if search_total else None,
+    }
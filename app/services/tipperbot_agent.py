@@ -1,56 +1,93 @@
 from pyexpat import model
-from agents import Agent, WebSearchTool, ModelSettings, Runner
+from agents import Agent
 from pydantic import BaseModel, Field
-from app import create_app, db
+from app import app_context, db
 from app.models import FixtureFree, Tip, User
 from app.services.fixtures import find_current_round
+from app.services.seasons import current_season_year, round_fixtures_query
+from app.services.data_version import TIPS, bump_data_version
+from app.services.ratings import current_ratings
+from app.services.research import research_fixture, format_research
+from app.services.team_stats import fixture_stats_context
+from app.services.telemetry import RunTrace
 from dotenv import load_dotenv
+import argparse
 import os
 
 load_dotenv()
 
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
-class WebSearchItem(BaseModel):
-    reason: str = Field(description="Your reasoning for why this search is important to the query.")
-    query: str = Field(description="The search term to use for the web search.")
-
-class WebSearchPlan(BaseModel):
-    searches: list[WebSearchItem] = Field(description="A list of web searches to perform to best answer the query.")
+TIPPERBOT_USER_ID = 16
+TIPPERBOT_USERNAME = "tipperbot_3000"
 
 class TipChoice(BaseModel):
     reason: str = Field(description="")
     choice: str = Field(description="")
 
-def _run_agent(agent, prompt):
-    return Runner.run_sync(agent, prompt)
+def _select_fixtures(match_selected=None):
+    match_ids = [str(m) for m in match_selected] if match_selected else []
+    if match_ids:
+        return FixtureFree.query.filter(FixtureFree.match_id.in_(match_ids)).all()
+    return round_fixtures_query(find_current_round()).all()
+
+def _write_bot_tips(picks, traces=()):
+    """Replace the bot's tips with ``picks`` ((fixture, team) pairs) in one commit."""
+    for fixture, choice in picks:
+        Tip.query.filter_by(
+            user_id=TIPPERBOT_USER_ID,
+            fixture_id=fixture.id,
+        ).delete()
+        agent_tip = Tip(
+            season=current_season_year(),
+            fixture_id=fixture.id,
+            match=fixture.match_id,
+            username = TIPPERBOT_USERNAME,
+            user_id = TIPPERBOT_USER_ID,
+            selected_team = choice
+        )
+        db.session.add(agent_tip)
+    for trace in traces:
+        trace.flush(commit=False)
+    bump_data_version(TIPS)
+    db.session.commit()
+    print("Tipperbot_3000 tips have been submitted")
+
+def run_elo_tipper(match_selected=None):
+    """Tip every selected fixture's Elo favourite; no LLM or web calls."""
+    with app_context():
+        fixtures = _select_fixtures(match_selected)
+        if not fixtures:
+            print("No fixtures found for current round.")
+            return
 
-def _get_output(result):
-    if hasattr(result, "output"):
-        return result.output
-    if hasattr(result, "final_output"):
-        return result.final_output
-    return result
+        ratings = current_ratings()
+        picks = []
+        for fixture in fixtures:
+            if not fixture.home_team or not fixture.away_team:
+                print(f"Skipping match {fixture.match_id}: teams not announced.")
+                continue
+            prediction = ratings.predict(fixture.home_team, fixture.away_team)
+            print(
+                f"{fixture.home_team} vs {fixture.away_team}: {prediction['pick']} "
+                f"(home win {prediction['home_win_probability']:.0%})"
+            )
+            picks.append((fixture, prediction["pick"]))
+        _write_bot_tips(picks)
 
 def run_picker_agent(match_selected=None):
-    app = create_app()
-    with app.app_context():
-        current_round = find_current_round()
-
-        match_ids = [str(m) for m in match_selected] if match_selected else []
-        if match_ids:
-            fixtures = FixtureFree.query.filter(FixtureFree.match_id.in_(match_ids)).all()
-        else:
-            fixtures = FixtureFree.query.filter_by(round=current_round).all()
+    with app_context():
+        fixtures = _select_fixtures(match_selected)
 
         if not fixtures:
             print("No fixtures found for current round.")
             return
 
-        HOW_MANY_SEARCHES = 10
         fixture = fixtures
 
         agent_selection = []
+        traces = []
+        picks = []
         for fixture in fixtures:
             match_id = fixture.match_id
             home_team = fixture.home_team or "TBD"
@@ -60,60 +97,6 @@ def run_picker_agent(match_selected=None):
 
             print(f"Home team: {home_team}, Away team: {away_team}, Game date: {game_date}, Game time: {game_time}")
 
-            ## Search Term Planner Agent ##
-            INSTRUCTIONS_1 = (
-                "You are a helpful \"Australian NRL (National Rugby League) performance\" research assisstant who specialises in picking winning teams in the weekly NRL competition draw "
-                "In order to make an accurate prediction of who will win the game in a given upcoming match, come up with a set of web searches you will need to perform "
-                "so that you have the latest and relavant information about the competing teams. "
-                "You will be passing these well thoughtout web search queries to your lead web search manager. "
-
-                "IMPORTANT INFORMATION:"
-                f"The upcoming match that you are predicting is: {home_team} vs {away_team}. "
-                f"You are to perform {HOW_MANY_SEARCHES} for {home_team} and {HOW_MANY_SEARCHES} for {away_team}. "
-
-                "FURTHER CONTEXT:"
-                f"Home team: {home_team}. "
-                f"Away team: {away_team}. "
-                f"Current Date: {game_date}. "
-                f"Time of the game: {game_time}."
-            )
-
-            search_plan_agent = Agent(
-                name = "Search Term Planner Agent",
-                instructions = INSTRUCTIONS_1,
-                model = "gpt-4o-mini",
-                output_type = WebSearchPlan
-
-            )
-
-            ## Search Agent ##
-            INSTRUCTIONS_2 = (
-                "You are an Australian NRL Footy Tipping research assisstant. Given a search term, you search the web for that term and "
-                "produce a concise summary of the results. The summary must 2-3 paragraphs and less than 300 "
-                "words. Capture the main points. Write succintly, no need to have complete sentences or good "
-                "grammar. This will be consumed by someone synthesizing a report, so its vital you capture the "
-                "essence and ignore any fluff. Do not include any additional commentary other than the summary itself.\n\n"
-
-                "IMPORTANT INFORMATION:"
-                f"You are performing searches based on the upcoming game between {home_team} and {away_team}. "
-                "Return equal volume of research for each team. "
-
-                "FURTHER CONTEXT:"
-                f"Home team: {home_team}. "
-                f"Away team: {away_team}. "
-                f"Current Date: {game_date}. "
-                f"Time of the game: {game_time}."
-            )
-
-            web_search_agent = Agent(
-                name = "Web Search Agent",
-                instructions = INSTRUCTIONS_2,
-                tools = [WebSearchTool(search_context_size = "low")],
-                model = "gpt-4o-mini",
-                model_settings = ModelSettings(tool_choices = "required")
-
-            )
-
             ## Expert NRL Analyst ##
 
             INSTRUCTIONS_3 = (
@@ -140,33 +123,20 @@ def run_picker_agent(match_selected=None):
                 output_type = TipChoice
             )
 
-            plan_result = _get_output(_run_agent(
-                search_plan_agent,
-                "Create a web search plan for the upcoming match."
-            ))
-            if isinstance(plan_result, dict):
-                plan = WebSearchPlan(**plan_result)
-            elif hasattr(plan_result, "searches"):
-                plan = plan_result
-            else:
-                raise ValueError("Search plan output is missing 'searches'.")
-
-            research_summaries = []
-            for index, item in enumerate(plan.searches, start=1):
-                summary_result = _get_output(_run_agent(web_search_agent, item.query))
-                summary_text = summary_result if isinstance(summary_result, str) else str(summary_result)
-                research_summaries.append(
-                    f"[Search {index}] {item.query}\n"
-                    f"Reason: {item.reason}\n"
-                    f"Summary: {summary_text}"
-                )
+            trace = RunTrace("tipperbot", fixture)
+            traces.append(trace)
+            # Shares the fixture's research with the match report, so a
+            # report generated this week makes this a single picker call.
+            searches = research_fixture(fixture, trace)
 
             analyst_prompt = (
-                "Use the research summaries below to pick the winner.\n\n"
-                + "\n\n".join(research_summaries)
+                "Use the local stats and research summaries below to pick the winner.\n\n"
+                + fixture_stats_context(fixture)
+                + "\n\n"
+                + format_research(searches)
             )
 
-            tip_result = _get_output(_run_agent(team_picker_analyst, analyst_prompt))
+            tip_result = trace.call("picker", team_picker_analyst, analyst_prompt)
             if isinstance(tip_result, dict):
                 tip_choice = TipChoice(**tip_result)
             elif hasattr(tip_result, "choice"):
@@ -178,23 +148,39 @@ def run_picker_agent(match_selected=None):
             print(f"AI Reason: {tip_choice.reason}")
             if not (tip_choice.choice or "").strip():
                 print(f"Skipping DB write for match {match_id}: empty tip choice.")
+                trace.finish("error", "Empty tip choice.")
                 continue
-            Tip.query.filter_by(
-                user_id=16,
-                match=match_id,
-            ).delete()
-            agent_tip = Tip(
-                match=match_id,
-                username = "tipperbot_3000",
-                user_id = 16,
-                selected_team = tip_choice.choice
-            )
-            db.session.add(agent_tip)
+            if tip_choice.choice not in (fixture.home_team, fixture.away_team):
+                print(f"Skipping DB write for match {match_id}: {tip_choice.choice!r} is not one of the teams.")
+                trace.finish("error", f"{tip_choice.choice!r} is not one of the teams.")
+                continue
+            picks.append((fixture, tip_choice.choice))
+            trace.finish("ok")
+
+        # Write only once all the research is done, so no transaction (or
+        # SQLite write lock) is held open across the LLM calls.
+        _write_bot_tips(picks, traces)
+
+
+STRATEGIES = {
+    "llm": run_picker_agent,
+    "elo": run_elo_tipper,
+}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Submit tipperbot_3000's tips for the current round.")
+    parser.add_argument(
+        "--strategy",
+        choices=sorted(STRATEGIES),
+        default="llm",
+        help="llm: research and pick with the agents (minutes). elo: tip the ratings favourite (instant).",
+    )
+    parser.add_argument("--match", action="append", help="Only tip this match_id (repeatable).")
+    return parser.parse_args()
 
-        db.session.commit()
-        print("Tipperbot_3000 tips have been submitted")
-        
 
 if __name__ == "__main__":
     #match_id_subset = [3,4,5,6,7,8]
-    run_picker_agent()
\ No newline at end of file
+    args = parse_args()
+    STRATEGIES[args.strategy](args.match)
\ No newline at end of file
@@ -0,0 +1,182 @@
+from collections import Counter
+from datetime import datetime
+
+from sqlalchemy import and_, literal, select
+
+from app import db
+from app.models import FixtureFree, Tip, User, au_tz
+from app.services.fixtures import find_current_round
+from app.services.seasons import SYDNEY_TZ, current_season_year, get_current_season, localize, round1_early_match_ids, round_fixtures_query
+from app.utils.helper_functions import get_round_tips_cutoff
+from app.utils.sql import dialect_insert
+from app.services.data_version import TIPS, bump_data_version
+
+
+def auto_assign_missing_tips(round_number=None, match_ids=None, season=None):
+    """Give every user the away team for each round fixture they haven't tipped.
+
+    Runs as a single ``INSERT ... SELECT`` over users x round fixtures minus
+    existing tips, so it is idempotent and its cost doesn't grow with a Python
+    loop over users. Returns ``{user_id: tips_created}``.
+    """
+    if round_number is None:
+        round_number = find_current_round()
+    season = season or current_season_year()
+
+    fixture_filter = [
+        FixtureFree.season == season,
+        FixtureFree.round == round_number,
+        FixtureFree.away_team.isnot(None),
+    ]
+    if match_ids:
+        fixture_filter.append(FixtureFree.match_id.in_(match_ids))
+
+    missing = (
+        select(
+            User.id,
+            User.username,
+            FixtureFree.season,
+            FixtureFree.id,
+            FixtureFree.match_id,
+            FixtureFree.away_team,
+            literal(datetime.now(au_tz), type_=db.DateTime),
+        )
+        .select_from(User)
+        .join(FixtureFree, and_(*fixture_filter))
+        .outerjoin(Tip, and_(Tip.user_id == User.id, Tip.fixture_id == FixtureFree.id))
+        .where(Tip.id.is_(None))
+    )
+
+    stmt = dialect_insert(Tip).from_select(
+        ["user_id", "username", "season", "fixture_id", "match", "selected_team", "date"],
+        missing,
+    )
+    if hasattr(stmt, "on_conflict_do_nothing"):
+        # A tip submitted between the SELECT and the INSERT must win.
+        stmt = stmt.on_conflict_do_nothing(index_elements=["user_id", "fixture_id"])
+    stmt = stmt.returning(Tip.user_id)
+
+    created = Counter(row[0] for row in db.session.execute(stmt))
+    if created:
+        bump_data_version(TIPS)
+    db.session.commit()
+    return dict(created)
+
+
+def get_open_fixtures(round_number=None, season=None, now=None):
+    """Return ``(fixtures, tips_closed)`` for what a user can tip right now.
+
+    ``fixtures`` are the round's fixtures currently on offer: all of them
+    normally, or one half of a split round 1 depending on which side of
+    ``round1_first_cutoff`` we are. ``tips_closed`` is True once the round's
+    cutoff has passed. Both the form and the JSON API validate against this.
+    """
+    season = season or get_current_season()
+    if round_number is None:
+        round_number = find_current_round()
+    now = now or datetime.now(SYDNEY_TZ)
+
+    fixtures = round_fixtures_query(round_number, season.year).order_by(FixtureFree.id).all()
+
+    if round_number == 1 and season.round1_cutoff:
+        round1_first_cutoff = localize(season.round1_first_cutoff)
+        early_match_ids = round1_early_match_ids(season)
+        if now >= localize(season.round1_cutoff):
+            return fixtures, True
+        if round1_first_cutoff and now < round1_first_cutoff:
+            return [f for f in fixtures if f.match_id in early_match_ids], False
+        return [f for f in fixtures if f.match_id not in early_match_ids], False
+
+    cutoff = get_round_tips_cutoff(round_number, season.year)
+    return fixtures, cutoff is not None and now >= cutoff
+
+
+def _cutoff_label(cutoff):
+    # e.g. "5pm Thu 5 Mar"
+    return f"{cutoff.strftime('%I').lstrip('0')}{cutoff.strftime('%p').lower()} {cutoff.strftime('%a')} {cutoff.day} {cutoff.strftime('%b')}"
+
+
+def get_visible_fixtures(fixtures, round_number, season, now=None):
+    """Return ``(visible_fixtures, visibility_message)`` for other users' tips.
+
+    Other users' tips for a round stay hidden until its cutoff; a split round
+    1 reveals its early matches first. Used by view_tips and the JSON API.
+    """
+    now = now or datetime.now(SYDNEY_TZ)
+
+    if round_number == 1 and season.round1_cutoff:
+        round1_first_cutoff = localize(season.round1_first_cutoff)
+        round1_cutoff = localize(season.round1_cutoff)
+        early_match_ids = round1_early_match_ids(season)
+        if round1_first_cutoff and now < round1_first_cutoff:
+            return [], f"View others tips after {_cutoff_label(round1_first_cutoff)}."
+        if now < round1_cutoff:
+            return (
+                [f for f in fixtures if f.match_id in early_match_ids],
+                f"Only matches {season.round1_early_match_ids.replace(',', '-')} visible until {_cutoff_label(round1_cutoff)}.",
+            )
+        return fixtures, None
+
+    cutoff = get_round_tips_cutoff(round_number, season.year)
+    if cutoff is None or now < cutoff:
+        return [], "View others tips after 5pm Thursday."
+    return fixtures, None
+
+
+def resolve_picks(fixtures, selections):
+    """Map ``{match_id: team}`` selections onto ``{FixtureFree: team}``.
+
+    Empty selections are skipped. Raises ValueError for a match that isn't in
+    ``fixtures`` or a team that isn't playing in it.
+    """
+    fixtures_by_match = {f.match_id: f for f in fixtures}
+    picks = {}
+    for match_id, team in selections.items():
+        if not team:
+            continue
+        fixture = fixtures_by_match.get(match_id)
+        if fixture is None:
+            raise ValueError(f"Match {match_id} is not open for tipping.")
+        if team not in (fixture.home_team, fixture.away_team):
+            raise ValueError(f"{team} is not playing in match {match_id}.")
+        picks[fixture] = team
+    return picks
+
+
+def upsert_tips(user, picks, season):
+    """Save a user's ``{FixtureFree: team}`` picks in a single statement.
+
+    ``INSERT ... ON CONFLICT (user_id, fixture_id) DO UPDATE`` means two tabs
+    (or the form and the per-click API) racing each other just overwrite one
+    another instead of tripping the unique constraint. Rows whose pick didn't
+    change are left alone. Returns the number of tips created or changed.
+    """
+    if not picks:
+        return 0
+
+    now = datetime.now(au_tz)
+    stmt = dialect_insert(Tip).values([
+        {
+            "user_id": user.id,
+            "username": user.username,
+            "season": season,
+            "fixture_id": fixture.id,
+            "match": fixture.match_id,
+            "selected_team": team,
+            "date": now,
+        }
+        for fixture, team in picks.items()
+    ])
+    if hasattr(stmt, "on_conflict_do_update"):
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["user_id", "fixture_id"],
+            set_={"selected_team": stmt.excluded.selected_team, "date": stmt.excluded.date},
+            where=Tip.selected_team != stmt.excluded.selected_team,
+        )
+    stmt = stmt.returning(Tip.id)
+
+    written = len(db.session.execute(stmt).all())
+    if written:
+        bump_data_version(TIPS)
+    db.session.commit()
+    return written
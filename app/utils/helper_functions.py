@@ -2,42 +2,88 @@ import os
 import requests
 from dotenv import load_dotenv
 from datetime import datetime
-from app.models import Fixture, FixtureFree, db, User, UserTipStats, Tip
+from app.models import Fixture, FixtureFree, db, SeasonUserSummary, User, UserSeasonTotals, UserTipStats, Tip
 from app import create_app, db
 from datetime import datetime, date, time, timedelta
 import pytz
 from app.services.fixtures import find_current_round
+from app.services.seasons import current_season_year, get_season, round_fixtures_query
 from sqlalchemy import func, over
 
 SYDNEY_TZ = pytz.timezone("Australia/Sydney")
 
-def get_user_rank(username):
-    aggregated_data = (
+LEADERBOARD_EXCLUDED_USERNAMES = ('joshua_johnston', 'testing_db2')
+
+def get_leaderboard(season=None):
+    """Ranked rows (username, total_success, total_pending, rank) for a season.
+
+    Live seasons read user_season_totals; archived seasons their frozen
+    season_user_summaries.
+    """
+    season = get_season(season)
+    if season.archived_at:
+        return (
+            db.session.query(
+                SeasonUserSummary.username,
+                (SeasonUserSummary.successful_tips + SeasonUserSummary.bonus_tips).label("total_success"),
+                db.literal(0).label("total_pending"),
+                SeasonUserSummary.final_rank.label("rank"),
+            )
+            .filter(SeasonUserSummary.season == season.year)
+            .order_by(SeasonUserSummary.final_rank.asc(), SeasonUserSummary.username)
+            .all()
+        )
+
+    # user_season_totals is kept current by the scoring job, so this is a
+    # sorted scan of one row per user rather than a sum over every round.
+    return (
         db.session.query(
             User.username,
-            db.func.sum(UserTipStats.successful_tips + UserTipStats.bonus_tips).label("total_success"),
-            db.func.sum(UserTipStats.pending_tips).label("total_pending")
+            UserSeasonTotals.total_points.label("total_success"),
+            UserSeasonTotals.pending_tips.label("total_pending"),
+            over(
+                func.dense_rank(),
+                order_by=db.desc(UserSeasonTotals.total_points)
+            ).label("rank")
+        )
+        .join(User, User.id == UserSeasonTotals.user_id)
+        .filter(UserSeasonTotals.season == season.year)
+        .filter(~User.username.in_(LEADERBOARD_EXCLUDED_USERNAMES))
+        .order_by(db.asc("rank"), User.username)
+        .all()
+    )
+
+def get_user_round_history(user_id, season=None):
+    """Per-round (round_number, total_success, total_pending, running_total_success) for a user."""
+    season = season or current_season_year()
+    #building a subquery so i can use the windows function to calc running total
+    per_round = (
+        db.session.query(
+            UserTipStats.round_number.label("round_number"),
+            func.sum(UserTipStats.successful_tips + UserTipStats.bonus_tips).label("total_success"),
+            func.sum(UserTipStats.pending_tips).label("total_pending")
         )
-        .join(User, User.id == UserTipStats.user_id)
-        .filter(~User.username.in_(['joshua_johnston','testing_db2']))
-        .group_by(User.username)
+        .filter(UserTipStats.season == season, UserTipStats.user_id == user_id)
+        .group_by(UserTipStats.round_number)
         .subquery()
     )
-    
-    leaderboard_data = (
+    return (
         db.session.query(
-            aggregated_data.c.username,
-            aggregated_data.c.total_success,
-            aggregated_data.c.total_pending,
+            per_round.c.round_number,
+            per_round.c.total_success,
+            per_round.c.total_pending,
             over(
-                func.dense_rank(),
-                order_by=db.desc(aggregated_data.c.total_success)
-            ).label("rank")
+                func.sum(per_round.c.total_success),
+                order_by=per_round.c.round_number
+            ).label("running_total_success")
         )
-        .order_by(db.asc("rank"))
+        .order_by(per_round.c.round_number)
         .all()
     )
 
+def get_user_rank(username, season=None):
+    leaderboard_data = get_leaderboard(season)
+
     # Iterate through sorted leaderboard to find rank
     for idx, row in enumerate(leaderboard_data, start=1):
         if row.username == username:
@@ -48,24 +94,95 @@ def get_user_rank(username):
     
 
 def has_user_submitted_tips(user_id):
-    match_ids = [f.match_id for f in FixtureFree.query.filter_by(round=find_current_round()).all()]
-    tips = Tip.query.filter(Tip.user_id==user_id, Tip.match.in_(match_ids)).all()
+    fixture_ids = [f.id for f in round_fixtures_query(find_current_round()).all()]
+    tips = Tip.query.filter(Tip.user_id==user_id, Tip.fixture_id.in_(fixture_ids)).all()
     
-    if len(match_ids)==len(set(t.match for t in tips)):
+    if len(fixture_ids)==len(set(t.fixture_id for t in tips)):
         return True
     else:
         return False
 
-def get_all_rounds():
-    rounds = db.session.query(FixtureFree.round).distinct().order_by(FixtureFree.round).all()
+def get_users_missing_tips(round_number=None, season=None):
+    """Return {user_id: {"user": User, "missing": [match_id, ...]}} for a round.
+
+    Uses a single users x round fixtures anti-join against Tip instead of
+    querying per user.
+    """
+    if round_number is None:
+        round_number = find_current_round()
+    season = season or current_season_year()
+
+    rows = (
+        db.session.query(User, FixtureFree.match_id)
+        .join(FixtureFree, (FixtureFree.season == season) & (FixtureFree.round == round_number))
+        .outerjoin(Tip, (Tip.user_id == User.id) & (Tip.fixture_id == FixtureFree.id))
+        .filter(Tip.id.is_(None))
+        .order_by(User.id, FixtureFree.id)
+        .all()
+    )
+
+    missing = {}
+    for user, match_id in rows:
+        entry = missing.setdefault(user.id, {"user": user, "missing": []})
+        entry["missing"].append(match_id)
+    return missing
+
+def get_round_submission_status(round_number, season=None):
+    """Per-user tips submitted / required and last submission time for a round.
+
+    One grouped query over users LEFT JOIN the round's tips.
+    """
+    season = season or current_season_year()
+    round_fixture_ids = db.session.query(FixtureFree.id).filter(
+        FixtureFree.season == season,
+        FixtureFree.round == round_number,
+    )
+    tips_required = round_fixture_ids.count() if round_number else 0
+
+    rows = (
+        db.session.query(
+            User.id,
+            User.username,
+            func.count(Tip.id).label("tips_submitted"),
+            func.max(Tip.date).label("last_submitted"),
+        )
+        .outerjoin(
+            Tip,
+            (Tip.user_id == User.id) & Tip.fixture_id.in_(round_fixture_ids.scalar_subquery()),
+        )
+        .group_by(User.id, User.username)
+        .order_by(User.username)
+        .all()
+    )
+
+    return [
+        {
+            "user_id": row.id,
+            "username": row.username,
+            "tips_submitted": row.tips_submitted,
+            "tips_required": tips_required,
+            "last_submitted": row.last_submitted,
+        }
+        for row in rows
+    ]
+
+def get_all_rounds(season=None):
+    season = season or current_season_year()
+    rounds = (
+        db.session.query(FixtureFree.round)
+        .filter(FixtureFree.season == season)
+        .distinct()
+        .order_by(FixtureFree.round)
+        .all()
+    )
     return [r[0] for r in rounds]
 
 
-def get_round_tips_cutoff(round_number):
+def get_round_tips_cutoff(round_number, season=None):
     """Return the Thursday 5pm Sydney deadline for a round based on its first fixture."""
     fixtures = (
-        FixtureFree.query
-        .filter(FixtureFree.round == round_number, FixtureFree.date.isnot(None))
+        round_fixtures_query(round_number, season)
+        .filter(FixtureFree.date.isnot(None))
         .order_by(FixtureFree.date.asc())
         .all()
     )
@@ -78,8 +195,8 @@ def get_round_tips_cutoff(round_number):
     return SYDNEY_TZ.localize(datetime.combine(thursday_date, time(17, 0, 0)))
 
 
-def is_past_round_tips_cutoff(round_number):
-    cutoff = get_round_tips_cutoff(round_number)
+def is_past_round_tips_cutoff(round_number, season=None):
+    cutoff = get_round_tips_cutoff(round_number, season)
     if cutoff is None:
         return False
     return datetime.now(SYDNEY_TZ) >= cutoff
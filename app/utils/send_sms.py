@@ -1,45 +1,130 @@
 import os
-from twilio.rest import Client
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
-from app.utils.helper_functions import has_user_submitted_tips
-from app.models import User
-from app import create_app, db
 
 # Load .env from root directory
 load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), '..', '..', '.env'))
 
-account_sid = os.getenv('TWILIO_ACCOUNT_SID')
-auth_token = os.getenv('TWILIO_AUTH_TOKEN')
-client = Client(account_sid, auth_token)
-
-def send_msg(recipient, msg):
-    message = client.messages.create(
-        body=msg,
-        from_='+19036485985',  # Your Twilio trial number
-        to= f'+61{recipient}'      # Your verified mobile number (Australia example)
-    )
-
-    print(f"Message sent! SID: {message.sid}")
-
-
-
-
-if __name__ == '__main__':
-    app = create_app()
-    with app.app_context():
-        msg='''
-        ⚠️ Hey! This is your weekly tipping reminder. ⚠️ 
-        Don’t forget to submit by 5PM Thursday!
-        All participants who havnt submited by then will automatically be given the home teams 
-        '''
-        users = User.query.all()
-        havnt_submitted = []
-        for user in users:
-            if not has_user_submitted_tips(user.id):    
-                send_msg(user.phone_number,msg)
-                print(f"Message reminder sent to: {user.username}")
-                havnt_submitted.append(user.username)
-        send_msg('488534484',f'reminders where sent to: {", ".join(havnt_submitted)}')        
-        
-        
-        
\ No newline at end of file
+TWILIO_FROM_NUMBER = os.getenv('TWILIO_PHONE_NUMBER', '+19036485985')  # Twilio trial number
+
+
+class TwilioSender:
+    """Sends SMS through Twilio. The client is created lazily on first use."""
+
+    def __init__(self, account_sid=None, auth_token=None, from_number=TWILIO_FROM_NUMBER):
+        self.account_sid = account_sid or os.getenv('TWILIO_ACCOUNT_SID')
+        self.auth_token = auth_token or os.getenv('TWILIO_AUTH_TOKEN')
+        self.from_number = from_number
+        self._client = None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        with self._lock:
+            if self._client is None:
+                from twilio.rest import Client
+                self._client = Client(self.account_sid, self.auth_token)
+        return self._client
+
+    def send(self, recipient, body):
+        message = self.client.messages.create(
+            body=body,
+            from_=self.from_number,
+            to=f'+61{recipient}'  # Australian mobile numbers are stored without the country code
+        )
+        return message.sid
+
+
+class StubSender:
+    """Local stand-in for TwilioSender so the reminder job can run offline.
+
+    ``latency`` (seconds) and ``failure_rate`` (0-1) simulate the real API.
+    """
+
+    def __init__(self, latency=0.2, failure_rate=0.0, seed=None):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.sent = []
+
+    def send(self, recipient, body):
+        time.sleep(self.latency)
+        with self._lock:
+            if self._random.random() < self.failure_rate:
+                raise RuntimeError(f"Stub failure sending to {recipient}")
+            sid = f"STUB{len(self.sent) + 1:06d}"
+            self.sent.append((recipient, body))
+        return sid
+
+
+class TokenBucket:
+    """Thread-safe token bucket: ``rate`` tokens per second, bursts up to ``capacity``."""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity or rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def get_sender(stub=False, **stub_kwargs):
+    return StubSender(**stub_kwargs) if stub else TwilioSender()
+
+
+def send_bulk(messages, sender, max_workers=4, rate_per_second=1.0, retries=2, backoff=1.0):
+    """Send ``(recipient, body)`` pairs concurrently and return a summary dict.
+
+    All workers share one token bucket so the overall send rate never exceeds
+    ``rate_per_second``. Each message is retried up to ``retries`` times with
+    exponential backoff.
+    """
+    bucket = TokenBucket(rate_per_second)
+
+    def _send_one(recipient, body):
+        attempt = 0
+        while True:
+            bucket.acquire()
+            try:
+                sid = sender.send(recipient, body)
+                return {"recipient": recipient, "sid": sid, "attempts": attempt + 1, "error": None}
+            except Exception as exc:
+                if attempt >= retries:
+                    return {"recipient": recipient, "sid": None, "attempts": attempt + 1, "error": f"{type(exc).__name__}: {exc}"}
+                time.sleep(backoff * (2 ** attempt))
+                attempt += 1
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(_send_one, recipient, body) for recipient, body in messages]
+        results = [future.result() for future in futures]
+
+    return {
+        "sent": [r for r in results if r["error"] is None],
+        "failed": [r for r in results if r["error"] is not None],
+        "retries": sum(r["attempts"] - 1 for r in results),
+        "elapsed_seconds": time.monotonic() - started,
+    }
+
+
+def send_msg(recipient, msg, sender=None):
+    sender = sender or TwilioSender()
+    sid = sender.send(recipient, msg)
+    print(f"Message sent! SID: {sid}")
+    return sid
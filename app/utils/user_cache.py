@@ -0,0 +1,93 @@
+import threading
+import time
+from collections import OrderedDict
+
+from flask_login import UserMixin
+
+from app import db
+from app.models import User
+
+# Flask-Login reloads the user on every request (including the 5 second chat
+# poll), so keep a small in-process copy of the fields the app actually reads.
+USER_CACHE_TTL_SECONDS = 60
+USER_CACHE_MAX_SIZE = 512
+
+_USER_CACHE = OrderedDict()
+_USER_CACHE_LOCK = threading.Lock()
+
+
+class CachedUser(UserMixin):
+    """Detached, read-only stand-in for a User row used as ``current_user``.
+
+    Routes that need to modify the user (password, avatar, username) must load
+    the real row with ``User.query.get(current_user.id)`` and then call
+    ``invalidate_user``.
+    """
+
+    def __init__(self, id, username, avatar, is_admin, name=None):
+        self.id = id
+        self.username = username
+        self.avatar = avatar
+        self.is_admin = bool(is_admin)
+        self.name = name
+
+    @classmethod
+    def from_user(cls, user):
+        return cls(
+            id=user.id,
+            username=user.username,
+            avatar=user.avatar,
+            is_admin=user.is_admin,
+            name=user.name,
+        )
+
+
+def load_cached_user(user_id):
+    """Return a CachedUser for ``user_id``, falling back to the DB on a miss."""
+    user_id = int(user_id)
+    now = time.monotonic()
+
+    with _USER_CACHE_LOCK:
+        entry = _USER_CACHE.get(user_id)
+        if entry and entry[0] > now:
+            _USER_CACHE.move_to_end(user_id)
+            return entry[1]
+        _USER_CACHE.pop(user_id, None)
+
+    user = User.query.get(user_id)
+    if not user:
+        return None
+
+    cached = CachedUser.from_user(user)
+    with _USER_CACHE_LOCK:
+        _USER_CACHE[user_id] = (now + USER_CACHE_TTL_SECONDS, cached)
+        _USER_CACHE.move_to_end(user_id)
+        while len(_USER_CACHE) > USER_CACHE_MAX_SIZE:
+            _USER_CACHE.popitem(last=False)
+    return cached
+
+
+def invalidate_user(user_id):
+    """Drop ``user_id`` from this process's cache.
+
+    Other workers keep their copy until it expires, so checks that guard
+    something (admin access) go through ``user_is_admin`` instead.
+    """
+    with _USER_CACHE_LOCK:
+        _USER_CACHE.pop(int(user_id), None)
+
+
+def user_is_admin(user):
+    """Whether ``user`` (a CachedUser) is an admin right now, per the database.
+
+    A cached False is trusted (a new admin waits out the TTL); a cached True
+    is re-checked so a revoked admin loses access at once in every process.
+    """
+    if not user.is_admin:
+        return False
+    return bool(db.session.query(User.is_admin).filter(User.id == user.id).scalar())
+
+
+def clear_user_cache():
+    with _USER_CACHE_LOCK:
+        _USER_CACHE.clear()
@@ -6,8 +6,8 @@ from app.services.fixtures import upsert_free_fixtures
 app = create_app()
 
 with app.app_context():
-    season = 2026
-    max_round = 27  # Adjust if 2026 has more or fewer rounds
+    # Loads fixtures for the current season (see the seasons table).
+    max_round = 27  # Adjust if the season has more or fewer rounds
 
     upsert_free_fixtures()
     
@@ -1,8 +1,10 @@
 import argparse
 
-from app import create_app, db
-from app.models import FixtureFree, Tip, User
+from app import create_app
+from app.models import User
 from app.services.fixtures import find_current_round
+from app.services.leases import job_lease
+from app.services.tips import auto_assign_missing_tips
 
 
 def parse_args():
@@ -18,40 +20,24 @@ def run(match_ids_override=None):
     app = create_app()
     with app.app_context():
         current_round = find_current_round()
-        fixtures = FixtureFree.query.filter_by(round=current_round).all()
-
-        if not fixtures:
-            print("No fixtures found for current round.")
-            return
-
-        if match_ids_override:
-            match_ids = [m.strip() for m in match_ids_override if m.strip()]
-        else:
-            match_ids = [str(f.match_id) for f in fixtures]
-        tips = Tip.query.filter(Tip.match.in_(match_ids)).all()
-        tips_by_user = {}
-        for tip in tips:
-            tips_by_user.setdefault(tip.user_id, set()).add(str(tip.match))
-
-        target_fixtures = [f for f in fixtures if str(f.match_id) in match_ids]
-        users = User.query.all()
-        created = 0
-        for user in users:
-            existing = tips_by_user.get(user.id, set())
-            missing_fixtures = [f for f in target_fixtures if str(f.match_id) not in existing]
-            for fixture in missing_fixtures:
-                new_tip = Tip(
-                    user_id=user.id,
-                    username=user.username,
-                    match=str(fixture.match_id),
-                    selected_team=fixture.away_team,
-                )
-                db.session.add(new_tip)
-                created += 1
-
-        if created:
-            db.session.commit()
-        print(f"Auto-assigned {created} missing tips for round {current_round}.")
+        match_ids = [m.strip() for m in match_ids_override if m.strip()] if match_ids_override else None
+
+        with job_lease("auto_assign_tips") as acquired:
+            if not acquired:
+                print("Auto-assign is already running in another process.")
+                return None
+            created_by_user = auto_assign_missing_tips(current_round, match_ids=match_ids)
+
+        if created_by_user:
+            usernames = dict(
+                User.query.with_entities(User.id, User.username)
+                .filter(User.id.in_(created_by_user.keys()))
+                .all()
+            )
+            for user_id, created in sorted(created_by_user.items()):
+                print(f"{usernames.get(user_id, user_id)}: {created} tips auto-assigned")
+        print(f"Auto-assigned {sum(created_by_user.values())} missing tips for round {current_round}.")
+        return created_by_user
 
 
 if __name__ == "__main__":
@@ -0,0 +1,112 @@
+import argparse
+import csv
+import time
+from pathlib import Path
+
+from app import create_app
+from app.services.backtest import STRATEGIES, load_history, parameter_grid, run_backtest
+from app.services.ratings import HOME_ADVANTAGE, K_FACTOR, SEASON_CARRYOVER
+from app.services.seasons import current_season_year
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Replay past seasons' results and score tipping strategies round by round."
+    )
+    parser.add_argument("--seasons", type=int, nargs="+", help="Seasons to replay (defaults to the current one).")
+    parser.add_argument(
+        "--strategies",
+        nargs="+",
+        choices=sorted(STRATEGIES),
+        default=sorted(STRATEGIES),
+        help="Strategies to score (default: all).",
+    )
+    parser.add_argument("--k", type=float, nargs="+", default=[K_FACTOR], help="Elo K factors to try.")
+    parser.add_argument(
+        "--home-advantage", type=float, nargs="+", default=[HOME_ADVANTAGE], help="Elo home advantages to try."
+    )
+    parser.add_argument(
+        "--carryover", type=float, nargs="+", default=[SEASON_CARRYOVER], help="Elo season carryovers to try."
+    )
+    parser.add_argument("--workers", type=int, help="Worker processes (defaults to one per CPU; 1 runs inline).")
+    parser.add_argument("--top", type=int, default=20, help="Rows to print, best first.")
+    parser.add_argument("--output", help="Also write every result to this CSV in jobs/csv_outputs.")
+    return parser.parse_args()
+
+
+def build_tasks(strategies, k_factors=(K_FACTOR,), home_advantages=(HOME_ADVANTAGE,), carryovers=(SEASON_CARRYOVER,)):
+    tasks = []
+    for name in strategies:
+        if name == "elo":
+            grid = parameter_grid(k_factor=k_factors, home_advantage=home_advantages, carryover=carryovers)
+        elif name == "consensus":
+            grid = parameter_grid(fallback=["home", "away"])
+        else:
+            grid = [{}]
+        tasks.extend((name, params) for params in grid)
+    return tasks
+
+
+def _describe(params):
+    return ", ".join(f"{key}={value}" for key, value in params.items()) or "-"
+
+
+def run(seasons=None, strategies=None, k_factors=(K_FACTOR,), home_advantages=(HOME_ADVANTAGE,),
+        carryovers=(SEASON_CARRYOVER,), workers=None, top=20, output_name=None):
+    app = create_app()
+    with app.app_context():
+        seasons = seasons or [current_season_year()]
+        history = load_history(seasons)
+    if not len(history["round"]):
+        print(f"No fixtures for season(s) {', '.join(map(str, seasons))}.")
+        return []
+
+    tasks = build_tasks(strategies or sorted(STRATEGIES), k_factors, home_advantages, carryovers)
+    started = time.monotonic()
+    results = run_backtest(history, tasks, workers=workers)
+    elapsed = time.monotonic() - started
+    print(f"{len(tasks)} strategy runs over {len(history['round'])} fixtures "
+          f"({', '.join(map(str, seasons))}) in {elapsed:.2f}s.")
+
+    print(f"{'strategy':<10} {'params':<48} " + " ".join(f"{s:>6}" for s in seasons)
+          + f" {'total':>6} {'acc':>6} {'perfect':>7}")
+    for result in results[:top]:
+        print(
+            f"{result['strategy']:<10} {_describe(result['params']):<48} "
+            + " ".join(f"{result['by_season'].get(s, 0):>6}" for s in seasons)
+            + f" {result['points']:>6} {result['accuracy']:>6.1%} {result['perfect_rounds']:>7}"
+        )
+
+    if output_name:
+        output_dir = Path(__file__).resolve().parent / "csv_outputs"
+        output_dir.mkdir(parents=True, exist_ok=True)
+        output_path = output_dir / output_name
+        with output_path.open("w", newline="") as output_file:
+            writer = csv.writer(output_file)
+            writer.writerow(["strategy", "params", *seasons, "total", "correct", "perfect_rounds", "accuracy"])
+            for result in results:
+                writer.writerow([
+                    result["strategy"],
+                    _describe(result["params"]),
+                    *(result["by_season"].get(s, 0) for s in seasons),
+                    result["points"],
+                    result["correct"],
+                    result["perfect_rounds"],
+                    round(result["accuracy"], 4),
+                ])
+        print(f"Wrote {len(results)} results to {output_path}")
+    return results
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    run(
+        seasons=args.seasons,
+        strategies=args.strategies,
+        k_factors=args.k,
+        home_advantages=args.home_advantage,
+        carryovers=args.carryover,
+        workers=args.workers,
+        top=args.top,
+        output_name=args.output,
+    )
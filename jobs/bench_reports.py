@@ -0,0 +1,84 @@
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app import create_app
+from app.services.analyst_agent import _build_report_for_fixture
+from app.services.fixtures import find_current_round
+from app.services.llm_backend import StubBackend, get_llm_backend, set_llm_backend
+from app.services.research import DEFAULT_SEARCH_COUNT
+from app.services.seasons import round_fixtures_query
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Time the match report pipeline for a round, offline by default."
+    )
+    parser.add_argument("--round", type=int, help="Round to report on (defaults to the current round).")
+    parser.add_argument("--workers", type=int, default=1, help="Reports generated concurrently.")
+    parser.add_argument("--repeat", type=int, default=1, help="Generate each report this many times.")
+    parser.add_argument("--searches", type=int, default=DEFAULT_SEARCH_COUNT, help="search_count passed to the planner.")
+    parser.add_argument("--live", action="store_true", help="Use the configured LLM_BACKEND instead of the stub.")
+    parser.add_argument("--recordings", help="Recorded calls for the stub to replay.")
+    parser.add_argument("--latency", type=float, default=1.0, help="Stub latency per agent call (seconds).")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Stub failure rate per agent call.")
+    parser.add_argument("--seed", default="bench", help="Stub seed, for reproducible runs.")
+    return parser.parse_args()
+
+
+def run(round_number=None, workers=1, repeat=1, searches=DEFAULT_SEARCH_COUNT, backend=None):
+    if backend is not None:
+        set_llm_backend(backend)
+    app = create_app()
+    with app.app_context():
+        round_number = round_number or find_current_round()
+        fixtures = round_fixtures_query(round_number).all() * repeat
+
+    def _one(fixture):
+        started = time.monotonic()
+        try:
+            # Research is read from and saved to the database.
+            with app.app_context():
+                _build_report_for_fixture(fixture, search_count=searches, on_event=lambda event, data: None)
+            return time.monotonic() - started, None
+        except Exception as exc:
+            return time.monotonic() - started, f"{type(exc).__name__}: {exc}"
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(_one, fixtures))
+    elapsed = time.monotonic() - started
+
+    durations = sorted(d for d, error in results if error is None)
+    failures = [error for _, error in results if error is not None]
+    print(f"{len(fixtures)} reports for round {round_number} with {workers} workers in {elapsed:.1f}s "
+          f"({len(failures)} failed).")
+    if durations:
+        p95 = durations[min(len(durations) - 1, int(len(durations) * 0.95))]
+        print(f"per report: p50 {statistics.median(durations):.2f}s, p95 {p95:.2f}s, max {durations[-1]:.2f}s")
+    for error in sorted(set(failures)):
+        print(f"  {failures.count(error)} x {error}")
+    backend = get_llm_backend()
+    if isinstance(backend, StubBackend):
+        print(f"stub: {backend.calls} agent calls, {backend.replayed} replayed from recordings")
+    return results
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    backend = None
+    if not args.live:
+        backend = StubBackend(
+            recordings_path=args.recordings,
+            latency=args.latency,
+            failure_rate=args.failure_rate,
+            seed=args.seed,
+        )
+    run(
+        round_number=args.round,
+        workers=args.workers,
+        repeat=args.repeat,
+        searches=args.searches,
+        backend=backend,
+    )
@@ -0,0 +1,35 @@
+import argparse
+import sys
+
+from app import create_app
+from app.services.season_totals import check_season_totals
+from app.services.seasons import current_season_year
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Verify user_season_totals against a full recomputation from user_tip_stats."
+    )
+    parser.add_argument("--season", type=int, help="Season year (defaults to the current season).")
+    parser.add_argument("--fix", action="store_true", help="Rewrite mismatched rows from the recomputation.")
+    return parser.parse_args()
+
+
+def run(season=None, fix=False):
+    app = create_app()
+    with app.app_context():
+        season = season or current_season_year()
+        mismatches = check_season_totals(season, fix=fix)
+        for user_id, field, stored, expected in mismatches:
+            print(f"user {user_id}: {field} stored={stored} expected={expected}")
+        if mismatches:
+            print(f"{len(mismatches)} mismatches in season {season}{' (fixed)' if fix else ''}.")
+        else:
+            print(f"Season {season} totals are consistent.")
+        return mismatches
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    mismatches = run(season=args.season, fix=args.fix)
+    sys.exit(1 if mismatches and not args.fix else 0)
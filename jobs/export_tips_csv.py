@@ -1,26 +1,38 @@
 import argparse
-import csv
 from datetime import datetime
 from pathlib import Path
 
 from app import create_app
-from app.models import Tip
+from app.services.exports import EXPORT_FORMATS, iter_tip_export
 
 
 def parse_args():
-    parser = argparse.ArgumentParser(description="Export Tip rows to CSV.")
+    parser = argparse.ArgumentParser(description="Export Tip rows joined with fixture results.")
     parser.add_argument(
         "--output",
         help="Optional output filename (defaults to timestamped file).",
     )
+    parser.add_argument(
+        "--format",
+        choices=sorted(EXPORT_FORMATS),
+        default="csv",
+        help="Output format (default: csv).",
+    )
+    parser.add_argument("--season", type=int, help="Only export tips for this season.")
+    parser.add_argument("--round", type=int, help="Only export tips for this round.")
+    parser.add_argument("--user-id", type=int, help="Only export tips for this user.")
     return parser.parse_args()
 
 
-def run(output_name: str | None = None) -> Path:
+def run(
+    output_name: str | None = None,
+    fmt: str = "csv",
+    season: int | None = None,
+    round_number: int | None = None,
+    user_id: int | None = None,
+) -> Path:
     app = create_app()
     with app.app_context():
-        tips = Tip.query.order_by(Tip.id).all()
-
         output_dir = Path(__file__).resolve().parent / "csv_outputs"
         output_dir.mkdir(parents=True, exist_ok=True)
 
@@ -28,31 +40,25 @@ def run(output_name: str | None = None) -> Path:
             filename = output_name
         else:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"tips_{timestamp}.csv"
+            filename = f"tips_{timestamp}.{EXPORT_FORMATS[fmt][1]}"
 
         output_path = output_dir / filename
 
-        with output_path.open("w", newline="", encoding="utf-8") as csvfile:
-            writer = csv.writer(csvfile)
-            writer.writerow(
-                ["id", "match", "selected_team", "user_id", "username", "date"]
-            )
-            for tip in tips:
-                writer.writerow(
-                    [
-                        tip.id,
-                        tip.match,
-                        tip.selected_team,
-                        tip.user_id,
-                        tip.username,
-                        tip.date.isoformat() if tip.date else "",
-                    ]
-                )
+        chunks = iter_tip_export(fmt, season=season, round_number=round_number, user_id=user_id)
+        with output_path.open("wb") as output_file:
+            for chunk in chunks:
+                output_file.write(chunk)
 
     return output_path
 
 
 if __name__ == "__main__":
     args = parse_args()
-    output_path = run(output_name=args.output)
+    output_path = run(
+        output_name=args.output,
+        fmt=args.format,
+        season=args.season,
+        round_number=args.round,
+        user_id=args.user_id,
+    )
     print(f"Exported tips to {output_path}")
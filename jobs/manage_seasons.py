@@ -0,0 +1,50 @@
+import argparse
+from datetime import date, datetime
+
+from app import create_app
+from app.services.seasons import archive_season, get_all_seasons, start_season
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Start, archive or list tipping seasons.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("list", help="List all seasons.")
+
+    start = sub.add_parser("start", help="Create a season and make it current.")
+    start.add_argument("year", type=int)
+    start.add_argument("--feed-slug", help="fixturedownload.com feed (default nrl-<year>).")
+    start.add_argument("--round1-start", type=date.fromisoformat, help="YYYY-MM-DD")
+    start.add_argument("--round1-end", type=date.fromisoformat, help="YYYY-MM-DD")
+    start.add_argument("--round1-first-cutoff", type=datetime.fromisoformat, help="YYYY-MM-DDTHH:MM (Sydney time)")
+    start.add_argument("--round1-cutoff", type=datetime.fromisoformat, help="YYYY-MM-DDTHH:MM (Sydney time)")
+    start.add_argument("--round1-early-match-ids", help="Comma-separated match numbers played before round1_first_cutoff.")
+
+    archive = sub.add_parser("archive", help="Freeze final standings for a finished season.")
+    archive.add_argument("year", type=int)
+    archive.add_argument("--purge", action="store_true", help="Also delete the season's tips, chat and reports.")
+    return parser.parse_args()
+
+
+def run(args):
+    app = create_app()
+    with app.app_context():
+        if args.command == "list":
+            for season in get_all_seasons():
+                status = "current" if season.is_current else ("archived" if season.archived_at else "")
+                print(f"{season.year}  {season.feed_slug}  {status}")
+        elif args.command == "start":
+            round1_fields = {
+                field: getattr(args, field)
+                for field in ("round1_start", "round1_end", "round1_first_cutoff", "round1_cutoff", "round1_early_match_ids")
+                if getattr(args, field) is not None
+            }
+            season = start_season(args.year, feed_slug=args.feed_slug, **round1_fields)
+            print(f"Season {season.year} is now current (feed {season.feed_slug}).")
+        elif args.command == "archive":
+            count = archive_season(args.year, purge=args.purge)
+            print(f"Archived season {args.year}: {count} user summaries written{' and raw rows purged' if args.purge else ''}.")
+
+
+if __name__ == "__main__":
+    run(parse_args())
@@ -0,0 +1,36 @@
+import argparse
+
+from app import create_app
+from app.services.leases import job_lease
+from app.services.match_reports import prewarm_round_reports
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Generate shared match reports for a round ahead of the tipping rush."
+    )
+    parser.add_argument("--round", type=int, help="Round to report on (defaults to the current round).")
+    parser.add_argument("--workers", type=int, default=3, help="Reports generated concurrently.")
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Redo research older than a few hours and rewrite reports whose inputs changed.",
+    )
+    return parser.parse_args()
+
+
+def run(round_number=None, workers=3, refresh=False):
+    app = create_app()
+    with app.app_context():
+        job_name = "refresh_reports" if refresh else "prewarm_reports"
+        with job_lease(job_name, ttl_seconds=2 * 3600) as acquired:
+            if not acquired:
+                print("Report pre-warm already running elsewhere, skipping.")
+                return
+            outcomes = prewarm_round_reports(round_number, workers=workers, refresh=refresh)
+            print("Done: " + ", ".join(f"{count} {outcome}" for outcome, count in outcomes.items()))
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    run(round_number=args.round, workers=args.workers, refresh=args.refresh)
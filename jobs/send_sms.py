@@ -1,46 +1,50 @@
-import os
-from twilio.rest import Client
-from dotenv import load_dotenv
-from app.utils.helper_functions import has_user_submitted_tips
-from app.models import User
-from app import create_app, db
-import app
+import argparse
 
-# Load .env from root directory
-#load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), '..', '..', '.env'))
-load_dotenv()
+from app import create_app
+from app.services.leases import job_lease
+from app.services.reminders import send_tip_reminders
+from app.utils.send_sms import get_sender
 
-account_sid = os.getenv('TWILIO_ACCOUNT_SID')
-auth_token = os.getenv('TWILIO_AUTH_TOKEN')
-client = Client(account_sid, auth_token)
 
-def send_msg(recipient, msg):
-    message = client.messages.create(
-        body=msg,
-        from_='+19036485985',  # Your Twilio trial number
-        to= f'+61{recipient}'      # Your verified mobile number (Australia example)
-    )
+def parse_args():
+    parser = argparse.ArgumentParser(description="Send SMS reminders to users with missing tips.")
+    parser.add_argument("--round", type=int, help="Round to check (defaults to the current round).")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent senders.")
+    parser.add_argument("--rate", type=float, default=1.0, help="Max messages per second across all workers.")
+    parser.add_argument("--retries", type=int, default=2, help="Retries per message on failure.")
+    parser.add_argument("--stub", action="store_true", help="Use the offline stub sender instead of Twilio.")
+    parser.add_argument("--stub-latency", type=float, default=0.2, help="Simulated send latency for --stub.")
+    parser.add_argument("--stub-failure-rate", type=float, default=0.0, help="Simulated failure rate for --stub.")
+    parser.add_argument("--dry-run", action="store_true", help="List recipients without sending.")
+    return parser.parse_args()
+
 
-    print(f"Message sent! SID: {message.sid}")
+def run(round_number=None, workers=4, rate=1.0, retries=2, sender=None, dry_run=False):
+    app = create_app()
+    with app.app_context(), job_lease("send_reminders") as acquired:
+        if not acquired:
+            print("Reminders are already being sent by another process.")
+            return None
+        return send_tip_reminders(
+            round_number=round_number,
+            workers=workers,
+            rate=rate,
+            retries=retries,
+            sender=sender,
+            dry_run=dry_run,
+        )
 
 
 if __name__ == '__main__':
-    app = create_app()
-    with app.app_context():
-        msg='''
-        ⚠️ Hey! This is your weekly tipping reminder. ⚠️ 
-        Don’t forget to submit by 5PM Thursday!
-        All participants who havnt submited by then will automatically be given the home teams 
-        '''
-        users = User.query.all()
-        havnt_submitted = []
-        for user in users:
-            if (not has_user_submitted_tips(user.id)) and (user.phone_number is not None):
-                send_msg(user.phone_number,msg)
-                print(f"Message reminder sent to:\n {user.username}")
-                havnt_submitted.append(user.username)
-        recipients = "\n ".join(havnt_submitted)
-        send_msg('488534484',f'reminders where sent to:\n {recipients}')
-        
-    
-        
\ No newline at end of file
+    args = parse_args()
+    sender = None
+    if args.stub:
+        sender = get_sender(stub=True, latency=args.stub_latency, failure_rate=args.stub_failure_rate)
+    run(
+        round_number=args.round,
+        workers=args.workers,
+        rate=args.rate,
+        retries=args.retries,
+        sender=sender,
+        dry_run=args.dry_run,
+    )
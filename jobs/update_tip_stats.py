@@ -2,6 +2,7 @@ import argparse
 
 from app import create_app
 from app.services.fixtures import upsert_free_fixtures, update_user_tip_stats
+from app.services.leases import job_lease
 
 
 def parse_args():
@@ -20,13 +21,21 @@ def run(skip_fixtures: bool = False) -> None:
     app = create_app()
     with app.app_context():
         if not skip_fixtures:
-            print("Refreshing fixtures...")
-            upsert_free_fixtures()
+            with job_lease("refresh_fixtures") as acquired:
+                if acquired:
+                    print("Refreshing fixtures...")
+                    upsert_free_fixtures()
+                else:
+                    print("Fixture refresh already running elsewhere, skipping.")
         else:
             print("Skipping fixture refresh.")
 
-        print("Updating user tip stats...")
-        update_user_tip_stats()
+        with job_lease("update_tip_stats") as acquired:
+            if not acquired:
+                print("Tip stats update already running elsewhere, skipping.")
+                return
+            print("Updating user tip stats...")
+            update_user_tip_stats()
 
         print("Done.")
 
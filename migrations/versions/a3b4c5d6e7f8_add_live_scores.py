@@ -0,0 +1,36 @@
+"""add live score columns to fixture_free
+
+Revision ID: a3b4c5d6e7f8
+Revises: f2a3b4c5d6e7
+Create Date: 2026-10-21 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3b4c5d6e7f8'
+down_revision = 'f2a3b4c5d6e7'
+branch_labels = None
+depends_on = None
+
+
+def _has_column(table, column):
+    # create_app() runs db.create_all(), but that never adds columns to an
+    # existing table; a fresh database already has this one.
+    return column in {c['name'] for c in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def upgrade():
+    if _has_column('fixture_free', 'live_home_score'):
+        return
+    with op.batch_alter_table('fixture_free', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('live_home_score', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('live_away_score', sa.Integer(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('fixture_free', schema=None) as batch_op:
+        batch_op.drop_column('live_away_score')
+        batch_op.drop_column('live_home_score')
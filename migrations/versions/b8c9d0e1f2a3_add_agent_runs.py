@@ -0,0 +1,57 @@
+"""add agent run telemetry
+
+Revision ID: b8c9d0e1f2a3
+Revises: a7b8c9d0e1f2
+Create Date: 2026-10-19 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b8c9d0e1f2a3'
+down_revision = 'a7b8c9d0e1f2'
+branch_labels = None
+depends_on = None
+
+
+def _has_table(name):
+    # create_app() runs db.create_all(), so the table may already exist.
+    return sa.inspect(op.get_bind()).has_table(name)
+
+
+def upgrade():
+    if not _has_table('agent_runs'):
+        op.create_table(
+            'agent_runs',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('job', sa.String(length=30), nullable=False),
+            sa.Column('run_id', sa.String(length=32), nullable=False),
+            sa.Column('season', sa.Integer(), nullable=True),
+            sa.Column('round_number', sa.Integer(), nullable=True),
+            sa.Column('fixture_id', sa.Integer(), nullable=True),
+            sa.Column('stage', sa.String(length=30), nullable=False),
+            sa.Column('agent_name', sa.String(length=100), nullable=True),
+            sa.Column('model', sa.String(length=50), nullable=True),
+            sa.Column('started_at', sa.DateTime(), nullable=False),
+            sa.Column('duration_ms', sa.Integer(), nullable=False),
+            sa.Column('requests', sa.Integer(), nullable=False),
+            sa.Column('input_tokens', sa.Integer(), nullable=False),
+            sa.Column('output_tokens', sa.Integer(), nullable=False),
+            sa.Column('tool_calls', sa.Integer(), nullable=False),
+            sa.Column('cost_usd', sa.Float(), nullable=False),
+            sa.Column('outcome', sa.String(length=20), nullable=False),
+            sa.Column('error', sa.String(length=500), nullable=True),
+            sa.ForeignKeyConstraint(['fixture_id'], ['fixture_free.id']),
+            sa.ForeignKeyConstraint(['season'], ['seasons.year']),
+            sa.PrimaryKeyConstraint('id'),
+        )
+        with op.batch_alter_table('agent_runs', schema=None) as batch_op:
+            batch_op.create_index('ix_agent_runs_run_id', ['run_id'])
+            batch_op.create_index('ix_agent_runs_season_round', ['season', 'round_number'])
+            batch_op.create_index('ix_agent_runs_fixture', ['fixture_id'])
+
+
+def downgrade():
+    op.drop_table('agent_runs')
@@ -0,0 +1,38 @@
+"""add job leases
+
+Revision ID: c3d4e5f6a7b8
+Revises: b7c1d2e3f4a5
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3d4e5f6a7b8'
+down_revision = 'b7c1d2e3f4a5'
+branch_labels = None
+depends_on = None
+
+
+def _has_table(name):
+    # create_app() runs db.create_all(), so the table may already exist.
+    return sa.inspect(op.get_bind()).has_table(name)
+
+
+def upgrade():
+    if _has_table('job_leases'):
+        return
+    op.create_table(
+        'job_leases',
+        sa.Column('job_name', sa.String(length=100), nullable=False),
+        sa.Column('holder', sa.String(length=200), nullable=False),
+        sa.Column('acquired_at', sa.DateTime(), nullable=False),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('job_name'),
+    )
+
+
+def downgrade():
+    op.drop_table('job_leases')
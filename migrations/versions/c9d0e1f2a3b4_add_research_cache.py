@@ -0,0 +1,45 @@
+"""add research cache
+
+Revision ID: c9d0e1f2a3b4
+Revises: b8c9d0e1f2a3
+Create Date: 2026-10-19 22:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c9d0e1f2a3b4'
+down_revision = 'b8c9d0e1f2a3'
+branch_labels = None
+depends_on = None
+
+
+def _has_table(name):
+    # create_app() runs db.create_all(), so the table may already exist.
+    return sa.inspect(op.get_bind()).has_table(name)
+
+
+def upgrade():
+    if not _has_table('research_cache'):
+        op.create_table(
+            'research_cache',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('season', sa.Integer(), nullable=False),
+            sa.Column('round_number', sa.Integer(), nullable=False),
+            sa.Column('query_key', sa.String(length=64), nullable=False),
+            sa.Column('query_text', sa.String(length=500), nullable=False),
+            sa.Column('summary', sa.Text(), nullable=False),
+            sa.Column('created_at', sa.DateTime(), nullable=False),
+            sa.Column('expires_at', sa.DateTime(), nullable=False),
+            sa.ForeignKeyConstraint(['season'], ['seasons.year']),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('season', 'round_number', 'query_key', name='unique_research_query'),
+        )
+        with op.batch_alter_table('research_cache', schema=None) as batch_op:
+            batch_op.create_index('ix_research_cache_expires_at', ['expires_at'])
+
+
+def downgrade():
+    op.drop_table('research_cache')
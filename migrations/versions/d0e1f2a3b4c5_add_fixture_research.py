@@ -0,0 +1,43 @@
+"""add fixture research
+
+Revision ID: d0e1f2a3b4c5
+Revises: c9d0e1f2a3b4
+Create Date: 2026-10-19 23:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd0e1f2a3b4c5'
+down_revision = 'c9d0e1f2a3b4'
+branch_labels = None
+depends_on = None
+
+
+def _has_table(name):
+    # create_app() runs db.create_all(), so the table may already exist.
+    return sa.inspect(op.get_bind()).has_table(name)
+
+
+def upgrade():
+    if not _has_table('fixture_research'):
+        op.create_table(
+            'fixture_research',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('fixture_id', sa.Integer(), nullable=False),
+            sa.Column('season', sa.Integer(), nullable=False),
+            sa.Column('round_number', sa.Integer(), nullable=False),
+            sa.Column('search_count', sa.Integer(), nullable=False),
+            sa.Column('searches', sa.JSON(), nullable=False),
+            sa.Column('created_at', sa.DateTime(), nullable=False),
+            sa.ForeignKeyConstraint(['fixture_id'], ['fixture_free.id']),
+            sa.ForeignKeyConstraint(['season'], ['seasons.year']),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('fixture_id'),
+        )
+
+
+def downgrade():
+    op.drop_table('fixture_research')
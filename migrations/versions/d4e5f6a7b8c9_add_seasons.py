@@ -0,0 +1,117 @@
+"""add seasons
+
+Revision ID: d4e5f6a7b8c9
+Revises: c3d4e5f6a7b8
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from datetime import date, datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4e5f6a7b8c9'
+down_revision = 'c3d4e5f6a7b8'
+branch_labels = None
+depends_on = None
+
+
+SEASON_TABLES = ('tip', 'user_tip_stats', 'chat_messages')
+
+
+def _has_table(name):
+    # create_app() runs db.create_all(), so the table may already exist.
+    return sa.inspect(op.get_bind()).has_table(name)
+
+
+def upgrade():
+    if not _has_table('seasons'):
+        op.create_table(
+            'seasons',
+            sa.Column('year', sa.Integer(), autoincrement=False, nullable=False),
+            sa.Column('feed_slug', sa.String(length=50), nullable=False),
+            sa.Column('is_current', sa.Boolean(), nullable=False),
+            sa.Column('round1_start', sa.Date(), nullable=True),
+            sa.Column('round1_end', sa.Date(), nullable=True),
+            sa.Column('round1_first_cutoff', sa.DateTime(), nullable=True),
+            sa.Column('round1_cutoff', sa.DateTime(), nullable=True),
+            sa.Column('round1_early_match_ids', sa.String(length=100), nullable=True),
+            sa.Column('archived_at', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('year'),
+        )
+    # Everything already in the DB belongs to 2026, the only season so far.
+    seasons = sa.table(
+        'seasons',
+        sa.column('year', sa.Integer()),
+        sa.column('feed_slug', sa.String()),
+        sa.column('is_current', sa.Boolean()),
+        sa.column('round1_start', sa.Date()),
+        sa.column('round1_end', sa.Date()),
+        sa.column('round1_first_cutoff', sa.DateTime()),
+        sa.column('round1_cutoff', sa.DateTime()),
+        sa.column('round1_early_match_ids', sa.String()),
+    )
+    has_2026 = op.get_bind().execute(sa.text("SELECT 1 FROM seasons WHERE year = 2026")).first()
+    if not has_2026:
+        op.bulk_insert(seasons, [{
+            'year': 2026,
+            'feed_slug': 'nrl-2026',
+            'is_current': True,
+            'round1_start': date(2026, 3, 1),
+            'round1_end': date(2026, 3, 8),
+            'round1_first_cutoff': datetime(2026, 2, 28, 17, 0, 0),
+            'round1_cutoff': datetime(2026, 3, 5, 17, 0, 0),
+            'round1_early_match_ids': '1,2',
+        }])
+
+    for table in SEASON_TABLES:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.add_column(sa.Column('season', sa.Integer(), nullable=True))
+        op.execute(f"UPDATE {table} SET season = 2026 WHERE season IS NULL")
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.alter_column('season', existing_type=sa.Integer(), nullable=False)
+            batch_op.create_foreign_key(f'fk_{table}_season', 'seasons', ['season'], ['year'])
+
+    op.create_index('ix_tip_season_user', 'tip', ['season', 'user_id'])
+    op.create_index('ix_tip_season_match', 'tip', ['season', 'match'])
+    op.create_index('ix_fixture_free_season_round', 'fixture_free', ['season', 'round'])
+    op.create_index('ix_user_tip_stats_season_user_round', 'user_tip_stats', ['season', 'user_id', 'round_number'])
+    op.create_index('ix_chat_messages_season_round', 'chat_messages', ['season', 'round_number', 'timestamp'])
+
+    if _has_table('season_user_summaries'):
+        return
+    op.create_table(
+        'season_user_summaries',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('season', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('username', sa.String(length=150), nullable=False),
+        sa.Column('successful_tips', sa.Integer(), nullable=False),
+        sa.Column('failed_tips', sa.Integer(), nullable=False),
+        sa.Column('bonus_tips', sa.Integer(), nullable=False),
+        sa.Column('perfect_rounds', sa.Integer(), nullable=False),
+        sa.Column('final_rank', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['season'], ['seasons.year']),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('season', 'user_id', name='unique_season_user_summary'),
+    )
+
+
+def downgrade():
+    op.drop_table('season_user_summaries')
+
+    op.drop_index('ix_chat_messages_season_round', table_name='chat_messages')
+    op.drop_index('ix_user_tip_stats_season_user_round', table_name='user_tip_stats')
+    op.drop_index('ix_fixture_free_season_round', table_name='fixture_free')
+    op.drop_index('ix_tip_season_match', table_name='tip')
+    op.drop_index('ix_tip_season_user', table_name='tip')
+
+    for table in SEASON_TABLES:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_constraint(f'fk_{table}_season', type_='foreignkey')
+            batch_op.drop_column('season')
+
+    op.drop_table('seasons')
@@ -0,0 +1,43 @@
+"""add match reports
+
+Revision ID: e1f2a3b4c5d6
+Revises: d0e1f2a3b4c5
+Create Date: 2026-10-20 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e1f2a3b4c5d6'
+down_revision = 'd0e1f2a3b4c5'
+branch_labels = None
+depends_on = None
+
+
+def _has_table(name):
+    # create_app() runs db.create_all(), so the table may already exist.
+    return sa.inspect(op.get_bind()).has_table(name)
+
+
+def upgrade():
+    if not _has_table('match_reports'):
+        op.create_table(
+            'match_reports',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('fixture_id', sa.Integer(), nullable=False),
+            sa.Column('season', sa.Integer(), nullable=False),
+            sa.Column('round_number', sa.Integer(), nullable=False),
+            sa.Column('report_content', sa.Text(), nullable=False),
+            sa.Column('inputs_key', sa.String(length=64), nullable=False),
+            sa.Column('created_at', sa.DateTime(), nullable=False),
+            sa.ForeignKeyConstraint(['fixture_id'], ['fixture_free.id']),
+            sa.ForeignKeyConstraint(['season'], ['seasons.year']),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('fixture_id'),
+        )
+
+
+def downgrade():
+    op.drop_table('match_reports')
@@ -0,0 +1,99 @@
+"""add integer fixture_id foreign keys
+
+Revision ID: e5f6a7b8c9d0
+Revises: d4e5f6a7b8c9
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5f6a7b8c9d0'
+down_revision = 'd4e5f6a7b8c9'
+branch_labels = None
+depends_on = None
+
+
+# table -> string column that currently points at fixture_free.match_id
+FIXTURE_REFS = {
+    'tip': 'match',
+    'tip_intelligence_reports': 'match_id',
+    'chat_messages': 'match_id',
+}
+
+
+def upgrade():
+    # Checked before any DDL, so a failed upgrade leaves the tables as they
+    # were (SQLite doesn't roll back the batch table rebuilds). tip and
+    # tip_intelligence_reports get a NOT NULL fixture_id; a chat message
+    # without a match stays NULL, but one whose match is missing would
+    # silently lose its link.
+    conn = op.get_bind()
+    orphans = {}
+    for table, match_column in FIXTURE_REFS.items():
+        missing = (
+            f"NOT EXISTS (SELECT 1 FROM fixture_free WHERE fixture_free.match_id = {table}.{match_column})"
+        )
+        if table == 'chat_messages':
+            condition = f"{match_column} IS NOT NULL AND {missing}"
+        else:
+            condition = f"{match_column} IS NULL OR {missing}"
+        count = conn.execute(sa.text(f"SELECT COUNT(*) FROM {table} WHERE {condition}")).scalar()
+        if count:
+            orphans[table] = count
+    if orphans:
+        raise RuntimeError(
+            "Rows reference a match that is not in fixture_free ("
+            + ", ".join(f"{table}: {count}" for table, count in orphans.items())
+            + "); load the missing fixtures (or delete those rows) and re-run the upgrade."
+        )
+
+    for table, match_column in FIXTURE_REFS.items():
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.add_column(sa.Column('fixture_id', sa.Integer(), nullable=True))
+        op.execute(
+            f"UPDATE {table} SET fixture_id = "
+            f"(SELECT fixture_free.id FROM fixture_free WHERE fixture_free.match_id = {table}.{match_column}) "
+            f"WHERE {match_column} IS NOT NULL"
+        )
+
+    with op.batch_alter_table('tip', schema=None) as batch_op:
+        batch_op.alter_column('fixture_id', existing_type=sa.Integer(), nullable=False)
+        batch_op.create_foreign_key('fk_tip_fixture_id', 'fixture_free', ['fixture_id'], ['id'])
+        batch_op.drop_constraint('unique_user_match', type_='unique')
+        batch_op.create_unique_constraint('unique_user_fixture', ['user_id', 'fixture_id'])
+        batch_op.drop_index('ix_tip_season_match')
+        batch_op.create_index('ix_tip_fixture', ['fixture_id'])
+
+    with op.batch_alter_table('tip_intelligence_reports', schema=None) as batch_op:
+        batch_op.alter_column('fixture_id', existing_type=sa.Integer(), nullable=False)
+        batch_op.create_foreign_key('fk_tip_intelligence_reports_fixture_id', 'fixture_free', ['fixture_id'], ['id'])
+        batch_op.drop_constraint('unique_user_match_report', type_='unique')
+        batch_op.create_unique_constraint('unique_user_fixture_report', ['user_id', 'fixture_id'])
+
+    with op.batch_alter_table('chat_messages', schema=None) as batch_op:
+        batch_op.create_foreign_key('fk_chat_messages_fixture_id', 'fixture_free', ['fixture_id'], ['id'])
+        batch_op.create_index('ix_chat_messages_fixture_id', ['fixture_id'])
+
+
+def downgrade():
+    with op.batch_alter_table('chat_messages', schema=None) as batch_op:
+        batch_op.drop_index('ix_chat_messages_fixture_id')
+        batch_op.drop_constraint('fk_chat_messages_fixture_id', type_='foreignkey')
+        batch_op.drop_column('fixture_id')
+
+    with op.batch_alter_table('tip_intelligence_reports', schema=None) as batch_op:
+        batch_op.drop_constraint('unique_user_fixture_report', type_='unique')
+        batch_op.create_unique_constraint('unique_user_match_report', ['user_id', 'match_id'])
+        batch_op.drop_constraint('fk_tip_intelligence_reports_fixture_id', type_='foreignkey')
+        batch_op.drop_column('fixture_id')
+
+    with op.batch_alter_table('tip', schema=None) as batch_op:
+        batch_op.drop_index('ix_tip_fixture')
+        batch_op.create_index('ix_tip_season_match', ['season', 'match'])
+        batch_op.drop_constraint('unique_user_fixture', type_='unique')
+        batch_op.create_unique_constraint('unique_user_match', ['user_id', 'match'])
+        batch_op.drop_constraint('fk_tip_fixture_id', type_='foreignkey')
+        batch_op.drop_column('fixture_id')
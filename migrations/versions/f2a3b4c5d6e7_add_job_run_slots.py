@@ -0,0 +1,39 @@
+"""add scheduled_for slots to job runs
+
+Revision ID: f2a3b4c5d6e7
+Revises: e1f2a3b4c5d6
+Create Date: 2026-10-21 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2a3b4c5d6e7'
+down_revision = 'e1f2a3b4c5d6'
+branch_labels = None
+depends_on = None
+
+
+def _has_column(table, column):
+    # create_app() runs db.create_all(), but that never adds columns to an
+    # existing table; a fresh database already has this one.
+    return column in {c['name'] for c in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def upgrade():
+    if _has_column('job_runs', 'scheduled_for'):
+        return
+    # "skipped" rows were written on every lost lease; runs are only recorded
+    # once claimed now, so they are just noise.
+    op.execute("DELETE FROM job_runs WHERE status = 'skipped'")
+    with op.batch_alter_table('job_runs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('scheduled_for', sa.DateTime(), nullable=True))
+        batch_op.create_unique_constraint('uq_job_runs_job_slot', ['job_name', 'scheduled_for'])
+
+
+def downgrade():
+    with op.batch_alter_table('job_runs', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_job_runs_job_slot', type_='unique')
+        batch_op.drop_column('scheduled_for')
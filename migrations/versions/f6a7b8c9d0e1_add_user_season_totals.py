@@ -0,0 +1,90 @@
+"""add user season totals
+
+Revision ID: f6a7b8c9d0e1
+Revises: e5f6a7b8c9d0
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f6a7b8c9d0e1'
+down_revision = 'e5f6a7b8c9d0'
+branch_labels = None
+depends_on = None
+
+
+def _has_table(name):
+    # create_app() runs db.create_all(), so the table may already exist.
+    return sa.inspect(op.get_bind()).has_table(name)
+
+
+def upgrade():
+    if not _has_table('user_season_totals'):
+        op.create_table(
+            'user_season_totals',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('season', sa.Integer(), nullable=False),
+            sa.Column('user_id', sa.Integer(), nullable=False),
+            sa.Column('successful_tips', sa.Integer(), nullable=False),
+            sa.Column('failed_tips', sa.Integer(), nullable=False),
+            sa.Column('pending_tips', sa.Integer(), nullable=False),
+            sa.Column('bonus_tips', sa.Integer(), nullable=False),
+            sa.Column('total_points', sa.Integer(), nullable=False),
+            sa.Column('perfect_rounds', sa.Integer(), nullable=False),
+            sa.Column('current_streak', sa.Integer(), nullable=False),
+            sa.Column('last_round', sa.Integer(), nullable=True),
+            sa.Column('updated_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['season'], ['seasons.year']),
+            sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('season', 'user_id', name='unique_season_user_totals'),
+        )
+        op.create_index('ix_user_season_totals_season_points', 'user_season_totals', ['season', 'total_points'])
+
+    # Backfill from user_tip_stats; afterwards the scoring job keeps it current.
+    conn = op.get_bind()
+    if conn.execute(sa.text("SELECT 1 FROM user_season_totals")).first():
+        return
+
+    rows = conn.execute(sa.text(
+        "SELECT season, user_id, round_number, successful_tips, failed_tips, pending_tips, bonus_tips "
+        "FROM user_tip_stats WHERE round_number IS NOT NULL "
+        "ORDER BY season, user_id, round_number"
+    )).fetchall()
+
+    totals = {}
+    for season, user_id, round_number, successful, failed, pending, bonus in rows:
+        entry = totals.setdefault((season, user_id), {
+            'season': season, 'user_id': user_id,
+            'successful_tips': 0, 'failed_tips': 0, 'pending_tips': 0, 'bonus_tips': 0,
+            'perfect_rounds': 0, 'current_streak': 0, 'last_round': None,
+        })
+        entry['successful_tips'] += successful or 0
+        entry['failed_tips'] += failed or 0
+        entry['pending_tips'] += pending or 0
+        entry['bonus_tips'] += bonus or 0
+        is_perfect = (bonus or 0) > 0
+        entry['perfect_rounds'] += int(is_perfect)
+        contiguous = entry['last_round'] is not None and round_number == entry['last_round'] + 1
+        entry['current_streak'] = ((entry['current_streak'] if contiguous else 0) + 1) if is_perfect else 0
+        entry['last_round'] = round_number
+
+    for entry in totals.values():
+        entry['total_points'] = entry['successful_tips'] + entry['bonus_tips']
+
+    if totals:
+        op.bulk_insert(sa.table(
+            'user_season_totals',
+            *(sa.column(name) for name in (
+                'season', 'user_id', 'successful_tips', 'failed_tips', 'pending_tips', 'bonus_tips',
+                'total_points', 'perfect_rounds', 'current_streak', 'last_round',
+            ))
+        ), list(totals.values()))
+
+
+def downgrade():
+    op.drop_index('ix_user_season_totals_season_points', table_name='user_season_totals')
+    op.drop_table('user_season_totals')
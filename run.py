@@ -1,7 +1,15 @@
+import os
+
 from app import create_app
 
 app = create_app()
 
+# Opt-in: run scheduled jobs inside the web workers. Job leases make sure
+# each run still happens in only one process.
+if os.getenv('ENABLE_SCHEDULER') == '1':
+    from app.services.scheduler import start_scheduler
+    start_scheduler(app)
+
 if __name__ == '__main__':
     #app.run(debug=True)
     app.run(host="0.0.0.0", debug=True)
\ No newline at end of file
@@ -0,0 +1,44 @@
+# run_scheduler.py
+#
+# Long-lived worker that runs the fixture refresh, tip stats, reminder and
+# auto-assign jobs on one app/engine instead of a fresh process per cron run.
+
+import argparse
+import time
+
+from app import create_app
+from app.services.scheduler import JOB_DEFINITIONS, start_scheduler
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run the in-process job scheduler.")
+    parser.add_argument(
+        "--run-now",
+        help="Comma-separated job ids to run once immediately on startup "
+             f"({', '.join(JOB_DEFINITIONS)}).",
+    )
+    return parser.parse_args()
+
+
+def run(run_now=None):
+    app = create_app()
+    scheduler = start_scheduler(app)
+
+    for job_id in run_now or []:
+        print(f"Running {job_id} now...")
+        JOB_DEFINITIONS[job_id][0]()
+
+    for job in scheduler.get_jobs():
+        print(f"Scheduled {job.id}: next run at {job.next_run_time}")
+
+    try:
+        while True:
+            time.sleep(60)
+    except (KeyboardInterrupt, SystemExit):
+        scheduler.shutdown()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    run_now = [j.strip() for j in args.run_now.split(",") if j.strip()] if args.run_now else None
+    run(run_now=run_now)
@@ -17,15 +17,17 @@ def setup_test_data():
         fixtures = FixtureFree.query.filter_by(round=9).all()
 
         # Add tips for test user
-        tip1 = Tip(user_id=user.id, match=65, selected_team="Sharks", username=user.username)     
-        tip2 = Tip(user_id=user.id, match=66, selected_team="Roosters", username=user.username)    
-        tip3 = Tip(user_id=user.id, match=67, selected_team="Rabbitohs", username=user.username)
-        tip4 = Tip(user_id=user.id, match=68, selected_team="Warriors", username=user.username) 
-        tip5 = Tip(user_id=user.id, match=69, selected_team="Wests Tigers", username=user.username)     
-        tip6 = Tip(user_id=user.id, match=70, selected_team="Bulldogs", username=user.username)    
-        tip7 = Tip(user_id=user.id, match=71, selected_team="Broncos", username=user.username)
-        tip8 = Tip(user_id=user.id, match=72, selected_team="Raiders", username=user.username)    
-        db.session.add_all([tip1, tip2, tip3, tip4, tip5, tip6, tip7, tip8])
+        fixtures_by_match = {f.match_id: f for f in fixtures}
+        picks = {
+            "65": "Sharks", "66": "Roosters", "67": "Rabbitohs", "68": "Warriors",
+            "69": "Wests Tigers", "70": "Bulldogs", "71": "Broncos", "72": "Raiders",
+        }
+        tips = [
+            Tip(user_id=user.id, fixture_id=fixtures_by_match[match_id].id, match=match_id,
+                selected_team=team, username=user.username, season=2026)
+            for match_id, team in picks.items()
+        ]
+        db.session.add_all(tips)
         db.session.commit()
 
         # Run update function